@@ -5,7 +5,7 @@ Combines all API endpoints
 
 from fastapi import APIRouter
 
-from app.api.v1 import intake, caseworkers, city
+from app.api.v1 import intake, caseworkers, city, client, admin
 
 # Create main API router
 api_router = APIRouter()
@@ -14,3 +14,5 @@ api_router = APIRouter()
 api_router.include_router(intake.router)
 api_router.include_router(caseworkers.router)
 api_router.include_router(city.router)
+api_router.include_router(client.router)
+api_router.include_router(admin.router)
@@ -0,0 +1,135 @@
+"""
+Admin API endpoints
+Profiling and memory inspection of the worker process serving the request
+
+Requires X-Admin-Token matching ADMIN_TOKEN; every endpoint is disabled
+(404) when ADMIN_TOKEN is not set. With several workers each request
+reaches one of them; X-Worker-Pid tells which.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import logging
+import os
+import secrets
+import threading
+
+from app.core.config import settings
+from app.services.profiling import ProfilerBusy, cpu_profiler, memory_profiler
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin token check (constant-time compare)"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token"
+        )
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False
+)
+
+KEY_TYPES = "^(lineno|filename|traceback)$"
+
+
+def _busy(e: ProfilerBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(e),
+        headers={'Retry-After': '5'}
+    )
+
+
+@router.get("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = Query(False, description="Sample every thread, not just the event loop")
+):
+    """
+    Sampling CPU profile of this worker as collapsed stacks
+    (flamegraph.pl / speedscope input); requests keep being served
+    while it runs
+    """
+    thread_ids = None
+    if all_threads:
+        thread_ids = [thread.ident for thread in threading.enumerate() if thread.ident]
+    
+    logger.warning(f"CPU profile requested: {seconds}s every {interval_ms}ms")
+    try:
+        result = await cpu_profiler.profile(seconds, interval_ms / 1000, thread_ids)
+    except ProfilerBusy as e:
+        raise _busy(e)
+    
+    return PlainTextResponse(
+        result['stacks'],
+        headers={
+            'X-Profile-Samples': str(result['samples']),
+            'X-Worker-Pid': str(os.getpid()),
+            'Cache-Control': 'no-store'
+        }
+    )
+
+
+@router.get("/memory")
+async def memory_status():
+    """tracemalloc state and traced memory of this worker"""
+    return {'pid': os.getpid(), **memory_profiler.status()}
+
+
+@router.post("/memory/start")
+async def memory_start(
+    frames: int = Query(1, ge=1, le=50, description="Traceback depth per allocation"),
+    seconds: Optional[float] = Query(None, gt=0, description="Stop tracing after this long")
+):
+    """Start tracing allocations (slows allocation; stops on its own)"""
+    logger.warning(f"tracemalloc start requested ({frames} frames)")
+    return {'pid': os.getpid(), **memory_profiler.start(frames, seconds)}
+
+
+@router.post("/memory/stop")
+async def memory_stop():
+    """Stop tracing and drop the baseline snapshot"""
+    return {'pid': os.getpid(), **memory_profiler.stop()}
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    top: int = Query(20, ge=1, le=200),
+    key_type: str = Query('lineno', pattern=KEY_TYPES)
+):
+    """Top allocation sites; the snapshot becomes the baseline for /memory/diff"""
+    try:
+        result = await memory_profiler.snapshot(top, key_type)
+    except ProfilerBusy as e:
+        raise _busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {'pid': os.getpid(), **result}
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    top: int = Query(20, ge=1, le=200),
+    key_type: str = Query('lineno', pattern=KEY_TYPES),
+    reset: bool = Query(False, description="Make this snapshot the new baseline")
+):
+    """Top allocation growth since the baseline snapshot"""
+    try:
+        result = await memory_profiler.diff(top, key_type, reset)
+    except ProfilerBusy as e:
+        raise _busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {'pid': os.getpid(), **result}
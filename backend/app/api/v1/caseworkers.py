@@ -3,12 +3,28 @@ Caseworker API endpoints
 Handles caseworker dashboard and action queue
 """
 
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Header
+from fastapi.responses import StreamingResponse
+from google.cloud import firestore
 from typing import Optional, List
+from datetime import datetime
+import asyncio
 import logging
 
-from app.models.client import Client, ClientListResponse, ClientActionItem
+from app.core.config import settings
+from app.core.responses import RawJSONResponse, dumps
+from app.models.client import (
+    Client,
+    ClientListResponse,
+    ClientActionItem,
+    ClientActionItemUpdate,
+    ClientStatus,
+    ClientTimeline,
+    ClientUpdate,
+)
+from app.models.trusted import action_items_json, client_json, client_list_json
 from app.services.database import db_service
+from app.services.queue_events import queue_events
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/caseworkers", tags=["caseworkers"])
@@ -44,7 +60,104 @@ async def get_action_queue(
         limit=limit
     )
     
-    return [ClientActionItem(**item) for item in queue]
+    # Trusted read: validated once and serialized directly
+    return RawJSONResponse(action_items_json(queue))
+
+
+@router.get("/queue/stream")
+async def stream_action_queue(
+    caseworker_id: str = Query(..., description="Caseworker ID"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    limit: int = Query(100, ge=1, le=500)
+):
+    """
+    Server-Sent Events stream of the caseworker's pending action queue
+    
+    Events:
+    - snapshot: full pending queue ({items}), sent on connect and whenever
+      missed deltas can't be replayed
+    - action_created / action_updated / action_completed: one action item
+    
+    Events cover writes from every instance (a Firestore listener per
+    streamed caseworker). Reconnects with Last-Event-ID replay only the
+    missed deltas when they reach the same process, else get a snapshot;
+    clients should upsert items by id. Comment lines keep idle
+    connections alive.
+    """
+    
+    # Verify caseworker exists (once per connection, not per poll)
+    caseworker = await db_service.get_caseworker(caseworker_id)
+    if not caseworker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Caseworker not found"
+        )
+    
+    async def snapshot_event() -> bytes:
+        position = queue_events.last_event_id
+        items = await db_service.get_caseworker_queue(
+            caseworker_id=caseworker_id,
+            completed=False,
+            limit=limit
+        )
+        return _sse_event(position, 'snapshot', {'items': items})
+    
+    async def events():
+        # Subscribe before reading so no write meanwhile is lost
+        subscription = await queue_events.subscribe(caseworker_id, db_service.db)
+        try:
+            yield b"retry: 3000\n\n"
+            replay = None
+            if last_event_id:
+                replay = queue_events.replay(caseworker_id, last_event_id)
+            if replay is None:
+                yield await snapshot_event()
+            else:
+                for event in replay:
+                    yield _sse_event(event.id, event.type, event.data)
+            
+            while True:
+                if subscription.overflowed:
+                    # Fell too far behind: drop queued deltas and resync
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.overflowed = False
+                    yield await snapshot_event()
+                    continue
+                
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.QUEUE_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await queue_events.revive(caseworker_id, db_service.db):
+                        yield await snapshot_event()
+                    else:
+                        yield b": keepalive\n\n"
+                    continue
+                
+                yield _sse_event(event.id, event.type, event.data)
+        finally:
+            queue_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+def _sse_event(event_id: str, event_type: str, data) -> bytes:
+    """Encode one SSE message (JSON data is always a single line)"""
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        event_id.encode(),
+        event_type.encode(),
+        dumps(data)
+    )
 
 
 @router.get("/clients", response_model=ClientListResponse)
@@ -72,13 +185,15 @@ async def list_assigned_clients(
         status=status
     )
     
-    return ClientListResponse(
-        clients=[Client(**c) for c in clients],
+    # Trusted read: each document is validated once and serialized
+    # directly, bypassing response_model re-validation
+    return RawJSONResponse(client_list_json(
+        clients,
         total=total,
         page=page,
         page_size=page_size,
         has_more=(offset + len(clients)) < total
-    )
+    ))
 
 
 @router.get("/clients/{client_id}", response_model=Client)
@@ -105,7 +220,84 @@ async def get_client_details(
             detail="Access denied: client not assigned to this caseworker"
         )
     
-    return Client(**client)
+    return RawJSONResponse(client_json(client))
+
+
+@router.patch("/clients/{client_id}", response_model=Client)
+async def update_client(
+    client_id: str,
+    update: ClientUpdate,
+    caseworker_id: str = Query(..., description="Caseworker ID")
+):
+    """
+    Update client information or move the client to a new status
+    
+    Status transitions feed the contractor performance metrics
+    """
+    
+    client = await db_service.get_client(client_id)
+    
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    if client.get('assigned_caseworker_id') != caseworker_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: client not assigned to this caseworker"
+        )
+    
+    update_data = update.model_dump(exclude_unset=True, mode='json')
+    if update_data.get('notes'):
+        update_data['notes'] = firestore.ArrayUnion([update_data['notes']])
+    else:
+        update_data.pop('notes', None)
+    
+    if (
+        update_data.get('status') == ClientStatus.PLACED.value
+        and not client.get('housing_placed_at')
+    ):
+        update_data['housing_placed_at'] = datetime.utcnow()
+    
+    if update_data:
+        await db_service.update_client(client_id, update_data, actor=caseworker_id)
+    
+    return RawJSONResponse(client_json(await db_service.get_client(client_id)))
+
+
+@router.get("/clients/{client_id}/timeline", response_model=ClientTimeline)
+async def get_client_timeline(
+    client_id: str,
+    caseworker_id: str = Query(..., description="Caseworker ID"),
+    limit: int = Query(100, ge=1, le=500)
+):
+    """
+    Status history of a client: every transition with who made it
+    Reads the client and its own status events only
+    """
+    
+    client = await db_service.get_client(client_id)
+    
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    if client.get('assigned_caseworker_id') != caseworker_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: client not assigned to this caseworker"
+        )
+    
+    return {
+        'client_id': client_id,
+        'status': client.get('status', 'intake'),
+        'status_timeline': client.get('status_timeline') or {},
+        'events': await db_service.get_status_events(client_id, limit=limit)
+    }
 
 
 @router.post("/action/{action_id}/complete")
@@ -118,16 +310,58 @@ async def complete_action(
     Mark an action item as completed
     """
     
-    # TODO: Implement action completion
-    # For Phase 0, just acknowledge
+    action = await db_service.complete_action_item(
+        caseworker_id=caseworker_id,
+        action_id=action_id,
+        notes=notes
+    )
+    
+    if not action:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Action item not found"
+        )
     
     return {
         'status': 'completed',
         'action_id': action_id,
+        'completed_at': action.get('completed_at'),
         'message': 'Action marked as complete'
     }
 
 
+@router.patch("/action/{action_id}", response_model=ClientActionItem)
+async def update_action(
+    action_id: str,
+    update: ClientActionItemUpdate,
+    caseworker_id: str = Query(..., description="Caseworker ID")
+):
+    """
+    Change a pending action item (priority, due date, description)
+    Streams of the caseworker's queue get an action_updated event
+    """
+    
+    action = await db_service.update_action_item(
+        caseworker_id=caseworker_id,
+        action_id=action_id,
+        update=update.model_dump(exclude_unset=True)
+    )
+    
+    if not action:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Action item not found"
+        )
+    
+    if action.get('completed'):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Action item already completed"
+        )
+    
+    return action
+
+
 @router.get("/stats")
 async def get_caseworker_stats(
     caseworker_id: str = Query(..., description="Caseworker ID")
@@ -145,33 +379,12 @@ async def get_caseworker_stats(
         )
     
     # Count clients by status
-    total_clients = len(
-        await db_service.list_clients(caseworker_id=caseworker_id, limit=1000)
-    )
-    
-    intake_count = await db_service.count_clients(
-        caseworker_id=caseworker_id,
-        status='intake'
-    )
-    assessed_count = await db_service.count_clients(
-        caseworker_id=caseworker_id,
-        status='assessed'
-    )
-    matched_count = await db_service.count_clients(
-        caseworker_id=caseworker_id,
-        status='matched'
-    )
-    placed_count = await db_service.count_clients(
-        caseworker_id=caseworker_id,
-        status='placed'
-    )
+    total_clients = await db_service.count_clients(caseworker_id=caseworker_id)
+    by_status = await db_service.client_status_counts(caseworker_id=caseworker_id)
+    placed_count = by_status['placed']
     
-    # Get pending actions
-    pending_actions = await db_service.get_caseworker_queue(
-        caseworker_id=caseworker_id,
-        completed=False,
-        limit=100
-    )
+    # Pending action counts (served from memory with the live queue cache)
+    actions = await db_service.get_caseworker_queue_summary(caseworker_id)
     
     return {
         'caseworker': {
@@ -182,15 +395,10 @@ async def get_caseworker_stats(
         'clients': {
             'total': total_clients,
             'by_status': {
-                'intake': intake_count,
-                'assessed': assessed_count,
-                'matched': matched_count,
-                'placed': placed_count
+                name: by_status[name]
+                for name in ('intake', 'assessed', 'matched', 'placed')
             },
             'placement_rate': (placed_count / total_clients * 100) if total_clients > 0 else 0
         },
-        'actions': {
-            'pending': len(pending_actions),
-            'high_priority': len([a for a in pending_actions if a.get('priority', 0) >= 4])
-        }
+        'actions': actions
     }
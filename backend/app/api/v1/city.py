@@ -5,16 +5,29 @@ Provides citywide metrics and analytics for oversight
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
 
+from app.core.config import settings
+from app.models.client import HousingType
+from app.services.by_name_list import by_name_list
+from app.services.client_snapshot import client_snapshot
 from app.services.database import db_service
+from app.services.metrics_timeseries import downsample, intake_trend, period_start
+from app.services.response_cache import city_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/city", tags=["city"])
 
+# Longest range served by /metrics/timeseries (about 5 years)
+MAX_TIMESERIES_DAYS = 1830
+
+# Retry-After while the by-name list loads
+BY_NAME_RETRY_SECONDS = 10
+
 
 @router.get("/metrics")
+@city_cache.cached("city:metrics")
 async def get_city_metrics():
     """
     Get citywide metrics for dashboard
@@ -30,17 +43,88 @@ async def get_city_metrics():
     # Get overall metrics
     metrics = await db_service.get_city_metrics()
     
-    # TODO Phase 1: Add time-series data
-    # TODO Phase 1: Add predictive analytics
+    # Intake trend from daily snapshots (last 7 days vs the 7 before)
+    today = datetime.utcnow().date()
+    snapshots = await db_service.get_metrics_snapshots(
+        (today - timedelta(days=14)).isoformat(),
+        today.isoformat()
+    )
     
     return {
         'overview': metrics,
         'timestamp': datetime.utcnow().isoformat(),
-        'trend': 'stable'  # TODO: Calculate actual trend
+        'trend': intake_trend(snapshots)
+    }
+
+
+@router.get("/metrics/timeseries")
+@city_cache.cached("city:metrics_timeseries")
+async def get_metrics_timeseries(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    interval: str = Query('day', pattern='^(day|week|month)$'),
+    organization_id: Optional[str] = Query(None),
+    zone: Optional[str] = Query(None),
+    status: Optional[str] = Query(None)
+):
+    """
+    Get metric time series for trend charts
+    
+    Served from daily snapshots, never recomputed from clients:
+    - Clients by status at the end of each period
+    - Intakes and placements during each period
+    
+    Defaults to the last 30 days
+    """
+    
+    try:
+        end = date.fromisoformat(end_date) if end_date else datetime.utcnow().date()
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    
+    if start > end:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    if (end - start).days > MAX_TIMESERIES_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range is limited to {MAX_TIMESERIES_DAYS} days"
+        )
+    
+    # Align to period boundaries, plus one day before as the flow baseline
+    aligned_start = period_start(start.isoformat(), interval)
+    baseline_day = date.fromisoformat(aligned_start) - timedelta(days=1)
+    snapshots = await db_service.get_metrics_snapshots(
+        baseline_day.isoformat(),
+        end.isoformat()
+    )
+    
+    points = downsample(
+        snapshots,
+        interval=interval,
+        start_date=aligned_start,
+        organization_id=organization_id,
+        zone=zone,
+        status=status
+    )
+    
+    return {
+        'interval': interval,
+        'period': {
+            'start': aligned_start,
+            'end': end.isoformat()
+        },
+        'filters': {
+            'organization_id': organization_id,
+            'zone': zone,
+            'status': status
+        },
+        'points': points
     }
 
 
 @router.get("/organizations")
+@city_cache.cached("city:organizations")
 async def list_organizations():
     """
     List all organizations with performance metrics
@@ -65,6 +149,7 @@ async def list_organizations():
 
 
 @router.get("/heatmap")
+@city_cache.cached("city:heatmap")
 async def get_geographic_heatmap(
     days: int = Query(30, ge=1, le=365, description="Days of data")
 ):
@@ -93,6 +178,7 @@ async def get_geographic_heatmap(
 
 
 @router.get("/qr-codes/analytics")
+@city_cache.cached("city:qr_analytics")
 async def get_qr_analytics():
     """
     Get QR code performance analytics
@@ -118,6 +204,7 @@ async def get_qr_analytics():
 
 
 @router.get("/reports/hud")
+@city_cache.cached("city:hud_report")
 async def generate_hud_report(
     start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
     end_date: Optional[str] = Query(None, description="End date (ISO format)")
@@ -158,6 +245,7 @@ async def generate_hud_report(
 
 
 @router.get("/contractors/performance")
+@city_cache.cached("city:contractors")
 async def get_contractor_performance():
     """
     Contractor accountability metrics
@@ -169,30 +257,94 @@ async def get_contractor_performance():
     - Client satisfaction (future)
     """
     
-    # TODO: Implement contractor performance tracking
-    
-    return {
-        'contractors': [],
-        'metrics': {
-            'avg_response_time_hours': 0,
-            'avg_placement_days': 0,
-            'documentation_compliance': 0.0
-        }
-    }
+    # Pre-aggregated per organization from status transitions and
+    # action completions, so this never scans clients
+    return await db_service.get_contractor_performance()
 
 
 @router.get("/predictive/capacity")
+@city_cache.cached("city:capacity")
 async def predict_capacity_needs():
     """
     Predictive analytics for capacity planning
     
-    Future feature for Phase 4-5:
-    - Predict intake volume
-    - Identify resource gaps
-    - Recommend interventions
+    Returns:
+    - Expected intake volume per zone and acuity (next 7 / 30 days)
+    - Expected demand per housing type, with 90% upper bounds
+    - Daily citywide intake forecast
+    
+    Forecasts are produced by the capacity forecast worker
+    (app.jobs.forecast_capacity), never on the request path
     """
     
+    forecast = await db_service.get_capacity_forecast()
+    
+    if not forecast:
+        return {
+            'status': 'pending',
+            'message': 'No forecast has been generated yet'
+        }
+    
     return {
-        'status': 'coming_in_phase_4',
-        'message': 'Predictive analytics will be available in Phase 4'
+        'status': 'ok',
+        **forecast
     }
+
+
+@router.get("/by-name-list")
+async def get_by_name_list(
+    zone: Optional[str] = Query(None),
+    housing_type: Optional[HousingType] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Coordinated entry by-name list
+    
+    Assessed clients ranked by VI-SPDAT total score, then longest
+    waiting, per zone and housing type (either left out: citywide or
+    all types, in the same order)
+    
+    Live, so not cached: served from the incrementally maintained
+    index, 503 while this process loads it (on its first request)
+    """
+    
+    await _require_by_name_list()
+    return await db_service.get_by_name_list(
+        zone=zone,
+        housing_type=housing_type.value if housing_type else None,
+        offset=offset,
+        limit=limit
+    )
+
+
+@router.get("/by-name-list/{client_id}")
+async def get_by_name_rank(client_id: str):
+    """
+    A client's rank on the by-name list: within their zone and housing
+    type, and citywide for their housing type
+    """
+    
+    await _require_by_name_list()
+    rank = await db_service.get_by_name_rank(client_id)
+    
+    if not rank:
+        raise HTTPException(status_code=404, detail="Client is not on the by-name list")
+    
+    return rank
+
+
+async def _require_by_name_list():
+    """
+    503 unless the by-name index is loaded (never a scan per request);
+    the first request loads the client snapshot it is kept on
+    """
+    if not settings.BY_NAME_LIST_ENABLED:
+        raise HTTPException(status_code=503, detail="By-name list is disabled (BY_NAME_LIST_ENABLED)")
+    if not by_name_list.ready:
+        await client_snapshot.start(db_service.db)
+        raise HTTPException(
+            status_code=503,
+            detail="By-name list is loading",
+            headers={'Retry-After': str(BY_NAME_RETRY_SECONDS)}
+        )
@@ -3,18 +3,168 @@ Client Portal API endpoints
 Handles client authentication and self-service features
 """
 
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi.responses import Response
 from typing import Optional
 from datetime import datetime
 import logging
 import secrets
 
+from app.core.config import settings
+from app.core.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.core.responses import ORJSONResponse
 from app.services.database import db_service
+from app.services.shared_cache import client_progress_key, shared_cache
+from app.services.versions import version_stamps
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/client", tags=["client"])
 
 
+def _portal_etag(view: str, client_id: str, with_refs: bool) -> Optional[str]:
+    """
+    ETag for a portal view built only from cached version stamps
+    None when any version involved is unknown (a full read is needed)
+    """
+    client_stamp = version_stamps.get('clients', client_id)
+    if client_stamp is None:
+        return None
+    
+    parts = [settings.VERSION, view, client_id, client_stamp.version]
+    if with_refs:
+        for collection in ('caseworkers', 'organizations'):
+            ref_id = client_stamp.refs.get(collection)
+            if not ref_id:
+                parts.append('-')
+                continue
+            ref_stamp = version_stamps.get(collection, ref_id)
+            if ref_stamp is None:
+                return None
+            parts.append(ref_stamp.version)
+    
+    return make_etag(*parts)
+
+
+def _conditional_response(request: Request, etag: Optional[str], content) -> Response:
+    """304 if the client's copy is current, otherwise content with the ETag"""
+    if etag is None:
+        return ORJSONResponse(content)
+    
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return not_modified(etag)
+    
+    return ORJSONResponse(content, headers=etag_headers(etag))
+
+
+# Status progression; a client past a status has reached it even if the
+# transition into it was skipped
+STATUS_ORDER = ['intake', 'assessed', 'matched', 'placed', 'follow_up']
+
+
+def _status_timeline(client: dict) -> dict:
+    """
+    First time the client entered each status
+    Read from the status_timeline projection; approximated from the
+    client's own dates for records created before status events
+    """
+    if client.get('status_timeline'):
+        return client['status_timeline']
+    
+    created_at = client.get('created_at')
+    timeline = {'intake': client.get('intake_completed_at') or created_at}
+    if client.get('status') and client['status'] != 'intake':
+        timeline[client['status']] = created_at
+    if client.get('housing_placed_at'):
+        timeline['placed'] = client['housing_placed_at']
+    return timeline
+
+
+def _build_progress(client: dict) -> dict:
+    """Milestones, completion percentage and next step for a client"""
+    timeline = _status_timeline(client)
+    current = client.get('status', 'intake')
+    rank = STATUS_ORDER.index(current) if current in STATUS_ORDER else -1
+    
+    def reached(status_name: str) -> bool:
+        return status_name in timeline or rank >= STATUS_ORDER.index(status_name)
+    
+    # Define milestone progression
+    milestones = [
+        {
+            'step': 'Intake Complete',
+            'completed': timeline.get('intake') is not None,
+            'date': timeline.get('intake'),
+            'icon': '✓',
+            'description': 'Your information has been submitted'
+        },
+        {
+            'step': 'Caseworker Assigned',
+            'completed': client.get('assigned_caseworker_id') is not None,
+            'date': client.get('created_at') if client.get('assigned_caseworker_id') else None,
+            'icon': '👤',
+            'description': 'A caseworker is reviewing your case'
+        },
+        {
+            'step': 'Assessment Complete',
+            'completed': reached('assessed'),
+            'date': timeline.get('assessed'),
+            'icon': '📋',
+            'description': 'Your needs have been evaluated'
+        },
+        {
+            'step': 'Housing Match Found',
+            'completed': reached('matched'),
+            'date': timeline.get('matched'),
+            'icon': '🏠',
+            'description': 'We found housing that fits your needs'
+        },
+        {
+            'step': 'Move-In Process',
+            'completed': reached('placed'),
+            'date': timeline.get('placed') or client.get('housing_placed_at'),
+            'icon': '🔑',
+            'description': 'Preparing for your move-in'
+        }
+    ]
+    
+    # Calculate completion percentage
+    completed_count = sum(1 for m in milestones if m['completed'])
+    total_count = len(milestones)
+    completion_percentage = int((completed_count / total_count) * 100)
+    
+    # Determine current step and next action
+    current_step = None
+    next_action = None
+    
+    for i, milestone in enumerate(milestones):
+        if not milestone['completed']:
+            current_step = milestone['step']
+            if i == 0:
+                next_action = "Complete your intake assessment"
+            elif i == 1:
+                next_action = "Your caseworker will contact you within 24-72 hours"
+            elif i == 2:
+                next_action = "Your caseworker is reviewing your assessment"
+            elif i == 3:
+                next_action = "Searching for housing matches"
+            elif i == 4:
+                next_action = "Preparing move-in paperwork"
+            break
+    
+    if current_step is None:
+        current_step = "Housed Successfully"
+        next_action = "Congratulations! Stay in touch with your caseworker."
+    
+    return {
+        'completion_percentage': completion_percentage,
+        'current_step': current_step,
+        'next_action': next_action,
+        'milestones': milestones,
+        'estimated_time_to_housing': '30-45 days',  # TODO: Make dynamic based on acuity
+        'status': client.get('status')
+    }
+
+
 @router.post("/auth/login")
 async def client_login(
     confirmation_code: str = Query(..., description="Confirmation code from intake"),
@@ -65,7 +215,7 @@ async def client_login(
 
 
 @router.get("/profile/{client_id}")
-async def get_client_profile(client_id: str):
+async def get_client_profile(client_id: str, request: Request):
     """
     Get client's own profile information
     
@@ -75,8 +225,17 @@ async def get_client_profile(client_id: str):
     - Assigned caseworker
     - Organization info
     - VI-SPDAT score (if assessed)
+    
+    Conditional GET: the ETag covers the client, caseworker and organization
+    versions, and a matching If-None-Match is answered with 304 from
+    cached version stamps without reading Firestore
     """
     
+    if request.headers.get('if-none-match'):
+        etag = _portal_etag('profile', client_id, with_refs=True)
+        if etag and etag_matches(request.headers['if-none-match'], etag):
+            return not_modified(etag)
+    
     client = await db_service.get_client(client_id)
     
     if not client:
@@ -99,7 +258,7 @@ async def get_client_profile(client_id: str):
             client['organization_id']
         )
     
-    return {
+    profile = {
         'client': {
             'id': client['id'],
             'first_name': client.get('first_name'),
@@ -121,10 +280,16 @@ async def get_client_profile(client_id: str):
             'acuity_level': client.get('vi_spdat_score', {}).get('acuity_level'),
         } if client.get('vi_spdat_score') else None
     }
+    
+    return _conditional_response(
+        request,
+        _portal_etag('profile', client_id, with_refs=True),
+        profile
+    )
 
 
 @router.get("/progress/{client_id}")
-async def get_client_progress(client_id: str):
+async def get_client_progress(client_id: str, request: Request):
     """
     Get client's progress through the housing process
     
@@ -137,8 +302,20 @@ async def get_client_progress(client_id: str):
     - Housed successfully
     
     Calculates completion percentage and next steps
+    Supports conditional GET (ETag from the client document version);
+    payloads are shared across instances until the client changes
     """
     
+    if request.headers.get('if-none-match'):
+        etag = _portal_etag('progress', client_id, with_refs=False)
+        if etag and etag_matches(request.headers['if-none-match'], etag):
+            return not_modified(etag)
+    
+    # Payload computed by any instance since the client last changed
+    cached = await shared_cache.get(client_progress_key(client_id))
+    if cached:
+        return _conditional_response(request, cached['etag'], cached['progress'])
+    
     client = await db_service.get_client(client_id)
     
     if not client:
@@ -147,81 +324,16 @@ async def get_client_progress(client_id: str):
             detail="Client not found"
         )
     
-    # Define milestone progression
-    milestones = [
-        {
-            'step': 'Intake Complete',
-            'completed': client.get('intake_completed_at') is not None,
-            'date': client.get('intake_completed_at'),
-            'icon': '✓',
-            'description': 'Your information has been submitted'
-        },
-        {
-            'step': 'Caseworker Assigned',
-            'completed': client.get('assigned_caseworker_id') is not None,
-            'date': client.get('created_at') if client.get('assigned_caseworker_id') else None,
-            'icon': '👤',
-            'description': 'A caseworker is reviewing your case'
-        },
-        {
-            'step': 'Assessment Complete',
-            'completed': client.get('status') in ['assessed', 'matched', 'placed'],
-            'date': client.get('created_at') if client.get('status') != 'intake' else None,
-            'icon': '📋',
-            'description': 'Your needs have been evaluated'
-        },
-        {
-            'step': 'Housing Match Found',
-            'completed': client.get('status') in ['matched', 'placed'],
-            'date': client.get('matched_housing_id') if client.get('matched_housing_id') else None,
-            'icon': '🏠',
-            'description': 'We found housing that fits your needs'
-        },
-        {
-            'step': 'Move-In Process',
-            'completed': client.get('status') == 'placed',
-            'date': client.get('housing_placed_at'),
-            'icon': '🔑',
-            'description': 'Preparing for your move-in'
-        }
-    ]
-    
-    # Calculate completion percentage
-    completed_count = sum(1 for m in milestones if m['completed'])
-    total_count = len(milestones)
-    completion_percentage = int((completed_count / total_count) * 100)
-    
-    # Determine current step and next action
-    current_step = None
-    next_action = None
-    
-    for i, milestone in enumerate(milestones):
-        if not milestone['completed']:
-            current_step = milestone['step']
-            if i == 0:
-                next_action = "Complete your intake assessment"
-            elif i == 1:
-                next_action = "Your caseworker will contact you within 24-72 hours"
-            elif i == 2:
-                next_action = "Your caseworker is reviewing your assessment"
-            elif i == 3:
-                next_action = "Searching for housing matches"
-            elif i == 4:
-                next_action = "Preparing move-in paperwork"
-            break
-    
-    if current_step is None:
-        current_step = "Housed Successfully"
-        next_action = "Congratulations! Stay in touch with your caseworker."
+    progress = _build_progress(client)
+    etag = _portal_etag('progress', client_id, with_refs=False)
+    if etag:
+        await shared_cache.set(
+            client_progress_key(client_id),
+            {'etag': etag, 'progress': progress},
+            ttl=settings.SHARED_CACHE_PROGRESS_TTL_SECONDS
+        )
     
-    return {
-        'completion_percentage': completion_percentage,
-        'current_step': current_step,
-        'next_action': next_action,
-        'milestones': milestones,
-        'estimated_time_to_housing': '30-45 days',  # TODO: Make dynamic based on acuity
-        'status': client.get('status')
-    }
+    return _conditional_response(request, etag, progress)
 
 
 @router.get("/caseworker/{client_id}")
@@ -3,12 +3,24 @@ Intake API endpoints
 Handles client intake process via QR codes
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Header, Response
 from typing import Optional
 import logging
 
 from app.models.client import ClientCreate, Client, IntakeData
 from app.services.database import db_service
+from app.services.dedup import IDENTITY_FIELDS, DuplicateCandidate, duplicate_detector
+from app.services.idempotency import (
+    IdempotencyConflict,
+    IdempotencyInProgress,
+    intake_idempotency,
+    request_fingerprint,
+)
+from app.services.intake_jobs import (
+    ALERT_CASEWORKER,
+    SEND_INTAKE_CONFIRMATION,
+)
+from app.services.job_queue import job_queue
 from app.services.vi_spdat import vi_spdat_service
 
 logger = logging.getLogger(__name__)
@@ -58,8 +70,21 @@ async def start_intake(qr_code: str):
     }
 
 
-@router.post("/submit", response_model=Client)
-async def submit_intake(client_data: ClientCreate):
+# Duplicate matches stay on the stored client, for caseworkers only
+INTAKE_RESPONSE_EXCLUDE = {'possible_duplicates'}
+
+
+@router.post("/submit", response_model=Client, response_model_exclude=INTAKE_RESPONSE_EXCLUDE)
+async def submit_intake(
+    client_data: ClientCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key run once"
+    )
+):
     """
     Submit completed intake assessment
     
@@ -70,8 +95,44 @@ async def submit_intake(client_data: ClientCreate):
     4. Create action item for caseworker
     5. Send confirmation to client
     6. Return client record
+    
+    With an Idempotency-Key, retries (including concurrent ones) return
+    the original client record without rescoring or writing again.
+    A repeat intake merged into an existing client of the same
+    organization (DEDUP_POLICY=merge) returns only what was submitted.
+    Possible duplicates are never returned: the submitter is not
+    authenticated
     """
     
+    if not idempotency_key:
+        return await _submit_intake(client_data)
+    
+    try:
+        record, replayed = await intake_idempotency.run(
+            idempotency_key,
+            request_fingerprint(client_data.model_dump(mode='json')),
+            lambda: _submit_intake(client_data)
+        )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={'Retry-After': '1'}
+        )
+    
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return record
+
+
+async def _submit_intake(client_data: ClientCreate) -> dict:
+    """Score, assign and store an intake; returns the client record (JSON)"""
+    
     # Validate QR code
     qr_data = await db_service.get_qr_code(client_data.qr_code)
     if not qr_data:
@@ -80,6 +141,23 @@ async def submit_intake(client_data: ClientCreate):
             detail="Invalid QR code"
         )
     
+    # Same person already on file with this organization? One lookup on
+    # the blocking keys (other organizations' clients are never disclosed)
+    duplicates = []
+    if duplicate_detector.enabled:
+        identity = client_data.model_dump(include=set(IDENTITY_FIELDS))
+        candidates = await db_service.find_duplicate_candidates(
+            duplicate_detector.keys(identity),
+            qr_data['organization_id']
+        )
+        duplicates = duplicate_detector.in_organization(
+            duplicate_detector.rank(identity, candidates),
+            qr_data['organization_id']
+        )
+        for match in duplicates:
+            if duplicate_detector.should_merge(match, qr_data['organization_id']):
+                return await _merge_intake(match, client_data)
+    
     # Calculate VI-SPDAT score
     vi_spdat_score = vi_spdat_service.calculate_score(client_data.intake_data)
     
@@ -106,9 +184,11 @@ async def submit_intake(client_data: ClientCreate):
     # Create client record
     client_dict = client_data.model_dump()
     client_dict['organization_id'] = qr_data['organization_id']
+    client_dict['zone'] = qr_data.get('zone', 'default')
     client_dict['assigned_caseworker_id'] = caseworker_id
     client_dict['vi_spdat_score'] = vi_spdat_score.model_dump()
     client_dict['status'] = 'assessed'  # Automatically assessed
+    client_dict['possible_duplicates'] = [match.to_dict() for match in duplicates[:5]]
     
     client_id = await db_service.create_client(client_dict)
     
@@ -125,9 +205,28 @@ async def submit_intake(client_data: ClientCreate):
         }
         
         await db_service.create_action_item(caseworker_id, action_data)
+        
+        if duplicates:
+            best = duplicates[0]
+            await db_service.create_action_item(caseworker_id, {
+                'client_id': client_id,
+                'client_name': action_data['client_name'],
+                'action_type': 'review_duplicate',
+                'priority': 3,
+                'description': f"Possible duplicate of {len(duplicates)} existing client(s); "
+                              f"best match {best.client_id} (score {best.score:.2f}, "
+                              f"{', '.join(best.matched_on)})"
+            })
+        
+        if vi_spdat_score.acuity_level == 'high':
+            await job_queue.enqueue(ALERT_CASEWORKER, {
+                'caseworker_id': caseworker_id,
+                'client_id': client_id
+            })
     
-    # TODO Phase 1: Send SMS/email confirmation
-    # TODO Phase 1: Trigger MAYA agent for analysis
+    # Confirmation runs after the response (job queue)
+    await job_queue.enqueue(SEND_INTAKE_CONFIRMATION, {'client_id': client_id})
+    # TODO Phase 1: Trigger MAYA agent for analysis (as a job once it does work)
     
     logger.info(
         f"Intake completed: client_id={client_id}, "
@@ -137,7 +236,47 @@ async def submit_intake(client_data: ClientCreate):
     
     # Fetch and return full client record
     client_record = await db_service.get_client(client_id)
-    return Client(**client_record)
+    return Client(**client_record).model_dump(mode='json', exclude=INTAKE_RESPONSE_EXCLUDE)
+
+
+async def _merge_intake(match: DuplicateCandidate, client_data: ClientCreate) -> dict:
+    """
+    Merge policy: record a repeat intake on the existing client instead
+    of creating another one; fills identity fields it was missing
+    
+    The submitter is not authenticated, so the response carries only what
+    they submitted, never the existing record (notes, score, history)
+    """
+    existing = match.client
+    fields = {
+        name: value
+        for name, value in client_data.model_dump(include=set(IDENTITY_FIELDS)).items()
+        if value is not None and not existing.get(name)
+    }
+    fields['last_intake_qr_code'] = client_data.qr_code
+    await db_service.record_repeat_intake(match.client_id, fields)
+    
+    caseworker_id = existing.get('assigned_caseworker_id')
+    if caseworker_id:
+        await db_service.create_action_item(caseworker_id, {
+            'client_id': match.client_id,
+            'client_name': f"{existing.get('first_name', '')} {existing.get('last_name', '')}".strip(),
+            'action_type': 'repeat_intake',
+            'priority': 3,
+            'description': f"Client completed intake again at QR {client_data.qr_code}"
+        })
+    
+    logger.info(
+        f"Intake merged into client_id={match.client_id}, "
+        f"score={match.score}, matched_on={','.join(match.matched_on)}"
+    )
+    
+    return Client(
+        **client_data.model_dump(),
+        id=match.client_id,
+        organization_id=existing['organization_id'],
+        assigned_caseworker_id=caseworker_id
+    ).model_dump(mode='json', exclude=INTAKE_RESPONSE_EXCLUDE)
 
 
 @router.get("/{intake_id}", response_model=dict)
@@ -0,0 +1,266 @@
+"""
+Admission control for the intake path
+Token buckets (per QR code and global) plus concurrency-based load
+shedding, so a flyer at a large event degrades scans gracefully
+instead of slowing every request down
+
+- Submits (completed assessments) outrank starts (scans): starts may
+  not use the reserved share of the global bucket, are shed as soon as
+  anything is waiting, and never queue
+- Submits wait briefly for a slot in a bounded queue; they are only
+  rejected when the queue is full or the wait times out
+- Rejections carry Retry-After: 429 for a single QR code over its
+  rate, 503 when the instance as a whole is overloaded
+
+Limits are per instance.
+"""
+
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+import asyncio
+import logging
+import math
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+START = "start"
+SUBMIT = "submit"
+
+
+class TokenBucket:
+    """Classic token bucket, refilled lazily on each call"""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def refill(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        """
+        Take tokens if at least reserve would remain
+        Returns 0 on success, otherwise seconds until it would succeed
+        """
+        self.refill()
+        if self.tokens - tokens >= reserve:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens + reserve - self.tokens) / self.rate
+
+
+class KeyedBuckets:
+    """Token bucket per key, keeping at most max_keys recently used keys"""
+    
+    def __init__(self, rate: float, burst: float, max_keys: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+    
+    def try_acquire(self, key: str, tokens: float = 1.0) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_keys:
+                # Least recently used keys have long since refilled
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.try_acquire(tokens)
+
+
+class Rejected(Exception):
+    """Request not admitted"""
+    
+    def __init__(self, status_code: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """Rate limits and prioritized concurrency slots for intake requests"""
+    
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: float,
+        qr_rate: float,
+        qr_burst: float,
+        submit_reserve: float = 0.25,
+        max_concurrency: int = 32,
+        max_queue: int = 128,
+        queue_timeout: float = 10.0
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.qr_buckets = KeyedBuckets(qr_rate, qr_burst)
+        self.submit_reserve = global_burst * submit_reserve
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats: Dict[str, int] = {
+            'start_admitted': 0, 'start_shed': 0,
+            'submit_admitted': 0, 'submit_shed': 0, 'submit_queued': 0,
+        }
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+    
+    async def acquire(self, kind: str, qr_code: Optional[str] = None):
+        """Admit one request or raise Rejected; pair with release()"""
+        if kind == START:
+            self._admit_start(qr_code)
+        else:
+            await self._admit_submit()
+    
+    def release(self):
+        """Hand the slot to the next waiting submit, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # slot passes over directly
+                return
+        self.in_flight -= 1
+    
+    def _admit_start(self, qr_code: Optional[str]):
+        if qr_code:
+            wait = self.qr_buckets.try_acquire(qr_code)
+            if wait:
+                self._shed(START)
+                raise Rejected(429, wait, "Too many scans for this QR code")
+        
+        if self._waiters or self.in_flight >= self.max_concurrency:
+            self._shed(START)
+            raise Rejected(503, 1.0, "Intake is busy")
+        
+        wait = self.global_bucket.try_acquire(reserve=self.submit_reserve)
+        if wait:
+            self._shed(START)
+            raise Rejected(503, wait, "Intake is busy")
+        
+        self.in_flight += 1
+        self.stats['start_admitted'] += 1
+    
+    async def _admit_submit(self):
+        wait = self.global_bucket.try_acquire()
+        if wait:
+            self._shed(SUBMIT)
+            raise Rejected(503, wait, "Intake is busy")
+        
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.stats['submit_admitted'] += 1
+            return
+        
+        if len(self._waiters) >= self.max_queue:
+            self._shed(SUBMIT)
+            raise Rejected(503, self.queue_timeout, "Intake queue is full")
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats['submit_queued'] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Slot arrived just as the wait expired: keep it
+                self.stats['submit_admitted'] += 1
+                return
+            self._abandon(waiter)
+            self._shed(SUBMIT)
+            raise Rejected(503, self.queue_timeout, "Intake is busy")
+        except asyncio.CancelledError:
+            # Client went away; pass an already granted slot on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+        
+        self.stats['submit_admitted'] += 1
+    
+    def _abandon(self, waiter: asyncio.Future):
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def _shed(self, kind: str):
+        self.stats[f'{kind}_shed'] += 1
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying admission control to intake routes"""
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        routes: Dict[Tuple[str, str], str]
+    ):
+        self.app = app
+        self.controller = controller
+        self.routes = routes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        kind = self.routes.get((scope["method"], scope["path"]))
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+        
+        qr_code = _query_param(scope, "qr_code") if kind == START else None
+        try:
+            await self.controller.acquire(kind, qr_code)
+        except Rejected as rejected:
+            logger.warning(f"Intake {kind} rejected ({rejected.status_code}): {rejected.reason}")
+            response = ORJSONResponse(
+                status_code=rejected.status_code,
+                content={'detail': rejected.reason},
+                headers={'Retry-After': str(max(1, math.ceil(rejected.retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+        
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+def _query_param(scope: Scope, name: str) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+    return values[0] if values else None
+
+
+# Intake admission (per API instance)
+intake_admission = AdmissionController(
+    global_rate=settings.INTAKE_GLOBAL_RATE,
+    global_burst=settings.INTAKE_GLOBAL_BURST,
+    qr_rate=settings.INTAKE_QR_RATE,
+    qr_burst=settings.INTAKE_QR_BURST,
+    submit_reserve=settings.INTAKE_SUBMIT_RESERVE,
+    max_concurrency=settings.INTAKE_MAX_CONCURRENCY,
+    max_queue=settings.INTAKE_MAX_QUEUE,
+    queue_timeout=settings.INTAKE_QUEUE_TIMEOUT_SECONDS
+)
@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     # API settings
     API_V1_PREFIX: str = "/api/v1"
     
+    # Production server (python -m app.serve)
+    PORT: int = 8080
+    SERVER_WORKERS: int = 0  # 0 = one per available CPU
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 8  # Cloud Run kills 10s after SIGTERM
+    SERVER_BACKLOG: int = 2048
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -37,19 +43,88 @@ class Settings(BaseSettings):
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
     TWILIO_PHONE_NUMBER: str = ""
+    TWILIO_API_BASE_URL: str = "https://api.twilio.com"
+    TWILIO_SMS_RATE: float = 1.0  # messages/second (one long code)
     
     # SendGrid (Email)
     SENDGRID_API_KEY: str = ""
     SENDGRID_FROM_EMAIL: str = ""
+    SENDGRID_API_BASE_URL: str = "https://api.sendgrid.com"
+    SENDGRID_REQUEST_RATE: float = 10.0  # mail/send requests/second
+    SENDGRID_BATCH_WINDOW_SECONDS: float = 0.05
     
-    # Redis (optional for Phase 0)
+    # Redis (optional for Phase 0): shared cache tier across instances, and
+    # Idempotency-Key collapsing across worker processes
     REDIS_URL: str = ""
+    SHARED_CACHE_TTL_SECONDS: int = 300
+    SHARED_CACHE_PROGRESS_TTL_SECONDS: int = 60
+    
+    # Intake admission control (per instance; rates in requests/second)
+    INTAKE_GLOBAL_RATE: float = 50.0
+    INTAKE_GLOBAL_BURST: float = 100.0
+    INTAKE_QR_RATE: float = 5.0
+    INTAKE_QR_BURST: float = 20.0
+    INTAKE_SUBMIT_RESERVE: float = 0.25  # share of the global burst only submits may use
+    INTAKE_MAX_CONCURRENCY: int = 32
+    INTAKE_MAX_QUEUE: int = 128
+    INTAKE_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    
+    # Background job queue (post-intake side effects)
+    JOB_QUEUE_WORKERS: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    JOB_MAX_ATTEMPTS: int = 5
+    
+    # Idempotency-Key results for retried intake submissions
+    IDEMPOTENCY_TTL_SECONDS: int = 3600
+    
+    # Responses larger than this are brotli/gzip compressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Document version stamps for ETags (bounds cross-instance staleness)
+    VERSION_STAMP_TTL_SECONDS: int = 30
+    
+    # Caseworker queue SSE stream
+    QUEUE_STREAM_REPLAY_SIZE: int = 500
+    QUEUE_STREAM_HEARTBEAT_SECONDS: int = 15
+    
+    # Live action queue cache (Firestore snapshot listeners)
+    QUEUE_CACHE_ENABLED: bool = False
+    QUEUE_CACHE_IDLE_SECONDS: int = 600
+    QUEUE_CACHE_MAX_LISTENERS: int = 500
+    
+    # Columnar client snapshot for analytics (loads every client once per process)
+    CLIENT_SNAPSHOT_ENABLED: bool = False
+    CLIENT_SNAPSHOT_POLL_SECONDS: float = 10.0
+    
+    # Coordinated entry by-name list: an index on the client snapshot, which
+    # a process loads on its first by-name list request (client counts keep
+    # reading Firestore unless CLIENT_SNAPSHOT_ENABLED)
+    BY_NAME_LIST_ENABLED: bool = True
+    
+    # Client documents: flat (clients), dual (flat plus per-organization
+    # copies, while migrating) or partitioned (organizations/{org}/clients)
+    CLIENT_STORAGE: str = "flat"
+    
+    # Duplicate intake detection: off, flag (caseworker review) or merge
+    DEDUP_POLICY: str = "flag"
+    DEDUP_FLAG_SCORE: float = 0.7
+    DEDUP_MERGE_SCORE: float = 0.95
+    DEDUP_MAX_CANDIDATES: int = 50
+    
+    # City dashboard response cache
+    CITY_CACHE_TTL_SECONDS: int = 30
+    CITY_CACHE_STALE_SECONDS: int = 300
     
     # Security
     SECRET_KEY: str
+    ADMIN_TOKEN: str = ""  # X-Admin-Token for /admin endpoints (disabled if empty)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 1 week
     
+    # Admin profiling endpoints (per worker process)
+    PROFILE_MAX_SECONDS: int = 60
+    MEMORY_TRACE_MAX_SECONDS: int = 600
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,44 @@
+"""
+ETag helpers for conditional GET
+"""
+
+from typing import Dict
+import hashlib
+
+from fastapi.responses import Response
+
+# Clients must revalidate every time, but may keep the body
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: str) -> str:
+    """Strong ETag derived from version components"""
+    digest = hashlib.sha1("\x1f".join(parts).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the validator"""
+    return Response(status_code=304, headers=etag_headers(etag))
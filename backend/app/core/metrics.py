@@ -0,0 +1,380 @@
+"""
+Prometheus metrics
+Counters, gauges and histograms rendered in the Prometheus text format
+(0.0.4), and pure ASGI middleware recording per-route request metrics
+
+- Recording is a few dict lookups and additions, cheap enough to leave
+  on for every request
+- Firestore RPCs are counted at the generated API client, so every call
+  counts once whichever helper made it, and are attributed to the
+  current request through a context variable
+- Service stats dicts (job queue, admission, caches) are read at scrape
+  time: point-in-time values as gauges, only the keys named as
+  counters as monotonic _total counters
+
+Metrics are per process: with several server workers a scrape through
+the load balancer reports the worker that answered it.
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Starlette appends the charset for text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+CALL_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Firestore RPCs made by the current request ([count], shared with child tasks)
+_firestore_calls: ContextVar[Optional[List[int]]] = ContextVar('firestore_calls', default=None)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Metric family with a fixed set of label names"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+    
+    def _render_samples(self) -> Iterable[str]:
+        return ()
+
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+    
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def _render_samples(self) -> Iterable[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+    
+    def set(self, value: float, labels: Labels = ()):
+        self._values[labels] = value
+    
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+    
+    def _render_samples(self) -> Iterable[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram; per series: bucket counts, +Inf count, sum"""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+    
+    def observe(self, value: float, labels: Labels = ()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def _render_samples(self) -> Iterable[str]:
+        bucket_names = self.labelnames + ("le",)
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(bucket_names, labels + (bound,))} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(series[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class StatsCollector(Metric):
+    """
+    Exports a service's stats dict at scrape time (one family per key)
+    Keys are gauges unless listed in counters: a value that can go down
+    exported as a counter breaks rate() and reset detection
+    """
+    
+    def __init__(
+        self,
+        prefix: str,
+        source: Callable[[], Dict[str, Any]],
+        counters: Sequence[str] = ()
+    ):
+        super().__init__(prefix, "")
+        self.source = source
+        self.counters = set(counters)
+    
+    def render(self) -> List[str]:
+        try:
+            stats = self.source()
+        except Exception as e:
+            logger.warning(f"Metrics collector {self.name} failed: {e}")
+            return []
+        
+        lines = []
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                # Nested numbers (e.g. latency percentiles): one gauge, labeled
+                name = f"{self.name}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, (int, float)) and not isinstance(sub_value, bool):
+                        lines.append(f'{name}{{key="{_escape(str(sub_key))}"}} {_format_value(sub_value)}')
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in self.counters:
+                name, kind = f"{self.name}_{key}_total", "counter"
+            else:
+                name, kind = f"{self.name}_{key}", "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """Metric families rendered together for /metrics"""
+    
+    def __init__(self):
+        self._metrics: List[Metric] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def register_stats(
+        self,
+        prefix: str,
+        source: Callable[[], Dict[str, Any]],
+        counters: Sequence[str] = ()
+    ):
+        """Numeric values of source() as gauges (counters for the listed keys)"""
+        self.register(StatsCollector(prefix, source, counters))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the built-in families
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size (after compression)",
+    ("method", "route"), buckets=SIZE_BUCKETS
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests being served"
+)
+http_request_firestore_calls = registry.histogram(
+    "http_request_firestore_calls", "Firestore RPCs per HTTP request",
+    ("method", "route"), buckets=CALL_BUCKETS
+)
+firestore_rpcs = registry.counter(
+    "firestore_rpcs_total", "Firestore RPCs by API method", ("method",)
+)
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "Delay of a periodic event loop timer", buckets=LAG_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route counts, latency, sizes and Firestore calls"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        calls = [0]
+        token = _firestore_calls.set(calls)
+        status_code = 500
+        size = 0
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            _firestore_calls.reset(token)
+            
+            # Route template, not the raw path (bounded label values)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            http_requests.inc(labels + (str(status_code),))
+            http_request_duration.observe(time.perf_counter() - started, labels)
+            http_response_size.observe(size, labels)
+            http_request_firestore_calls.observe(calls[0], labels)
+
+
+def count_firestore_call(method: str):
+    """Record one Firestore RPC (globally and for the current request)"""
+    firestore_rpcs.inc((method,))
+    calls = _firestore_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+# Unary and server-streaming RPCs used by the Firestore client (listen is
+# a long-lived stream and is not counted)
+FIRESTORE_METHODS = (
+    'batch_get_documents', 'batch_write', 'begin_transaction', 'commit',
+    'create_document', 'delete_document', 'get_document', 'list_collection_ids',
+    'list_documents', 'partition_query', 'rollback', 'run_aggregation_query',
+    'run_query', 'update_document',
+)
+
+
+def instrument_firestore():
+    """Count every RPC made through the generated Firestore API client (idempotent)"""
+    from google.cloud.firestore_v1.services.firestore.client import FirestoreClient
+    
+    if getattr(FirestoreClient, '_home_instrumented', False):
+        return
+    
+    def wrap(method_name: str):
+        original = getattr(FirestoreClient, method_name)
+        
+        @wraps(original)
+        def counted(self, *args, **kwargs):
+            count_firestore_call(method_name)
+            return original(self, *args, **kwargs)
+        
+        setattr(FirestoreClient, method_name, counted)
+    
+    for method_name in FIRESTORE_METHODS:
+        if hasattr(FirestoreClient, method_name):
+            wrap(method_name)
+    FirestoreClient._home_instrumented = True
+
+
+class EventLoopMonitor:
+    """Measures how late a periodic timer fires (blocking work on the loop)"""
+    
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            event_loop_lag.observe(max(loop.time() - expected, 0.0))
+
+
+event_loop_monitor = EventLoopMonitor()
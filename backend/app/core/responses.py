@@ -0,0 +1,50 @@
+"""
+Fast JSON responses
+orjson serializes dicts, lists, datetimes, enums and numpy values natively;
+the fallback handles Firestore timestamps and Pydantic models
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not handle natively"""
+    # Firestore returns DatetimeWithNanoseconds, a datetime subclass
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """Default API response class"""
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """
+    Pre-serialized JSON (e.g. model_dump_json output)
+    Returning a Response skips FastAPI's response_model re-validation
+    """
+    media_type = "application/json"
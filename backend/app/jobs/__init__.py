@@ -0,0 +1 @@
+# Background jobs (run as separate worker processes)
@@ -0,0 +1,70 @@
+"""
+Duplicate detection backfill
+Writes dedup_keys (blocking keys) on clients created before duplicate
+detection, so new intakes can find them. New and updated clients get
+their keys on write; this only runs once per migration:
+    python -m app.jobs.backfill_dedup_keys
+    python -m app.jobs.backfill_dedup_keys --force  # recompute every client
+"""
+
+import argparse
+import logging
+
+from app.services.client_store import client_store, merge_fields
+from app.services.database import db_service
+from app.services.dedup import IDENTITY_FIELDS, duplicate_detector
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 400
+
+
+def backfill_dedup_keys(db, force: bool = False) -> int:
+    """One projected scan of clients; returns clients updated"""
+    query = client_store.query(db).select([*IDENTITY_FIELDS, 'dedup_keys', 'organization_id'])
+    
+    batch = db.batch()
+    pending = 0
+    scanned = 0
+    updated = 0
+    for doc in client_store.stream(query):
+        scanned += 1
+        data = doc.to_dict() or {}
+        keys = duplicate_detector.keys(data)
+        if not force and data.get('dedup_keys') == keys:
+            continue
+        
+        batch.update(doc.reference, {'dedup_keys': keys})
+        pending += 1
+        mirror = client_store.mirror(db, doc.id, data.get('organization_id'))
+        if mirror is not None:
+            batch.set(mirror, *merge_fields({'dedup_keys': keys}))
+            pending += 1
+        updated += 1
+        if pending >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    
+    logger.info(f"Backfilled dedup keys: {updated} of {scanned} clients updated")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write duplicate detection keys on existing clients")
+    parser.add_argument('--force', action='store_true',
+                        help="Rewrite keys even where they look current")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    backfill_dedup_keys(db_service.db, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
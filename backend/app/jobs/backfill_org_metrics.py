@@ -0,0 +1,104 @@
+"""
+Organization metrics backfill
+Rebuilds the status gauges in org_metrics (intakes, status_counts,
+zone_status_counts) from one projected scan of clients. Status changes
+move these counters by increments, so clients created before the
+counters existed would otherwise drive their old status negative on
+their first transition. Runs once per migration:
+    python -m app.jobs.backfill_org_metrics
+
+Only the gauges are replaced; response and placement sums keep their
+values. Transitions that land during the scan can leave a count off by
+one, so run it while intake is quiet. The daily snapshot job runs it
+first if it never ran
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+import argparse
+import logging
+
+from app.services.client_store import client_store
+from app.services.database import db_service
+
+logger = logging.getLogger(__name__)
+
+MARKER_COLLECTION = 'migrations'
+MARKER_ID = 'backfill_org_metrics'
+
+BATCH_SIZE = 400
+
+
+def backfill_org_metrics(db) -> int:
+    """One projected scan of clients; returns organizations written"""
+    query = client_store.query(db).select(['organization_id', 'zone', 'status'])
+    
+    metrics: Dict[str, Dict[str, Any]] = {}
+    scanned = 0
+    for doc in client_store.stream(query):
+        data = doc.to_dict() or {}
+        organization_id = data.get('organization_id')
+        if not organization_id:
+            continue
+        scanned += 1
+        status = data.get('status', 'intake')
+        zone = data.get('zone', 'default')
+        
+        org = metrics.setdefault(organization_id, {
+            'organization_id': organization_id,
+            'intakes': 0,
+            'status_counts': {},
+            'zone_status_counts': {}
+        })
+        org['intakes'] += 1
+        org['status_counts'][status] = org['status_counts'].get(status, 0) + 1
+        by_status = org['zone_status_counts'].setdefault(zone, {})
+        by_status[status] = by_status.get(status, 0) + 1
+    
+    # Replace the gauges wholesale, leave every other field as it is
+    fields = ['organization_id', 'intakes', 'status_counts', 'zone_status_counts', 'updated_at']
+    now = datetime.utcnow()
+    batch = db.batch()
+    pending = 0
+    for organization_id, data in metrics.items():
+        batch.set(
+            db.collection('org_metrics').document(organization_id),
+            {**data, 'updated_at': now},
+            merge=fields
+        )
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    
+    db.collection(MARKER_COLLECTION).document(MARKER_ID).set({
+        'completed_at': now,
+        'clients': scanned,
+        'organizations': len(metrics)
+    })
+    logger.info(f"Backfilled org metrics: {scanned} clients, {len(metrics)} organizations")
+    return len(metrics)
+
+
+def backfilled(db) -> bool:
+    """Whether the backfill has completed once"""
+    return db.collection(MARKER_COLLECTION).document(MARKER_ID).get().exists
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild org_metrics status counters from clients")
+    parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    backfill_org_metrics(db_service.db)
+
+
+if __name__ == "__main__":
+    main()
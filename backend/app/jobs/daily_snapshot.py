@@ -0,0 +1,100 @@
+"""
+Daily metrics snapshot job
+Copies the live per-organization counters (org_metrics) into one compact
+document per day, metrics_daily/{YYYY-MM-DD}, which the time-series
+endpoint and dashboard trends read instead of raw clients
+
+Idempotent per day, so it can run on any schedule:
+    python -m app.jobs.daily_snapshot                  # snapshot today
+    python -m app.jobs.daily_snapshot --interval 3600  # long-lived worker
+    python -m app.jobs.daily_snapshot --backfill       # rebuild counters first
+
+The first run rebuilds the counters from clients (backfill_org_metrics)
+unless that already ran, so series never start from counters missing
+the clients created before them
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+import argparse
+import logging
+import time
+
+from app.jobs.backfill_org_metrics import backfill_org_metrics, backfilled
+from app.services.database import db_service
+
+logger = logging.getLogger(__name__)
+
+# Cumulative counters copied per organization (deltas give daily flows)
+CUMULATIVE_FIELDS = ('intakes', 'placement_count', 'actions_completed')
+
+
+def take_snapshot(db, day: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write metrics_daily/{day}
+    
+    counts: {organization_id: {zone: {status: count}}}, non-zero gauges only
+    totals: {organization_id: {intakes, placement_count, actions_completed}}
+    """
+    day = day or datetime.utcnow().strftime('%Y-%m-%d')
+    
+    counts = {}
+    totals = {}
+    rows = 0
+    for doc in db.collection('org_metrics').stream():
+        data = doc.to_dict()
+        organization_id = data.get('organization_id', doc.id)
+        
+        for zone, by_status in (data.get('zone_status_counts') or {}).items():
+            for status, count in by_status.items():
+                if count:
+                    counts.setdefault(organization_id, {}).setdefault(zone, {})[status] = count
+                    rows += 1
+        
+        totals[organization_id] = {
+            field: data.get(field, 0) for field in CUMULATIVE_FIELDS
+        }
+    
+    snapshot = {
+        'date': day,
+        'counts': counts,
+        'totals': totals,
+        'taken_at': datetime.utcnow()
+    }
+    db.collection('metrics_daily').document(day).set(snapshot)
+    
+    logger.info(f"Metrics snapshot written: {day} ({rows} rows, {len(totals)} orgs)")
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily metrics snapshot worker")
+    parser.add_argument('--date', default=None, help="Snapshot date (YYYY-MM-DD)")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Seconds between runs (0 = run once)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Rebuild org_metrics status counters from clients first")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    if args.backfill or not backfilled(db_service.db):
+        backfill_org_metrics(db_service.db)
+    
+    while True:
+        try:
+            take_snapshot(db_service.db, args.date)
+        except Exception as e:
+            logger.error(f"Metrics snapshot failed: {e}", exc_info=True)
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
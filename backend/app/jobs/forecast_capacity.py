@@ -0,0 +1,179 @@
+"""
+Capacity forecast job
+Forecasts intake volume per zone and acuity from the daily intake
+counters and stores the result in forecasts/capacity, which
+/city/predictive/capacity serves as-is
+
+Runs in its own worker process, never inside the API:
+    python -m app.jobs.forecast_capacity                 # single run
+    python -m app.jobs.forecast_capacity --interval 3600 # long-lived worker
+    python -m app.jobs.forecast_capacity --backfill      # rebuild counters first
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+import argparse
+import logging
+import time
+
+from app.services.client_store import client_store
+from app.services.database import db_service
+from app.services.forecasting import (
+    build_history_matrix,
+    holt_winters_forecast,
+    summarize_forecast,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DAYS = 3 * 365
+DEFAULT_HORIZON_DAYS = 30
+
+
+def load_daily_counts(
+    db,
+    start: datetime,
+    end: datetime
+) -> Dict[str, Dict[Tuple[str, str], int]]:
+    """Read intake_counts documents for [start, end] (one doc per day)"""
+    query = db.collection('intake_counts')
+    query = query.where('date', '>=', start.strftime('%Y-%m-%d'))
+    query = query.where('date', '<=', end.strftime('%Y-%m-%d'))
+    
+    daily_counts: Dict[str, Dict[Tuple[str, str], int]] = {}
+    for doc in query.stream():
+        data = doc.to_dict()
+        counts = daily_counts.setdefault(data['date'], {})
+        for zone, by_acuity in (data.get('counts') or {}).items():
+            for acuity, count in by_acuity.items():
+                counts[(zone, acuity)] = count
+    
+    return daily_counts
+
+
+def backfill_intake_counts(db) -> int:
+    """
+    Rebuild intake_counts from existing clients
+    One projected scan of clients, only for the initial migration
+    """
+    zones = {
+        doc.id: (doc.to_dict() or {}).get('zone', 'default')
+        for doc in db.collection('qr_codes').stream()
+    }
+    
+    query = client_store.query(db).select(
+        ['created_at', 'zone', 'qr_code', 'vi_spdat_score.acuity_level']
+    )
+    
+    days: Dict[str, Dict[str, Dict[str, int]]] = {}
+    scanned = 0
+    for doc in client_store.stream(query):
+        data = doc.to_dict()
+        if not data.get('created_at'):
+            continue
+        scanned += 1
+        day = data['created_at'].strftime('%Y-%m-%d')
+        zone = data.get('zone') or zones.get(data.get('qr_code'), 'default')
+        acuity = (data.get('vi_spdat_score') or {}).get('acuity_level', 'unknown')
+        by_acuity = days.setdefault(day, {}).setdefault(zone, {})
+        by_acuity[acuity] = by_acuity.get(acuity, 0) + 1
+    
+    batch = db.batch()
+    pending = 0
+    for day, counts in days.items():
+        batch.set(
+            db.collection('intake_counts').document(day),
+            {
+                'date': day,
+                'total': sum(c for by_acuity in counts.values() for c in by_acuity.values()),
+                'counts': counts
+            }
+        )
+        pending += 1
+        if pending == 400:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    
+    logger.info(f"Backfilled intake counts: {scanned} clients, {len(days)} days")
+    return len(days)
+
+
+def run_forecast(
+    db,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    horizon_days: int = DEFAULT_HORIZON_DAYS
+) -> Dict[str, object]:
+    """Fit the forecast and write forecasts/capacity"""
+    started = time.perf_counter()
+    end = datetime.utcnow() - timedelta(days=1)  # last complete day
+    start = end - timedelta(days=history_days - 1)
+    
+    daily_counts = load_daily_counts(db, start, end)
+    days = [
+        (start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(history_days)
+    ]
+    
+    # Trim leading days before the first recorded intake
+    first_day = min(daily_counts) if daily_counts else days[-1]
+    days = [day for day in days if day >= first_day]
+    
+    keys, history = build_history_matrix(daily_counts, days)
+    forecast, residual_std = holt_winters_forecast(history, horizon_days)
+    
+    result = {
+        'generated_at': datetime.utcnow(),
+        'model': 'holt_winters_additive_damped',
+        'history': {
+            'start': days[0],
+            'end': days[-1],
+            'days': len(days),
+            'series': len(keys)
+        },
+        'horizon_days': horizon_days,
+        'forecast_start': (end + timedelta(days=1)).strftime('%Y-%m-%d'),
+        **summarize_forecast(keys, forecast, residual_std)
+    }
+    db.collection('forecasts').document('capacity').set(result)
+    
+    logger.info(
+        f"Capacity forecast written: {len(keys)} series, {len(days)} days, "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intake capacity forecast worker")
+    parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_DAYS)
+    parser.add_argument('--horizon-days', type=int, default=DEFAULT_HORIZON_DAYS)
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Seconds between runs (0 = run once)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Rebuild intake_counts from clients before forecasting")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    if args.backfill:
+        backfill_intake_counts(db_service.db)
+    
+    while True:
+        try:
+            run_forecast(db_service.db, args.history_days, args.horizon_days)
+        except Exception as e:
+            logger.error(f"Capacity forecast failed: {e}", exc_info=True)
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
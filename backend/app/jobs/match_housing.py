@@ -0,0 +1,165 @@
+"""
+Housing matching job
+Matches assessed clients to open units in housing_resources with the
+matching engine and records each match: client status matched with
+matched_housing_id, one unit taken from the resource, and an action
+item for the caseworker
+
+Runs in its own worker process, never inside the API:
+    python -m app.jobs.match_housing                # single batch run
+    python -m app.jobs.match_housing --interval 30  # long-lived worker
+    python -m app.jobs.match_housing --dry-run      # log matches, write nothing
+
+The long-lived worker loads clients and resources once, then polls both
+by updated_at: newly assessed clients and units that open are matched as
+they appear. Whatever changes available_beds must also set updated_at
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+import argparse
+import asyncio
+import logging
+import time
+
+from app.services.client_store import client_store
+from app.services.database import db_service
+from app.services.matching import CLIENT_FIELDS, Match, MatchingEngine, Resource, WaitingClient
+
+logger = logging.getLogger(__name__)
+
+
+class MatchingWorker:
+    """Matching engine kept in step with Firestore"""
+    
+    def __init__(self, db, overlap_seconds: float = 5.0, dry_run: bool = False):
+        self.db = db
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.dry_run = dry_run
+        self.engine = MatchingEngine()
+        self._since = None
+    
+    def load(self) -> List[Match]:
+        """Every resource and waiting client, matched in priority order"""
+        started = time.perf_counter()
+        # Changes that land during the load are picked up by the first poll
+        self._since = datetime.utcnow()
+        
+        for doc in self.db.collection('housing_resources').stream():
+            self._apply_resource(doc.id, doc.to_dict() or {}, fill=False)
+        
+        query = client_store.query(self.db).where('status', '==', 'assessed')
+        clients = []
+        for doc in client_store.stream(query.select(CLIENT_FIELDS)):
+            client = WaitingClient.from_doc(doc.id, doc.to_dict() or {})
+            if client is not None:
+                clients.append(client)
+        
+        matches = self.engine.match_all(clients)
+        logger.info(
+            f"Matching loaded {len(self.engine.resources)} resources, {len(clients)} waiting clients: "
+            f"{len(matches)} matches in {time.perf_counter() - started:.2f}s"
+        )
+        return matches
+    
+    def poll(self) -> List[Match]:
+        """Apply resources and clients changed since the last poll"""
+        since = self._since - self.overlap
+        self._since = datetime.utcnow()
+        matches = []
+        
+        query = self.db.collection('housing_resources').where('updated_at', '>=', since)
+        for doc in query.stream():
+            matches.extend(self._apply_resource(doc.id, doc.to_dict() or {}))
+        
+        query = client_store.query(self.db).where('updated_at', '>=', since)
+        for doc in client_store.stream(query.select(CLIENT_FIELDS)):
+            client = WaitingClient.from_doc(doc.id, doc.to_dict() or {})
+            if client is None:
+                self.engine.remove_client(doc.id)
+            else:
+                matches.extend(self.engine.add_client(client))
+        return matches
+    
+    def _apply_resource(self, resource_id: str, data: dict, fill: bool = True) -> List[Match]:
+        if data.get('active') is False:
+            self.engine.remove_resource(resource_id)
+            return []
+        return self.engine.set_resource(Resource.from_doc(resource_id, data), fill=fill)
+    
+    def _reload(self, match: Match) -> List[Match]:
+        """Resource and client of an unwritten match as Firestore has them now"""
+        doc = self.db.collection('housing_resources').document(match.resource_id).get()
+        if doc.exists:
+            matches = self._apply_resource(doc.id, doc.to_dict() or {})
+        else:
+            self.engine.remove_resource(match.resource_id)
+            matches = []
+        
+        doc = client_store.document(self.db, match.client_id).get(field_paths=CLIENT_FIELDS)
+        client = WaitingClient.from_doc(match.client_id, doc.to_dict() or {}) if doc.exists else None
+        if client is not None:
+            matches.extend(self.engine.add_client(client))
+        return matches
+    
+    async def record(self, matches: List[Match]) -> int:
+        """
+        Write matches; a match that can't be written (client no longer
+        waiting, or the unit taken meanwhile) reloads both from Firestore,
+        so the unit goes to another client or the client waits again
+        """
+        pending = list(matches)
+        recorded = 0
+        while pending:
+            match = pending.pop(0)
+            resource = self.engine.resources.get(match.resource_id)
+            if self.dry_run:
+                logger.info(f"Would match client {match.client_id} (score {match.score}) to {match.resource_id}")
+                recorded += 1
+                continue
+            
+            if await db_service.record_housing_match(
+                match.client_id,
+                match.resource_id,
+                resource.name if resource else ""
+            ):
+                recorded += 1
+            else:
+                logger.info(f"Match skipped, client {match.client_id} or resource {match.resource_id} changed")
+                pending.extend(self._reload(match))
+        
+        if matches:
+            logger.info(f"Recorded {recorded} housing matches ({self.engine.status()})")
+        return recorded
+
+
+async def run(interval: int, dry_run: bool):
+    worker = MatchingWorker(db_service.db, dry_run=dry_run)
+    await worker.record(worker.load())
+    
+    while interval:
+        await asyncio.sleep(interval)
+        try:
+            await worker.record(worker.poll())
+        except Exception as e:
+            logger.error(f"Housing matching poll failed: {e}", exc_info=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Housing matching worker")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Seconds between polls for changes (0 = run once)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Log matches without writing them")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    asyncio.run(run(args.interval, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
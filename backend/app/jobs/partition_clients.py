@@ -0,0 +1,239 @@
+"""
+Client partitioning migration
+Moves clients from the flat clients collection to
+organizations/{org}/clients while the API keeps serving:
+
+1. Deploy with CLIENT_STORAGE=dual (every write reaches both places)
+2. python -m app.jobs.partition_clients copy     # resumable, online
+3. python -m app.jobs.partition_clients verify   # read-only
+4. Create the collection group indexes (client_id, updated_at, status,
+   dedup_keys and the composite ones), deploy with
+   CLIENT_STORAGE=partitioned
+5. python -m app.jobs.partition_clients cleanup  # deletes flat copies
+
+copy pages through the flat collection by document id and checkpoints
+its position in migrations/partition_clients after every page, so it can
+be stopped and rerun at any time (--restart starts over). After a page
+is written its clients are read again, and any written since the copy
+read them are copied again: a write racing the copy is never replaced
+by an older version. Status events are append-only and copied as is
+
+Clients without an organization can't be partitioned; copy and verify
+count them and cleanup leaves them in place
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import argparse
+import logging
+import time
+
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.core.config import settings
+from app.services.client_store import CLIENTS, DUAL, PARTITIONED, partition
+from app.services.database import STATUS_EVENTS, db_service
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = 'migrations'
+CHECKPOINT_ID = 'partition_clients'
+
+# Writes per commit (Firestore allows 500)
+BATCH_SIZE = 400
+
+
+class _Writes:
+    """Write batch committed every BATCH_SIZE writes"""
+    
+    def __init__(self, db):
+        self.db = db
+        self.batch = db.batch()
+        self.pending = 0
+    
+    def set(self, reference, data):
+        self.batch.set(reference, data)
+        self._added()
+    
+    def delete(self, reference):
+        self.batch.delete(reference)
+        self._added()
+    
+    def _added(self):
+        self.pending += 1
+        if self.pending >= BATCH_SIZE:
+            self.commit()
+    
+    def commit(self):
+        if self.pending:
+            self.batch.commit()
+            self.batch = self.db.batch()
+            self.pending = 0
+
+
+class ClientPartitioner:
+    """Copies flat client documents into their organization's partition"""
+    
+    def __init__(self, db, page_size: int = 200, pause_seconds: float = 0.5):
+        self.db = db
+        self.page_size = page_size
+        self.pause = pause_seconds
+        self.checkpoint = db.collection(CHECKPOINT_COLLECTION).document(CHECKPOINT_ID)
+    
+    def copy(self, restart: bool = False) -> Dict[str, int]:
+        """Copy every flat client (and its status events), from the checkpoint on"""
+        state = {} if restart else (self.checkpoint.get().to_dict() or {})
+        if state.get('completed_at'):
+            logger.info("Client copy already completed (--restart to copy again)")
+            return state
+        
+        counts = {name: state.get(name, 0) for name in ('copied', 'recopied', 'events', 'skipped')}
+        for docs in self._pages(state.get('last_id')):
+            self._copy_page(docs, counts)
+            self.checkpoint.set({**counts, 'last_id': docs[-1].id, 'updated_at': datetime.utcnow()})
+            logger.info(f"Copied clients up to {docs[-1].id}: {counts}")
+            time.sleep(self.pause)
+        
+        self.checkpoint.set({'completed_at': datetime.utcnow()}, merge=True)
+        logger.info(f"Client copy complete: {counts}")
+        return counts
+    
+    def verify(self) -> Dict[str, int]:
+        """Flat clients whose partitioned copy is missing or older"""
+        counts = {'clients': 0, 'missing': 0, 'stale': 0, 'skipped': 0}
+        for docs in self._pages():
+            counts['clients'] += len(docs)
+            for doc, copy in self._with_copies(docs, counts):
+                if copy is None or not copy.exists:
+                    counts['missing'] += 1
+                    logger.warning(f"Client {doc.id} has no partitioned copy")
+                elif (copy.to_dict() or {}).get('updated_at') != (doc.to_dict() or {}).get('updated_at'):
+                    counts['stale'] += 1
+                    logger.warning(f"Client {doc.id} partitioned copy is out of date")
+            time.sleep(self.pause)
+        
+        logger.info(f"Verified client partitions: {counts}")
+        return counts
+    
+    def cleanup(self) -> Dict[str, int]:
+        """Delete flat clients (and their status events) that have a partitioned copy"""
+        counts = {'deleted': 0, 'events': 0, 'kept': 0, 'skipped': 0}
+        for docs in self._pages():
+            writes = _Writes(self.db)
+            for doc, copy in self._with_copies(docs, counts):
+                if copy is None or not copy.exists:
+                    counts['kept'] += 1
+                    continue
+                for event in doc.reference.collection(STATUS_EVENTS).stream():
+                    writes.delete(event.reference)
+                    counts['events'] += 1
+                writes.delete(doc.reference)
+                counts['deleted'] += 1
+            writes.commit()
+            logger.info(f"Deleted flat clients up to {docs[-1].id}: {counts}")
+            time.sleep(self.pause)
+        
+        logger.info(f"Flat client cleanup complete: {counts}")
+        return counts
+    
+    def _pages(self, after: Optional[str] = None) -> Iterator[List]:
+        """Flat client documents in document id order, one page at a time"""
+        collection = self.db.collection(CLIENTS)
+        while True:
+            query = collection.order_by(FieldPath.document_id()).limit(self.page_size)
+            if after is not None:
+                query = query.start_after({FieldPath.document_id(): after})
+            docs = list(query.stream())
+            if docs:
+                yield docs
+            if len(docs) < self.page_size:
+                return
+            after = docs[-1].id
+    
+    def _copy_page(self, docs: List, counts: Dict[str, int]):
+        writes = _Writes(self.db)
+        versions = {}
+        pending = []
+        for doc in docs:
+            if not (doc.to_dict() or {}).get('organization_id'):
+                counts['skipped'] += 1
+                logger.warning(f"Client {doc.id} has no organization, not partitioned")
+                continue
+            pending.append(doc)
+        counts['copied'] += len(pending)
+        
+        copied = list(pending)
+        while pending:
+            for doc in pending:
+                data = doc.to_dict() or {}
+                target = partition(self.db, data['organization_id']).document(doc.id)
+                writes.set(target, {**data, 'client_id': doc.id})
+                versions[doc.id] = doc.update_time
+            writes.commit()
+            
+            # Written since read: the dual write may have landed under the copy
+            current = self.db.get_all([doc.reference for doc in pending])
+            pending = [
+                doc for doc in current
+                if doc.exists and doc.update_time != versions[doc.id]
+            ]
+            counts['recopied'] += len(pending)
+        
+        for doc in copied:
+            target = partition(self.db, doc.to_dict()['organization_id']).document(doc.id)
+            for event in doc.reference.collection(STATUS_EVENTS).stream():
+                writes.set(target.collection(STATUS_EVENTS).document(event.id), event.to_dict())
+                counts['events'] += 1
+        writes.commit()
+    
+    def _with_copies(self, docs: List, counts: Dict[str, int]):
+        """(flat document, partitioned copy) pairs in one batched read"""
+        targets = {}
+        for doc in docs:
+            organization_id = (doc.to_dict() or {}).get('organization_id')
+            if organization_id:
+                targets[doc.id] = partition(self.db, organization_id).document(doc.id)
+            else:
+                counts['skipped'] += 1
+        
+        copies = {}
+        if targets:
+            copies = {copy.id: copy for copy in self.db.get_all(list(targets.values()))}
+        return [(doc, copies.get(doc.id)) for doc in docs if doc.id in targets]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move clients into per-organization collections")
+    parser.add_argument('command', choices=['copy', 'verify', 'cleanup'])
+    parser.add_argument('--page-size', type=int, default=200,
+                        help="Clients per page (one checkpoint per page)")
+    parser.add_argument('--pause', type=float, default=0.5,
+                        help="Seconds between pages, to leave Firestore capacity for the API")
+    parser.add_argument('--restart', action='store_true',
+                        help="copy: ignore the checkpoint and copy every client again")
+    args = parser.parse_args()
+    
+    # Copying outside dual mode loses writes made during the copy (or,
+    # once partitioned, overwrites newer copies); cleanup deletes what
+    # flat and dual mode still read
+    if args.command == 'copy' and settings.CLIENT_STORAGE != DUAL:
+        parser.error("copy runs with CLIENT_STORAGE=dual (deployed to every instance first)")
+    if args.command == 'cleanup' and settings.CLIENT_STORAGE != PARTITIONED:
+        parser.error("cleanup runs with CLIENT_STORAGE=partitioned (deployed to every instance first)")
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    partitioner = ClientPartitioner(db_service.db, page_size=args.page_size, pause_seconds=args.pause)
+    if args.command == 'copy':
+        partitioner.copy(restart=args.restart)
+    elif args.command == 'verify':
+        partitioner.verify()
+    else:
+        partitioner.cleanup()
+
+
+if __name__ == "__main__":
+    main()
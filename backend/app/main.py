@@ -5,13 +5,34 @@ FastAPI Main Application
 This is the central API server for the H.O.M.E. platform.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 import logging
 
 from app.core.config import settings
+from app.core.admission import START, SUBMIT, AdmissionMiddleware, intake_admission
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    event_loop_monitor,
+    instrument_firestore,
+    registry,
+)
+from app.core.responses import ORJSONResponse
 from app.api.v1 import api_router
+from app.services.by_name_list import by_name_list
+from app.services.client_snapshot import client_snapshot
+from app.services.client_store import client_store
+from app.services.database import db_service
+from app.services.idempotency import intake_idempotency
+from app.services.job_queue import job_queue
+from app.services.notifications import notifications
+from app.services.queue_events import queue_events
+from app.services.response_cache import city_cache
+from app.services.shared_cache import shared_cache
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +41,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect shared services on startup, release them on shutdown"""
+    await shared_cache.connect()
+    await job_queue.start(db_service.db)
+    if settings.CLIENT_SNAPSHOT_ENABLED:
+        await client_snapshot.start(db_service.db)
+    event_loop_monitor.start()
+    yield
+    
+    await event_loop_monitor.stop()
+    await client_snapshot.stop()
+    
+    # Drain queued jobs; anything unfinished is recovered from the backlog
+    await job_queue.stop()
+    await notifications.close()
+    
+    # Close Firestore snapshot listeners
+    queue_events.close()
+    if db_service.queue_cache:
+        db_service.queue_cache.close()
+    await shared_cache.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="H.O.M.E. Platform API",
@@ -27,6 +73,18 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Intake admission control (inside CORS so rejections stay readable)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=intake_admission,
+    routes={
+        ("POST", "/api/v1/intake/start"): START,
+        ("POST", "/api/v1/intake/submit"): SUBMIT,
+    },
 )
 
 # CORS configuration
@@ -38,6 +96,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/gzip for larger responses (caseworker lists on cellular)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+)
+
+# Request metrics (outermost, so rejected and compressed responses count)
+app.add_middleware(MetricsMiddleware)
+
+# Firestore RPC counts, and service stats read at scrape time
+instrument_firestore()
+registry.register_stats(
+    "home_jobs",
+    job_queue.metrics,
+    counters=("enqueued", "completed", "failed", "retries", "overflowed", "recovered")
+)
+registry.register_stats(
+    "home_intake_admission",
+    lambda: {
+        **intake_admission.stats,
+        'in_flight': intake_admission.in_flight,
+        'queue_depth': intake_admission.queue_depth,
+    },
+    counters=("start_admitted", "start_shed", "submit_admitted", "submit_shed", "submit_queued")
+)
+registry.register_stats(
+    "home_idempotency",
+    lambda: intake_idempotency.stats,
+    counters=("executed", "replayed", "collapsed")
+)
+registry.register_stats(
+    "home_notifications",
+    lambda: notifications.stats,
+    counters=("sms_sent", "emails_sent", "email_requests", "errors", "throttled", "batch_splits")
+)
+registry.register_stats(
+    "home_shared_cache",
+    lambda: shared_cache.stats,
+    counters=("hits", "misses", "errors", "invalidations")
+)
+registry.register_stats(
+    "home_city_cache",
+    lambda: city_cache.stats,
+    counters=("hits", "stale_hits", "misses", "coalesced", "errors")
+)
+registry.register_stats(
+    "home_queue_cache",
+    lambda: db_service.queue_cache.stats if db_service.queue_cache else {},
+    counters=("hits", "misses", "evictions")
+)
+registry.register_stats(
+    "home_client_snapshot",
+    lambda: {**client_snapshot.status(), 'ready': int(client_snapshot.ready)},
+    counters=("polls", "poll_updates", "local_writes", "poll_errors")
+)
+registry.register_stats(
+    "home_client_store",
+    client_store.status,
+    counters=("lookups", "lookup_queries", "lookup_misses")
+)
+registry.register_stats(
+    "home_by_name_list",
+    lambda: {**by_name_list.status(), 'ready': int(by_name_list.ready)}
+)
+registry.register_stats(
+    "home_queue_stream",
+    lambda: {
+        'subscribers': queue_events.subscriber_count(),
+        'listeners': queue_events.listener_count()
+    }
+)
+
 
 @app.get("/")
 async def root():
@@ -56,10 +186,20 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected",  # TODO: Add actual DB check
-        "cache": "connected",      # TODO: Add Redis check
+        "cache": shared_cache.status,
+        "jobs": job_queue.metrics(),
+        "client_store": client_store.status(),
+        "client_snapshot": client_snapshot.status(),
+        "by_name_list": by_name_list.status(),
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (this worker process)"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -68,7 +208,7 @@ app.include_router(api_router, prefix="/api/v1")
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
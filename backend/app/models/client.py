@@ -109,6 +109,13 @@ class VISPDATScore(BaseModel):
     calculated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class DuplicateMatch(BaseModel):
+    """Existing client that may be the same person"""
+    client_id: str
+    score: float  # 0-1 (name similarity, date of birth, phone)
+    matched_on: List[str] = []
+
+
 class ClientCreate(ClientBase):
     """Data needed to create a new client"""
     qr_code: str  # QR code scanned for intake
@@ -144,6 +151,14 @@ class Client(ClientBase):
     matched_housing_id: Optional[str] = None
     housing_placed_at: Optional[datetime] = None
     
+    # Duplicate detection at intake
+    possible_duplicates: List[DuplicateMatch] = []
+    repeat_intakes: int = 0  # later intakes merged into this client
+    last_intake_at: Optional[datetime] = None
+    
+    # Status history projection: first time each status was entered
+    status_timeline: Dict[str, datetime] = {}
+    
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -155,6 +170,23 @@ class Client(ClientBase):
         from_attributes = True
 
 
+class ClientStatusEvent(BaseModel):
+    """One status transition (append-only history)"""
+    seq: int
+    from_status: Optional[ClientStatus] = None  # None for the intake event
+    to_status: ClientStatus
+    at: datetime
+    actor: Optional[str] = None  # caseworker who made the change
+
+
+class ClientTimeline(BaseModel):
+    """Status history of one client"""
+    client_id: str
+    status: ClientStatus
+    status_timeline: Dict[str, datetime] = {}
+    events: List[ClientStatusEvent]
+
+
 class ClientListResponse(BaseModel):
     """Paginated list of clients"""
     clients: List[Client]
@@ -166,6 +198,7 @@ class ClientListResponse(BaseModel):
 
 class ClientActionItem(BaseModel):
     """Action item for caseworker queue"""
+    id: Optional[str] = None  # Firestore document ID
     client_id: str
     client_name: str
     action_type: str  # "initial_contact", "follow_up", "document_needed", etc.
@@ -173,3 +206,10 @@ class ClientActionItem(BaseModel):
     due_date: Optional[datetime] = None
     description: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ClientActionItemUpdate(BaseModel):
+    """Action item fields a caseworker can change"""
+    priority: Optional[int] = Field(None, ge=1, le=5)
+    due_date: Optional[datetime] = None
+    description: Optional[str] = None
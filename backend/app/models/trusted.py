@@ -0,0 +1,58 @@
+"""
+Trusted read models for our own Firestore documents
+
+Documents were validated when they were written, so hot read paths
+validate each document exactly once (no Model(**doc) followed by
+response_model re-validation) and serialize straight to JSON bytes.
+The trusted variants also skip EmailStr checks, which dominate the
+per-row cost of Client validation.
+"""
+
+from typing import Any, Dict, List, Optional
+from pydantic import TypeAdapter
+
+from app.models.client import Client, ClientActionItem, ClientListResponse
+
+
+class TrustedClient(Client):
+    """Client as stored (email already validated on write)"""
+    email: Optional[str] = None
+
+
+class TrustedClientListResponse(ClientListResponse):
+    """Paginated list of stored clients"""
+    clients: List[TrustedClient]
+
+
+# Cached adapter for list responses without a wrapper model
+action_item_list_adapter = TypeAdapter(List[ClientActionItem])
+
+
+def client_json(doc: Dict[str, Any]) -> bytes:
+    """Serialize one client document as a Client response"""
+    return TrustedClient.model_validate(doc).model_dump_json().encode()
+
+
+def client_list_json(
+    docs: List[Dict[str, Any]],
+    total: int,
+    page: int,
+    page_size: int,
+    has_more: bool
+) -> bytes:
+    """Serialize a page of client documents as a ClientListResponse"""
+    response = TrustedClientListResponse.model_validate({
+        'clients': docs,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'has_more': has_more
+    })
+    return response.model_dump_json().encode()
+
+
+def action_items_json(docs: List[Dict[str, Any]]) -> bytes:
+    """Serialize action queue documents as a list of ClientActionItem"""
+    return action_item_list_adapter.dump_json(
+        action_item_list_adapter.validate_python(docs)
+    )
@@ -0,0 +1,123 @@
+"""
+Production server entry point
+Runs the API in a pool of uvicorn worker processes sized to the CPUs the
+container may actually use (affinity and cgroup quota, not the host's
+core count), with uvloop and httptools when available
+
+Each worker imports the app and creates its own Firestore client on
+startup. SIGTERM stops accepting connections, lets in-flight requests
+finish for SERVER_GRACEFUL_TIMEOUT_SECONDS, then runs the lifespan
+shutdown (job queue drain, listener and cache cleanup).
+
+Workers share nothing in memory: Idempotency-Key collapsing across them
+needs the shared cache (REDIS_URL)
+
+Usage:
+    python -m app.serve
+    SERVER_WORKERS=4 python -m app.serve
+"""
+
+from typing import Optional
+import importlib.util
+import logging
+import math
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of this container in cores, or None if unlimited"""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    
+    # cgroup v1
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    """
+    SERVER_WORKERS if set, else one worker per available CPU
+    Workers are single-threaded event loops, so more than one per core
+    only adds context switches
+    """
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    return available_cpus()
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    workers = worker_count()
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    logger.info(
+        f"Serving on port {settings.PORT}: {workers} workers "
+        f"(cpus={available_cpus()}, quota={cgroup_cpu_limit()}), loop={loop}, http={http}"
+    )
+    if workers > 1 and not settings.REDIS_URL:
+        logger.warning(
+            "REDIS_URL is not set: Idempotency-Key retries are only collapsed "
+            "within each worker, so concurrent duplicates on different workers "
+            "can both run (set REDIS_URL or SERVER_WORKERS=1)"
+        )
+    
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=settings.PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        # Cloud Run terminates TLS in front of the container
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        access_log=settings.DEBUG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Coordinated entry by-name list
+Assessed clients ranked per zone and housing type (the VI-SPDAT
+recommendation for their acuity): highest total score first, then
+longest waiting (since the VI-SPDAT assessment, else since intake),
+then client id, the order the housing matching engine serves them in
+(WaitingClient.priority)
+
+Kept on top of the client snapshot: rebuilt from its columns after the
+load and updated on every later score or status change, so pages and
+rank lookups never sort clients. The first by-name list request starts
+the snapshot when CLIENT_SNAPSHOT_ENABLED hasn't; until the load
+finishes there is no list to serve (the API answers 503), never a
+per-request scan
+
+Each list keeps one sorted bucket per score (0-17). A client's rank is
+the size of the higher buckets plus a binary search in its own bucket,
+and a page skips whole buckets by size
+"""
+
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import heapq
+import threading
+
+import numpy as np
+
+from app.services.client_snapshot import ACUITY_LEVELS, MISSING, STATUSES, client_snapshot
+from app.services.forecasting import ACUITY_HOUSING_TYPE
+
+MAX_SCORE = 17
+
+# (waiting since as epoch ms, client id): order within one score
+Entry = Tuple[int, str]
+# (zone, housing type)
+ListKey = Tuple[Optional[str], str]
+
+
+def waiting_since(assessed_at: int, created_at: int) -> int:
+    """Epoch ms a client has waited since, as WaitingClient.waiting_since"""
+    return assessed_at or created_at or 0
+
+
+def housing_type_for(acuity_level: Optional[str]) -> Optional[str]:
+    if acuity_level not in ACUITY_HOUSING_TYPE:
+        return None
+    return ACUITY_HOUSING_TYPE[acuity_level].value
+
+
+class RankedList:
+    """Clients of one zone and housing type in priority order"""
+    
+    def __init__(self):
+        self.buckets: List[List[Entry]] = [[] for _ in range(MAX_SCORE + 1)]
+        self.size = 0
+    
+    def add(self, score: int, entry: Entry):
+        insort(self.buckets[score], entry)
+        self.size += 1
+    
+    def remove(self, score: int, entry: Entry):
+        bucket = self.buckets[score]
+        i = bisect_left(bucket, entry)
+        if i < len(bucket) and bucket[i] == entry:
+            del bucket[i]
+            self.size -= 1
+    
+    def ahead(self, score: int, entry: Entry) -> int:
+        """Clients ranked before this entry"""
+        higher = sum(len(bucket) for bucket in self.buckets[score + 1:])
+        return higher + bisect_left(self.buckets[score], entry)
+
+
+class ByNameList:
+    """Ranked lists of assessed clients, one per (zone, housing type)"""
+    
+    def __init__(self):
+        self._lists: Dict[ListKey, RankedList] = {}
+        # client id -> (list key, score, entry)
+        self._entries: Dict[str, Tuple[ListKey, int, Entry]] = {}
+        self._lock = threading.Lock()
+        self.ready = False
+    
+    # -- updates --
+    
+    def rebuild(self, snapshot, columns: Dict[str, np.ndarray], ids: List[str]):
+        """All assessed clients from the snapshot columns (after its load)"""
+        assessed = STATUSES.index('assessed')
+        rows = np.flatnonzero(columns['status'] == assessed)
+        
+        lists: Dict[ListKey, RankedList] = {}
+        entries: Dict[str, Tuple[ListKey, int, Entry]] = {}
+        for row, zone, acuity, score, assessed_at, created_at in zip(
+            rows.tolist(),
+            columns['zone'][rows].tolist(),
+            columns['acuity'][rows].tolist(),
+            columns['total_score'][rows].tolist(),
+            columns['assessed_at'][rows].tolist(),
+            columns['created_at'][rows].tolist(),
+        ):
+            if acuity == MISSING:
+                continue
+            key = (
+                snapshot.zones.values[zone] if zone != MISSING else None,
+                housing_type_for(ACUITY_LEVELS[acuity])
+            )
+            score = min(max(score, 0), MAX_SCORE)
+            entry = (waiting_since(assessed_at, created_at), ids[row])
+            ranked = lists.get(key)
+            if ranked is None:
+                ranked = lists[key] = RankedList()
+            ranked.buckets[score].append(entry)
+            ranked.size += 1
+            entries[entry[1]] = (key, score, entry)
+        
+        for ranked in lists.values():
+            for bucket in ranked.buckets:
+                bucket.sort()
+        
+        with self._lock:
+            self._lists = lists
+            self._entries = entries
+            self.ready = True
+    
+    def changed(self, client_id: str, row: Dict[str, Any]):
+        """
+        Client changed (snapshot row): moves it within or between lists,
+        or off the list once no longer assessed
+        """
+        with self._lock:
+            self._remove(client_id)
+            housing_type = housing_type_for(row.get('acuity_level'))
+            if row.get('status') != 'assessed' or housing_type is None:
+                return
+            
+            key = (row.get('zone'), housing_type)
+            score = min(max(row.get('total_score') or 0, 0), MAX_SCORE)
+            entry = (waiting_since(row.get('assessed_at'), row.get('created_at')), client_id)
+            ranked = self._lists.get(key)
+            if ranked is None:
+                ranked = self._lists[key] = RankedList()
+            ranked.add(score, entry)
+            self._entries[client_id] = (key, score, entry)
+    
+    def _remove(self, client_id: str):
+        previous = self._entries.pop(client_id, None)
+        if previous is not None:
+            key, score, entry = previous
+            self._lists[key].remove(score, entry)
+    
+    # -- queries --
+    
+    def page(
+        self,
+        zone: Optional[str] = None,
+        housing_type: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Total and one page of the list for a zone and/or housing type
+        (either left out: lists merged in the same order)
+        """
+        with self._lock:
+            lists = [
+                (key, ranked) for key, ranked in self._lists.items()
+                if (zone is None or key[0] == zone)
+                and (housing_type is None or key[1] == housing_type)
+                and ranked.size
+            ]
+            total = sum(ranked.size for _, ranked in lists)
+            
+            results = []
+            rank = offset
+            for score in range(MAX_SCORE, -1, -1):
+                if len(results) >= limit:
+                    break
+                level = [(key, ranked.buckets[score]) for key, ranked in lists if ranked.buckets[score]]
+                level_size = sum(len(bucket) for _, bucket in level)
+                if offset >= level_size:
+                    offset -= level_size
+                    continue
+                
+                wanted = limit - len(results)
+                if len(level) == 1:
+                    key, bucket = level[0]
+                    items = [(entry, key) for entry in bucket[offset:offset + wanted]]
+                else:
+                    merged = heapq.merge(*[_tagged(bucket, key) for key, bucket in level])
+                    items = list(islice(merged, offset, offset + wanted))
+                offset = 0
+                
+                for (waiting_since, client_id), (client_zone, client_type) in items:
+                    rank += 1
+                    results.append({
+                        'rank': rank,
+                        'client_id': client_id,
+                        'score': score,
+                        'zone': client_zone,
+                        'housing_type': client_type,
+                        'waiting_since_ms': waiting_since,
+                    })
+            return total, results
+    
+    def rank(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Client's place in its zone's list and citywide for its housing type"""
+        with self._lock:
+            found = self._entries.get(client_id)
+            if found is None:
+                return None
+            key, score, entry = found
+            ranked = self._lists[key]
+            
+            citywide_ahead = 0
+            citywide_size = 0
+            for (_, other_type), other in self._lists.items():
+                if other_type == key[1]:
+                    citywide_ahead += other.ahead(score, entry)
+                    citywide_size += other.size
+            
+            return {
+                'client_id': client_id,
+                'zone': key[0],
+                'housing_type': key[1],
+                'score': score,
+                'waiting_since_ms': entry[0],
+                'rank': ranked.ahead(score, entry) + 1,
+                'of': ranked.size,
+                'citywide_rank': citywide_ahead + 1,
+                'citywide_of': citywide_size,
+            }
+    
+    def status(self) -> Dict[str, Any]:
+        return {'ready': self.ready, 'clients': len(self._entries), 'lists': len(self._lists)}
+
+
+def _tagged(bucket: List[Entry], key: ListKey) -> Iterator[Tuple[Entry, ListKey]]:
+    for entry in bucket:
+        yield entry, key
+
+
+# Global by-name list, kept current by the client snapshot
+by_name_list = ByNameList()
+client_snapshot.on_change(by_name_list)
@@ -0,0 +1,386 @@
+"""
+Columnar in-memory snapshot of clients for analytics
+Keeps the few fields the dashboards aggregate over as numpy arrays
+(one row per client, ids interned to ints, timestamps as int64 epoch
+milliseconds), so counts are vectorized scans instead of
+streaming client documents
+
+- Loaded once per process with a projected scan (only these fields)
+- Writes made by this process are applied right away (read-your-writes)
+- Writes from other instances arrive by polling updated_at past a
+  watermark; the poll re-reads a short overlap window so writes that
+  commit slightly out of timestamp order aren't missed
+- Until the first load finishes, callers fall back to Firestore
+- Indexes built on top (the by-name list) subscribe with on_change:
+  rebuilt from the columns after the load, then told of every upsert
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.client import ClientStatus
+from app.services.client_store import client_store
+
+logger = logging.getLogger(__name__)
+
+STATUSES = [status.value for status in ClientStatus]
+ACUITY_LEVELS = ['low', 'medium', 'high']
+SCORE_FIELDS = ['total_score', 'housing_history_score', 'wellness_score', 'risk_score']
+TIMESTAMP_FIELDS = ['created_at', 'updated_at', 'status_changed_at', 'housing_placed_at']
+
+# Firestore field paths read by the load and the poll
+PROJECTION = [
+    'status',
+    'organization_id',
+    'zone',
+    'assigned_caseworker_id',
+    'veteran_status',
+    'vi_spdat_score.acuity_level',
+    'vi_spdat_score.calculated_at',
+    *[f'vi_spdat_score.{name}' for name in SCORE_FIELDS],
+    *TIMESTAMP_FIELDS,
+]
+
+# Column name -> dtype (missing values: -1 codes, 0 timestamps)
+COLUMNS = {
+    'status': np.int8,
+    'organization': np.int32,
+    'zone': np.int32,
+    'caseworker': np.int32,
+    'acuity': np.int8,
+    'veteran': np.bool_,
+    **{name: np.int8 for name in SCORE_FIELDS},
+    **{name: np.int64 for name in TIMESTAMP_FIELDS},
+    'assessed_at': np.int64,  # vi_spdat_score.calculated_at
+}
+
+MISSING = -1
+
+
+def epoch_ms(value: Any) -> int:
+    """Datetime (naive UTC or aware) as epoch milliseconds; 0 if unset"""
+    if not isinstance(value, datetime):
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class Interner:
+    """Maps strings to dense ints (and back); None is MISSING"""
+    
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+    
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+    
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """Code of an already seen value, without adding it"""
+        return self.codes.get(value) if value is not None else MISSING
+    
+    def __len__(self):
+        return len(self.values)
+
+
+class ClientSnapshot:
+    """Array-backed analytics columns for every client, kept current"""
+    
+    def __init__(
+        self,
+        poll_seconds: float = 10.0,
+        overlap_seconds: float = 5.0,
+        page_size: int = 1000,
+        initial_capacity: int = 1024
+    ):
+        self.poll_seconds = poll_seconds
+        self.overlap_seconds = overlap_seconds
+        self.page_size = page_size
+        self.db = None
+        
+        self.organizations = Interner()
+        self.zones = Interner()
+        self.caseworkers = Interner()
+        
+        self._columns = {
+            name: np.zeros(initial_capacity, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._size = 0
+        self._watermark_ms = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Any] = []
+        self.ready = False
+        self.stats = {'loaded': 0, 'polls': 0, 'poll_updates': 0, 'local_writes': 0, 'poll_errors': 0}
+    
+    # -- lifecycle --
+    
+    async def start(self, db):
+        """
+        Load in the background and keep polling until stop()
+        Starting again after a failed load retries it
+        """
+        self.db = db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.error(f"Client snapshot load failed: {e}", exc_info=True)
+            return
+        
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception as e:
+                self.stats['poll_errors'] += 1
+                logger.warning(f"Client snapshot poll failed: {e}")
+    
+    def load(self):
+        """Full projected scan of clients (blocking)"""
+        started = time.monotonic()
+        # Writes that land during the scan are picked up by the first poll
+        load_started_ms = int(time.time() * 1000)
+        
+        count = 0
+        for doc in client_store.stream(client_store.query(self.db).select(PROJECTION)):
+            self.upsert(doc.id, doc.to_dict() or {})
+            count += 1
+        
+        with self._lock:
+            self._watermark_ms = max(self._watermark_ms, load_started_ms)
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            for listener in self._listeners:
+                listener.rebuild(self, columns, self._ids[:self._size])
+            self.ready = True
+        self.stats['loaded'] = count
+        logger.info(
+            f"Client snapshot loaded {count} clients in {time.monotonic() - started:.1f}s "
+            f"({self.nbytes / 1e6:.1f} MB of columns)"
+        )
+    
+    def poll(self) -> int:
+        """Apply clients updated since the watermark (blocking); returns rows applied"""
+        since_ms = max(0, self._watermark_ms - int(self.overlap_seconds * 1000))
+        since = datetime.fromtimestamp(since_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+        
+        applied = 0
+        last = None
+        while True:
+            query = (
+                client_store.query(self.db)
+                .where('updated_at', '>=', since)
+                .order_by('updated_at')
+                .select(PROJECTION)
+                .limit(self.page_size)
+            )
+            if last is not None:
+                query = query.start_after(last)
+            
+            docs = list(query.stream())
+            for doc in docs:
+                if not client_store.current(doc):
+                    continue
+                data = doc.to_dict() or {}
+                self.upsert(doc.id, data)
+                with self._lock:
+                    self._watermark_ms = max(self._watermark_ms, epoch_ms(data.get('updated_at')))
+            applied += len(docs)
+            if len(docs) < self.page_size:
+                break
+            last = docs[-1]
+        
+        self.stats['polls'] += 1
+        self.stats['poll_updates'] += applied
+        return applied
+    
+    # -- writes --
+    
+    def apply_write(self, client_id: str, fields: Dict[str, Any]):
+        """Apply a write made by this process (full document or changed fields)"""
+        if not self.ready:
+            return
+        self.upsert(client_id, fields)
+        self.stats['local_writes'] += 1
+    
+    def upsert(self, client_id: str, fields: Dict[str, Any]):
+        """Set the columns for the fields present (new rows start empty)"""
+        with self._lock:
+            values = self._encode(fields)
+            row = self._rows.get(client_id)
+            if row is None:
+                row = self._append(client_id)
+            for name, value in values.items():
+                self._columns[name][row] = value
+            # Listeners are rebuilt after the load, so only later changes
+            if self.ready and self._listeners:
+                decoded = self.decode(row)
+                for listener in self._listeners:
+                    listener.changed(client_id, decoded)
+    
+    def on_change(self, listener):
+        """
+        Subscribe an index: listener.rebuild(snapshot, columns, ids) after
+        the load and listener.changed(client_id, row) on every later
+        upsert (row from decode); both run under the snapshot lock
+        """
+        self._listeners.append(listener)
+    
+    def _encode(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values for the given fields (lock held: interns ids)"""
+        values: Dict[str, Any] = {}
+        if 'status' in fields:
+            status = fields['status']
+            status = getattr(status, 'value', status)
+            values['status'] = STATUSES.index(status) if status in STATUSES else MISSING
+        if 'organization_id' in fields:
+            values['organization'] = self.organizations.code(fields['organization_id'])
+        if 'zone' in fields:
+            values['zone'] = self.zones.code(fields['zone'])
+        if 'assigned_caseworker_id' in fields:
+            values['caseworker'] = self.caseworkers.code(fields['assigned_caseworker_id'])
+        if 'veteran_status' in fields:
+            values['veteran'] = bool(fields['veteran_status'])
+        if 'vi_spdat_score' in fields:
+            score = fields['vi_spdat_score'] or {}
+            acuity = score.get('acuity_level')
+            values['acuity'] = ACUITY_LEVELS.index(acuity) if acuity in ACUITY_LEVELS else MISSING
+            for name in SCORE_FIELDS:
+                values[name] = score.get(name) or 0
+            values['assessed_at'] = epoch_ms(score.get('calculated_at'))
+        for name in TIMESTAMP_FIELDS:
+            if name in fields:
+                values[name] = epoch_ms(fields[name])
+        return values
+    
+    def _append(self, client_id: str) -> int:
+        """New empty row (lock held), growing the columns by doubling"""
+        row = self._size
+        capacity = len(self._columns['status'])
+        if row == capacity:
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity * 2, dtype=column.dtype)
+                grown[:capacity] = column
+                self._columns[name] = grown
+        for name in ('status', 'organization', 'zone', 'caseworker', 'acuity'):
+            self._columns[name][row] = MISSING
+        self._rows[client_id] = row
+        self._ids.append(client_id)
+        self._size += 1
+        return row
+    
+    # -- reads --
+    
+    def decode(self, row: int) -> Dict[str, Any]:
+        """One row with codes turned back into values (lock held)"""
+        columns = self._columns
+        status = int(columns['status'][row])
+        zone = int(columns['zone'][row])
+        acuity = int(columns['acuity'][row])
+        return {
+            'status': STATUSES[status] if status != MISSING else None,
+            'zone': self.zones.values[zone] if zone != MISSING else None,
+            'acuity_level': ACUITY_LEVELS[acuity] if acuity != MISSING else None,
+            'veteran': bool(columns['veteran'][row]),
+            **{name: int(columns[name][row]) for name in SCORE_FIELDS},
+            **{name: int(columns[name][row]) for name in TIMESTAMP_FIELDS},
+            'assessed_at': int(columns['assessed_at'][row]),
+        }
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(column[:self._size].nbytes for column in self._columns.values())
+    
+    def _mask(
+        self,
+        columns: Dict[str, np.ndarray],
+        organization_id: Optional[str] = None,
+        caseworker_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Row filter; None if a filter value was never seen (no rows match)"""
+        mask = np.ones(len(columns['status']), dtype=np.bool_)
+        for column, interner, value in (
+            ('organization', self.organizations, organization_id),
+            ('caseworker', self.caseworkers, caseworker_id),
+            ('zone', self.zones, zone),
+        ):
+            if value is None:
+                continue
+            code = interner.lookup(value)
+            if code is None:
+                return None
+            mask &= columns[column] == code
+        if status is not None:
+            if status not in STATUSES:
+                return None
+            mask &= columns['status'] == STATUSES.index(status)
+        return mask
+    
+    def count(self, **filters) -> int:
+        """Clients matching organization_id / caseworker_id / zone / status"""
+        with self._lock:
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            mask = self._mask(columns, **filters)
+            return int(mask.sum()) if mask is not None else 0
+    
+    def status_counts(self, **filters) -> Dict[str, int]:
+        """Clients per status (every status, zeros included)"""
+        with self._lock:
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            mask = self._mask(columns, **filters)
+            if mask is None:
+                return {status: 0 for status in STATUSES}
+            codes = columns['status'][mask]
+            counts = np.bincount(codes[codes >= 0], minlength=len(STATUSES))
+        return {status: int(counts[i]) for i, status in enumerate(STATUSES)}
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'clients': self._size,
+            'bytes': self.nbytes,
+            'organizations': len(self.organizations),
+            'zones': len(self.zones),
+            'caseworkers': len(self.caseworkers),
+            **self.stats,
+        }
+
+
+# Global snapshot (started in the app lifespan when enabled, else by the
+# first by-name list request)
+client_snapshot = ClientSnapshot(poll_seconds=settings.CLIENT_SNAPSHOT_POLL_SECONDS)
@@ -0,0 +1,194 @@
+"""
+Client document placement
+Clients live in the flat clients collection or partitioned per
+organization under organizations/{org}/clients (CLIENT_STORAGE):
+
+- flat: clients/{id}
+- dual: reads stay on clients/{id}; every write is mirrored to the
+  organization's partition while app.jobs.partition_clients copies the
+  existing clients
+- partitioned: organizations/{org}/clients/{id}; citywide reads are
+  collection group queries across organizations
+
+Partitioned documents carry their id in client_id, so a client known
+only by id is found with one collection group lookup (then remembered).
+Collection group queries also match the flat collection, so its
+documents are skipped until partition_clients cleanup deletes them
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import threading
+
+from app.core.config import settings
+
+CLIENTS = 'clients'
+
+FLAT = 'flat'
+DUAL = 'dual'
+PARTITIONED = 'partitioned'
+MODES = (FLAT, DUAL, PARTITIONED)
+
+# Values per 'in' filter
+LOOKUP_CHUNK = 30
+
+
+def partition(db, organization_id: str):
+    """One organization's clients collection"""
+    return db.collection('organizations').document(organization_id).collection(CLIENTS)
+
+
+def partition_of(reference) -> Optional[str]:
+    """Organization a client document is partitioned under (None: flat)"""
+    parts = reference.path.split('/')
+    return parts[1] if len(parts) == 4 else None
+
+
+def merge_fields(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    update() fields as set(data, merge=paths), which writes the same
+    fields but also creates a missing document (mirrors not copied yet)
+    """
+    data: Dict[str, Any] = {}
+    for path, value in fields.items():
+        *parents, leaf = path.split('.')
+        node = data
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return data, list(fields)
+
+
+class ClientStore:
+    """Where client documents are read and written"""
+    
+    def __init__(self, mode: str = FLAT, max_locations: int = 100_000):
+        if mode not in MODES:
+            raise ValueError(f"Unknown client storage mode: {mode} (expected one of {MODES})")
+        self.mode = mode
+        self.max_locations = max_locations
+        # client id -> organization id, most recently used last
+        self._locations: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'lookup_queries': 0, 'lookup_misses': 0}
+    
+    # -- queries --
+    
+    def query(self, db, organization_id: Optional[str] = None):
+        """Clients of one organization, or citywide"""
+        if self.mode == PARTITIONED:
+            if organization_id:
+                return partition(db, organization_id)
+            return db.collection_group(CLIENTS)
+        
+        query = db.collection(CLIENTS)
+        if organization_id:
+            query = query.where('organization_id', '==', organization_id)
+        return query
+    
+    def current(self, doc) -> bool:
+        """False for flat documents a partitioned collection group query still sees"""
+        return self.mode != PARTITIONED or partition_of(doc.reference) is not None
+    
+    def stream(self, query) -> Iterator:
+        """query.stream() without leftover flat documents"""
+        for doc in query.stream():
+            if self.current(doc):
+                yield doc
+    
+    # -- documents --
+    
+    def document(self, db, client_id: str, organization_id: Optional[str] = None):
+        """
+        Client document to read and write
+        An unknown client gets its flat reference, which reads as missing
+        once the flat collection is gone
+        """
+        if self.mode == PARTITIONED:
+            organization_id = organization_id or self.organization_of(db, client_id)
+            if organization_id:
+                return partition(db, organization_id).document(client_id)
+        return db.collection(CLIENTS).document(client_id)
+    
+    def documents(self, db, client_ids: List[str]) -> List:
+        """Client documents for many ids (unknown organizations looked up in batches)"""
+        if self.mode == PARTITIONED:
+            self._lookup(db, [client_id for client_id in client_ids if not self._cached(client_id)])
+        return [self.document(db, client_id) for client_id in client_ids]
+    
+    def new_document(self, db, organization_id: Optional[str] = None):
+        """Reference for a new client"""
+        if self.mode != PARTITIONED:
+            return db.collection(CLIENTS).document()
+        if not organization_id:
+            raise ValueError("Partitioned client storage needs the client's organization_id")
+        return partition(db, organization_id).document()
+    
+    def mirror(self, db, client_id: str, organization_id: Optional[str] = None):
+        """Partitioned copy to write along with the flat document (dual mode only)"""
+        if self.mode != DUAL:
+            return None
+        organization_id = organization_id or self.organization_of(db, client_id)
+        if not organization_id:
+            return None
+        return partition(db, organization_id).document(client_id)
+    
+    # -- locations --
+    
+    def organization_of(self, db, client_id: str) -> Optional[str]:
+        organization_id = self._cached(client_id)
+        if organization_id is None:
+            self._lookup(db, [client_id])
+            organization_id = self._cached(client_id)
+        return organization_id
+    
+    def remember(self, client_id: str, organization_id: Optional[str]):
+        """Client's organization (clients never move between organizations)"""
+        if self.mode == FLAT or not organization_id:
+            return
+        with self._lock:
+            self._locations[client_id] = organization_id
+            self._locations.move_to_end(client_id)
+            while len(self._locations) > self.max_locations:
+                self._locations.popitem(last=False)
+    
+    def _cached(self, client_id: str) -> Optional[str]:
+        with self._lock:
+            organization_id = self._locations.get(client_id)
+            if organization_id is not None:
+                self._locations.move_to_end(client_id)
+            return organization_id
+    
+    def _lookup(self, db, client_ids: List[str]):
+        """
+        Organizations of clients by id: collection group queries on
+        client_id when partitioned, else one read of the flat documents
+        """
+        if not client_ids:
+            return
+        self.stats['lookups'] += len(client_ids)
+        
+        found = set()
+        if self.mode == PARTITIONED:
+            for start in range(0, len(client_ids), LOOKUP_CHUNK):
+                query = db.collection_group(CLIENTS)
+                query = query.where('client_id', 'in', client_ids[start:start + LOOKUP_CHUNK])
+                self.stats['lookup_queries'] += 1
+                for doc in self.stream(query.select(['organization_id'])):
+                    self.remember(doc.id, partition_of(doc.reference))
+                    found.add(doc.id)
+        else:
+            refs = [db.collection(CLIENTS).document(client_id) for client_id in client_ids]
+            self.stats['lookup_queries'] += 1
+            for doc in db.get_all(refs, field_paths=['organization_id']):
+                if doc.exists:
+                    self.remember(doc.id, (doc.to_dict() or {}).get('organization_id'))
+                    found.add(doc.id)
+        self.stats['lookup_misses'] += len(client_ids) - len(found)
+    
+    def status(self) -> Dict[str, Any]:
+        return {'mode': self.mode, 'locations': len(self._locations), **self.stats}
+
+
+# Global client store instance
+client_store = ClientStore(settings.CLIENT_STORAGE)
@@ -4,26 +4,83 @@ Handles all database operations for H.O.M.E. Platform
 """
 
 from google.cloud import firestore
-from google.api_core.exceptions import NotFound
+from google.api_core.exceptions import Conflict, NotFound
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import os
 
 from app.core.config import settings
+from app.services.by_name_list import by_name_list
+from app.services.client_snapshot import STATUSES, client_snapshot
+from app.services.client_store import FLAT, client_store, merge_fields
+from app.services.dedup import CANDIDATE_FIELDS, IDENTITY_FIELDS, duplicate_detector
+from app.services.quantile_sketch import QuantileSketch
+from app.services.queue_cache import ActionQueueCache
+from app.services.shared_cache import client_progress_key, document_key, shared_cache
+from app.services.versions import version_stamps
 
 logger = logging.getLogger(__name__)
 
+# Append-only status history under each client document
+STATUS_EVENTS = 'status_events'
+
+# Concurrent status changes to one client retry this many times
+STATUS_WRITE_ATTEMPTS = 3
+
+# Client fields shown on by-name list pages
+BY_NAME_FIELDS = [
+    'first_name', 'last_name', 'preferred_name', 'veteran_status',
+    'organization_id', 'assigned_caseworker_id'
+]
+
 
 class FirestoreService:
     """Firestore database operations"""
     
     def __init__(self):
-        """Initialize Firestore client"""
-        self.db = firestore.Client(
+        """Firestore client is created lazily, once per process"""
+        self._db = None
+        self._queue_cache = None
+        self._pid = None
+        
+        # Writes on other instances drop local version stamps
+        shared_cache.on_invalidate(version_stamps.invalidate)
+    
+    @property
+    def db(self) -> firestore.Client:
+        self._ensure_client()
+        return self._db
+    
+    @property
+    def queue_cache(self) -> Optional[ActionQueueCache]:
+        self._ensure_client()
+        return self._queue_cache
+    
+    def _ensure_client(self):
+        """
+        Connect in the current process
+        gRPC channels don't survive fork, so a worker process that
+        inherited this service (forked server workers) gets its own client
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        
+        self._pid = pid
+        self._db = firestore.Client(
             project=settings.GCP_PROJECT_ID,
             database=settings.FIRESTORE_DATABASE
         )
-        logger.info(f"Firestore connected: {settings.GCP_PROJECT_ID}")
+        logger.info(f"Firestore connected: {settings.GCP_PROJECT_ID} (pid {pid})")
+        
+        self._queue_cache = None
+        if settings.QUEUE_CACHE_ENABLED:
+            self._queue_cache = ActionQueueCache(
+                self._db,
+                idle_seconds=settings.QUEUE_CACHE_IDLE_SECONDS,
+                max_views=settings.QUEUE_CACHE_MAX_LISTENERS
+            )
     
     # ==================== Client Operations ====================
     
@@ -31,16 +88,81 @@ class FirestoreService:
         """Create a new client record"""
         client_data['created_at'] = datetime.utcnow()
         client_data['updated_at'] = datetime.utcnow()
+        client_data['dedup_keys'] = duplicate_detector.keys(client_data)
+        
+        organization_id = client_data.get('organization_id')
+        doc_ref = client_store.new_document(self.db, organization_id)
+        if client_store.mode != FLAT:
+            client_data['client_id'] = doc_ref.id
         
-        doc_ref = self.db.collection('clients').document()
-        doc_ref.set(client_data)
+        # First status event; the timeline projection lives on the client
+        initial_status = client_data.get('status', 'intake')
+        client_data['status_timeline'] = {
+            'intake': client_data['created_at'],
+            initial_status: client_data['created_at']
+        }
+        client_data['status_changed_at'] = client_data['created_at']
+        client_data['status_event_count'] = 1
+        event = {
+            'seq': 1,
+            'from_status': None,
+            'to_status': initial_status,
+            'at': client_data['created_at'],
+            'actor': client_data.get('assigned_caseworker_id'),
+            'organization_id': organization_id,
+            'zone': client_data.get('zone', 'default')
+        }
+        
+        # Client write, status event and org metrics increment commit together
+        batch = self.db.batch()
+        batch.set(doc_ref, client_data)
+        batch.create(self._status_event_ref(doc_ref, 1), event)
+        mirror = client_store.mirror(self.db, doc_ref.id, organization_id)
+        if mirror is not None:
+            batch.set(mirror, client_data)
+            batch.create(self._status_event_ref(mirror, 1), event)
+        if client_data.get('organization_id'):
+            batch.set(
+                self._org_metrics_ref(client_data['organization_id']),
+                {
+                    'organization_id': client_data['organization_id'],
+                    'intakes': firestore.Increment(1),
+                    'status_counts': {
+                        client_data.get('status', 'intake'): firestore.Increment(1)
+                    },
+                    'zone_status_counts': {
+                        client_data.get('zone', 'default'): {
+                            client_data.get('status', 'intake'): firestore.Increment(1)
+                        }
+                    },
+                    'updated_at': client_data['created_at']
+                },
+                merge=True
+            )
+        
+        # Daily intake counters feed the capacity forecast job
+        day = client_data['created_at'].strftime('%Y-%m-%d')
+        zone = client_data.get('zone', 'default')
+        acuity = (client_data.get('vi_spdat_score') or {}).get('acuity_level', 'unknown')
+        batch.set(
+            self.db.collection('intake_counts').document(day),
+            {
+                'date': day,
+                'total': firestore.Increment(1),
+                'counts': {zone: {acuity: firestore.Increment(1)}}
+            },
+            merge=True
+        )
+        batch.commit()
+        client_store.remember(doc_ref.id, organization_id)
+        client_snapshot.apply_write(doc_ref.id, client_data)
         
         logger.info(f"Created client: {doc_ref.id}")
         return doc_ref.id
     
     async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
         """Get client by ID"""
-        doc_ref = self.db.collection('clients').document(client_id)
+        doc_ref = client_store.document(self.db, client_id)
         doc = doc_ref.get()
         
         if not doc.exists:
@@ -48,22 +170,127 @@ class FirestoreService:
         
         data = doc.to_dict()
         data['id'] = doc.id
+        client_store.remember(client_id, data.get('organization_id'))
+        
+        version_stamps.record(
+            'clients',
+            client_id,
+            doc.update_time or data.get('updated_at'),
+            refs={
+                'caseworkers': data.get('assigned_caseworker_id'),
+                'organizations': data.get('organization_id')
+            }
+        )
         return data
     
     async def update_client(
         self, 
         client_id: str, 
-        update_data: Dict[str, Any]
+        update_data: Dict[str, Any],
+        actor: Optional[str] = None
     ) -> bool:
-        """Update client record"""
+        """
+        Update client record
+        Status changes append a status event (actor: who made the change)
+        """
         update_data['updated_at'] = datetime.utcnow()
         
-        doc_ref = self.db.collection('clients').document(client_id)
-        doc_ref.update(update_data)
+        doc_ref = client_store.document(self.db, client_id)
+        mirror = client_store.mirror(self.db, client_id)
+        
+        # Name, phone or date of birth changes move the client to new blocks
+        if any(name in update_data for name in IDENTITY_FIELDS):
+            current = doc_ref.get()
+            if not current.exists:
+                raise NotFound(f"Client not found: {client_id}")
+            update_data['dedup_keys'] = duplicate_detector.keys({**current.to_dict(), **update_data})
+        
+        # Status changes feed the event history and contractor metrics, so
+        # read the previous status first (single document read, never a scan)
+        new_status = update_data.get('status')
+        fields = update_data
+        if new_status is None and mirror is None:
+            doc_ref.update(update_data)
+        elif new_status is None:
+            batch = self.db.batch()
+            batch.update(doc_ref, update_data)
+            batch.set(mirror, *merge_fields(update_data))
+            batch.commit()
+        else:
+            for attempt in range(STATUS_WRITE_ATTEMPTS):
+                before = doc_ref.get()
+                if not before.exists:
+                    raise NotFound(f"Client not found: {client_id}")
+                
+                batch = self.db.batch()
+                fields = dict(update_data)
+                self._record_status_change(
+                    batch,
+                    doc_ref,
+                    before.to_dict(),
+                    fields,
+                    actor,
+                    mirror
+                )
+                batch.update(doc_ref, fields)
+                if mirror is not None:
+                    batch.set(mirror, *merge_fields(fields))
+                try:
+                    batch.commit()
+                    break
+                except Conflict:
+                    # Another change took this event sequence number first
+                    if attempt == STATUS_WRITE_ATTEMPTS - 1:
+                        raise
+                    logger.info(f"Concurrent status change for {client_id}, retrying")
         
+        client_snapshot.apply_write(client_id, fields)
+        await self._client_changed(client_id)
         logger.info(f"Updated client: {client_id}")
         return True
     
+    async def find_duplicate_candidates(
+        self,
+        keys: List[str],
+        organization_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Clients sharing a blocking key (one indexed query, identity fields
+        only), within one organization when given
+        """
+        if not keys:
+            return []
+        
+        query = client_store.query(self.db, organization_id)
+        query = query.where('dedup_keys', 'array_contains_any', keys)
+        query = query.select(CANDIDATE_FIELDS).limit(duplicate_detector.max_candidates)
+        
+        candidates = []
+        for doc in client_store.stream(query):
+            data = doc.to_dict()
+            data['id'] = doc.id
+            candidates.append(data)
+        return candidates
+    
+    async def record_repeat_intake(self, client_id: str, fields: Dict[str, Any]):
+        """Fold a duplicate intake into an existing client (counter plus fields)"""
+        update = {
+            **fields,
+            'repeat_intakes': firestore.Increment(1),
+            'last_intake_at': datetime.utcnow()
+        }
+        await self.update_client(client_id, update)
+    
+    async def get_status_events(
+        self,
+        client_id: str,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Status history of one client, oldest first (reads only its events)"""
+        query = client_store.document(self.db, client_id).collection(STATUS_EVENTS)
+        query = query.order_by('seq').limit(limit)
+        return [doc.to_dict() for doc in query.stream()]
+    
     async def list_clients(
         self,
         organization_id: Optional[str] = None,
@@ -73,10 +300,8 @@ class FirestoreService:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """List clients with filters"""
-        query = self.db.collection('clients')
+        query = client_store.query(self.db, organization_id)
         
-        if organization_id:
-            query = query.where('organization_id', '==', organization_id)
         if caseworker_id:
             query = query.where('assigned_caseworker_id', '==', caseworker_id)
         if status:
@@ -86,7 +311,7 @@ class FirestoreService:
         query = query.order_by('created_at', direction=firestore.Query.DESCENDING)
         query = query.limit(limit).offset(offset)
         
-        docs = query.stream()
+        docs = client_store.stream(query)
         
         clients = []
         for doc in docs:
@@ -99,31 +324,93 @@ class FirestoreService:
     async def count_clients(
         self,
         organization_id: Optional[str] = None,
+        caseworker_id: Optional[str] = None,
         status: Optional[str] = None
     ) -> int:
-        """Count clients with filters"""
-        query = self.db.collection('clients')
+        """Count clients with filters (from the columnar snapshot when enabled and loaded)"""
+        if settings.CLIENT_SNAPSHOT_ENABLED and client_snapshot.ready:
+            return client_snapshot.count(
+                organization_id=organization_id,
+                caseworker_id=caseworker_id,
+                status=status
+            )
+        
+        query = client_store.query(self.db, organization_id)
         
-        if organization_id:
-            query = query.where('organization_id', '==', organization_id)
+        if caseworker_id:
+            query = query.where('assigned_caseworker_id', '==', caseworker_id)
         if status:
             query = query.where('status', '==', status)
         
         # Get count
-        docs = list(query.stream())
+        docs = list(client_store.stream(query))
         return len(docs)
     
-    # ==================== QR Code Operations ====================
+    async def client_status_counts(
+        self,
+        organization_id: Optional[str] = None,
+        caseworker_id: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Clients per status with filters
+        From the columnar snapshot when enabled and loaded, else one
+        projected scan
+        """
+        if settings.CLIENT_SNAPSHOT_ENABLED and client_snapshot.ready:
+            return client_snapshot.status_counts(
+                organization_id=organization_id,
+                caseworker_id=caseworker_id
+            )
+        
+        query = client_store.query(self.db, organization_id)
+        if caseworker_id:
+            query = query.where('assigned_caseworker_id', '==', caseworker_id)
+        
+        counts = {status: 0 for status in STATUSES}
+        for doc in client_store.stream(query.select(['status'])):
+            status = (doc.to_dict() or {}).get('status')
+            if status in counts:
+                counts[status] += 1
+        return counts
     
-    async def get_qr_code(self, qr_code: str) -> Optional[Dict[str, Any]]:
-        """Get QR code info"""
-        doc_ref = self.db.collection('qr_codes').document(qr_code)
-        doc = doc_ref.get()
+    async def get_by_name_list(
+        self,
+        zone: Optional[str] = None,
+        housing_type: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        One page of the ranked by-name list, with client names
+        From the incremental index (check by_name_list.ready first)
+        """
+        total, entries = by_name_list.page(zone, housing_type, offset, limit)
         
-        if not doc.exists:
-            return None
+        # Names for the page only (one batched read)
+        refs = client_store.documents(self.db, [e['client_id'] for e in entries])
+        names = {}
+        if refs:
+            for doc in self.db.get_all(refs, field_paths=BY_NAME_FIELDS):
+                if doc.exists:
+                    names[doc.id] = doc.to_dict()
+        for entry in entries:
+            entry.update(names.get(entry['client_id'], {}))
         
-        return doc.to_dict()
+        return {'total': total, 'offset': offset, 'limit': limit, 'clients': entries}
+    
+    async def get_by_name_rank(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Client's rank on the by-name list (None if not on it)"""
+        return by_name_list.rank(client_id)
+    
+    # ==================== QR Code Operations ====================
+    
+    async def get_qr_code(self, qr_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get QR code info
+        Served from the shared cache, so scan counters may lag; analytics
+        read them from Firestore directly
+        """
+        return await self._get_reference_doc('qr_codes', qr_code)
     
     async def increment_qr_scan(self, qr_code: str):
         """Increment scan count for QR code"""
@@ -140,13 +427,7 @@ class FirestoreService:
         organization_id: str
     ) -> Optional[Dict[str, Any]]:
         """Get organization by ID"""
-        doc_ref = self.db.collection('organizations').document(organization_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            return None
-        
-        return doc.to_dict()
+        return await self._get_reference_doc('organizations', organization_id)
     
     # ==================== Caseworker Operations ====================
     
@@ -155,13 +436,7 @@ class FirestoreService:
         caseworker_id: str
     ) -> Optional[Dict[str, Any]]:
         """Get caseworker by ID"""
-        doc_ref = self.db.collection('caseworkers').document(caseworker_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            return None
-        
-        return doc.to_dict()
+        return await self._get_reference_doc('caseworkers', caseworker_id)
     
     async def get_caseworker_by_zone(
         self,
@@ -197,15 +472,146 @@ class FirestoreService:
         doc_ref = doc_ref.collection('action_queue').document()
         doc_ref.set(action_data)
         
+        if self.queue_cache:
+            self.queue_cache.apply_write(caseworker_id, doc_ref.id, action_data)
         return doc_ref.id
     
+    async def update_action_item(
+        self,
+        caseworker_id: str,
+        action_id: str,
+        update: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Change a pending action item
+        Completed items are returned unchanged
+        """
+        doc_ref = self.db.collection('caseworkers').document(caseworker_id)
+        doc_ref = doc_ref.collection('action_queue').document(action_id)
+        doc = doc_ref.get()
+        
+        if not doc.exists:
+            return None
+        
+        action = doc.to_dict()
+        action['id'] = doc.id
+        if action.get('completed') or not update:
+            return action
+        
+        update = {**update, 'updated_at': datetime.utcnow()}
+        doc_ref.update(update)
+        
+        action.update(update)
+        if self.queue_cache:
+            self.queue_cache.apply_write(caseworker_id, action_id, action)
+        return action
+    
+    async def complete_action_item(
+        self,
+        caseworker_id: str,
+        action_id: str,
+        notes: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Mark action item as completed
+        Records response time for the client's first completed action
+        and documentation compliance for the organization; an item
+        already completed is returned unchanged and counted once
+        """
+        doc_ref = self.db.collection('caseworkers').document(caseworker_id)
+        doc_ref = doc_ref.collection('action_queue').document(action_id)
+        
+        @firestore.transactional
+        def complete(transaction):
+            # The completed check and the metric increments commit together,
+            # so a repeated or concurrent complete never counts twice
+            doc = doc_ref.get(transaction=transaction)
+            if not doc.exists:
+                return None, False, False
+            
+            action = doc.to_dict()
+            action['id'] = doc.id
+            if action.get('completed'):
+                return action, False, False
+            
+            client = None
+            client_ref = None
+            if action.get('client_id'):
+                client_ref = client_store.document(self.db, action['client_id'])
+                client_doc = client_ref.get(transaction=transaction)
+                client = client_doc.to_dict() if client_doc.exists else None
+            
+            completed_at = datetime.utcnow()
+            update = {'completed': True, 'completed_at': completed_at}
+            if notes:
+                update['notes'] = notes
+            transaction.update(doc_ref, update)
+            action.update(update)
+            
+            if not client or not client.get('organization_id'):
+                return action, True, False
+            
+            metrics = {
+                'actions_completed': firestore.Increment(1),
+                'updated_at': completed_at
+            }
+            if notes:
+                metrics['actions_documented'] = firestore.Increment(1)
+            
+            # Response time: intake to first completed action
+            client_updated = False
+            if not client.get('first_action_completed_at'):
+                first_action = {'first_action_completed_at': completed_at}
+                transaction.update(client_ref, first_action)
+                mirror = client_store.mirror(
+                    self.db,
+                    action['client_id'],
+                    client['organization_id']
+                )
+                if mirror is not None:
+                    transaction.set(mirror, *merge_fields(first_action))
+                client_updated = True
+                intake_at = client.get('intake_completed_at') or client.get('created_at')
+                if intake_at:
+                    hours = _elapsed_seconds(intake_at, completed_at) / 3600
+                    metrics.update({
+                        'response_count': firestore.Increment(1),
+                        'response_hours_sum': firestore.Increment(hours),
+                        'response_hours_sketch': {
+                            QuantileSketch.bucket_key(hours): firestore.Increment(1)
+                        }
+                    })
+            
+            transaction.set(
+                self._org_metrics_ref(client['organization_id']),
+                metrics,
+                merge=True
+            )
+            return action, True, client_updated
+        
+        action, completed, client_updated = complete(self.db.transaction())
+        if not completed:
+            return action
+        
+        if client_updated:
+            await self._client_changed(action['client_id'])
+        if self.queue_cache:
+            self.queue_cache.apply_write(caseworker_id, action_id, None)
+        logger.info(f"Completed action: {action_id} (caseworker {caseworker_id})")
+        return action
+    
     async def get_caseworker_queue(
         self,
         caseworker_id: str,
         completed: bool = False,
         limit: int = 50
     ) -> List[Dict[str, Any]]:
-        """Get caseworker's action queue"""
+        """Get caseworker's action queue (pending items from the live cache if enabled)"""
+        if self.queue_cache and not completed:
+            items = self.queue_cache.get_queue(caseworker_id, limit)
+            if items is not None:
+                return items
+        
         doc_ref = self.db.collection('caseworkers').document(caseworker_id)
         query = doc_ref.collection('action_queue')
         query = query.where('completed', '==', completed)
@@ -223,29 +629,357 @@ class FirestoreService:
         
         return items
     
+    async def get_caseworker_queue_summary(self, caseworker_id: str) -> Dict[str, int]:
+        """Pending and high-priority (4+) action counts"""
+        if self.queue_cache:
+            summary = self.queue_cache.get_summary(caseworker_id)
+            if summary is not None:
+                return summary
+        
+        pending = await self.get_caseworker_queue(
+            caseworker_id=caseworker_id,
+            completed=False,
+            limit=100
+        )
+        return {
+            'pending': len(pending),
+            'high_priority': len([a for a in pending if a.get('priority', 0) >= 4])
+        }
+    
+    # ==================== Housing Operations ====================
+    
+    async def record_housing_match(
+        self,
+        client_id: str,
+        resource_id: str,
+        resource_name: str = ""
+    ) -> bool:
+        """
+        Match a client to a housing resource: client status and
+        matched_housing_id, one unit taken from the resource, and an
+        action item for the caseworker to confirm with the client
+        The client check, status change and event, and the unit check and
+        decrement commit in one transaction (a unit is never taken twice)
+        False if the client is no longer waiting or the unit is gone
+        """
+        doc_ref = client_store.document(self.db, client_id)
+        mirror = client_store.mirror(self.db, client_id)
+        resource_ref = self.db.collection('housing_resources').document(resource_id)
+        
+        @firestore.transactional
+        def match(transaction):
+            # All reads before any write, as transactions require
+            client = doc_ref.get(transaction=transaction)
+            resource = resource_ref.get(transaction=transaction)
+            if not client.exists or not resource.exists:
+                return None, None
+            before = client.to_dict()
+            if before.get('status') != 'assessed' or before.get('matched_housing_id'):
+                return None, None
+            if (resource.to_dict().get('available_beds') or 0) < 1:
+                return None, None
+            
+            now = datetime.utcnow()
+            fields = {'status': 'matched', 'matched_housing_id': resource_id, 'updated_at': now}
+            self._record_status_change(transaction, doc_ref, before, fields, 'housing_matching', mirror)
+            transaction.update(doc_ref, fields)
+            if mirror is not None:
+                transaction.set(mirror, *merge_fields(fields))
+            transaction.update(resource_ref, {
+                'available_beds': firestore.Increment(-1),
+                'updated_at': now
+            })
+            return before, fields
+        
+        client, fields = match(self.db.transaction())
+        if client is None:
+            return False
+        
+        client_snapshot.apply_write(client_id, fields)
+        await self._client_changed(client_id)
+        logger.info(f"Matched client {client_id} to housing resource {resource_id}")
+        
+        caseworker_id = client.get('assigned_caseworker_id')
+        if caseworker_id:
+            await self.create_action_item(caseworker_id, {
+                'client_id': client_id,
+                'client_name': f"{client.get('first_name', '')} {client.get('last_name', '')}".strip(),
+                'action_type': 'housing_match',
+                'priority': 4,
+                'description': f"Housing match: {resource_name or resource_id}. Confirm with the client"
+            })
+        return True
+    
     # ==================== Analytics Operations ====================
     
     async def get_city_metrics(self) -> Dict[str, Any]:
         """Get citywide metrics for dashboard"""
-        # Count total clients
         total_clients = await self.count_clients()
-        
-        # Count by status
-        intake_count = await self.count_clients(status='intake')
-        assessed_count = await self.count_clients(status='assessed')
-        matched_count = await self.count_clients(status='matched')
-        placed_count = await self.count_clients(status='placed')
+        by_status = await self.client_status_counts()
+        placed_count = by_status['placed']
         
         return {
             'total_clients': total_clients,
             'by_status': {
-                'intake': intake_count,
-                'assessed': assessed_count,
-                'matched': matched_count,
-                'placed': placed_count
+                status: by_status[status]
+                for status in ('intake', 'assessed', 'matched', 'placed')
             },
             'placement_rate': (placed_count / total_clients * 100) if total_clients > 0 else 0
         }
+    
+    async def get_contractor_performance(self) -> Dict[str, Any]:
+        """
+        Get per-organization performance metrics
+        Reads one pre-aggregated document per organization, never clients
+        
+        Returns summary per organization plus citywide totals:
+        - Response time: intake to first completed action (hours)
+        - Time to placement: intake to placed status (days)
+        - Documentation compliance: % of completed actions with notes
+        - Average days spent in each status (from status events)
+        """
+        contractors = []
+        totals = {
+            'response_count': 0, 'response_hours_sum': 0.0,
+            'placement_count': 0, 'placement_days_sum': 0.0,
+            'actions_completed': 0, 'actions_documented': 0
+        }
+        status_days_sum: Dict[str, float] = {}
+        status_exits: Dict[str, int] = {}
+        response_sketch = QuantileSketch()
+        placement_sketch = QuantileSketch()
+        
+        for doc in self.db.collection('org_metrics').stream():
+            data = doc.to_dict()
+            for key in totals:
+                totals[key] += data.get(key, 0)
+            for status, days in data.get('status_days_sum', {}).items():
+                status_days_sum[status] = status_days_sum.get(status, 0.0) + days
+            for status, exits in data.get('status_exits', {}).items():
+                status_exits[status] = status_exits.get(status, 0) + exits
+            
+            org_response = QuantileSketch(buckets=data.get('response_hours_sketch'))
+            org_placement = QuantileSketch(buckets=data.get('placement_days_sketch'))
+            response_sketch.merge(org_response)
+            placement_sketch.merge(org_placement)
+            
+            intakes = data.get('intakes', 0)
+            placed = data.get('status_counts', {}).get('placed', 0)
+            contractors.append({
+                'organization_id': data.get('organization_id', doc.id),
+                'clients_served': intakes,
+                'by_status': data.get('status_counts', {}),
+                'placement_rate': (placed / intakes * 100) if intakes > 0 else 0,
+                **_summarize_metrics(data, org_response, org_placement)
+            })
+        
+        totals['status_days_sum'] = status_days_sum
+        totals['status_exits'] = status_exits
+        return {
+            'contractors': contractors,
+            'metrics': _summarize_metrics(totals, response_sketch, placement_sketch)
+        }
+    
+    async def get_capacity_forecast(self) -> Optional[Dict[str, Any]]:
+        """Get latest capacity forecast written by the forecast job"""
+        doc = self.db.collection('forecasts').document('capacity').get()
+        
+        if not doc.exists:
+            return None
+        
+        return doc.to_dict()
+    
+    async def get_metrics_snapshots(
+        self,
+        start_date: str,
+        end_date: str
+    ) -> List[Dict[str, Any]]:
+        """Get daily metrics snapshots for [start_date, end_date] (YYYY-MM-DD)"""
+        query = self.db.collection('metrics_daily')
+        query = query.where('date', '>=', start_date)
+        query = query.where('date', '<=', end_date)
+        query = query.order_by('date')
+        
+        return [doc.to_dict() for doc in query.stream()]
+    
+    async def _get_reference_doc(
+        self,
+        collection: str,
+        doc_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rarely-changing document through the shared cache
+        The cached entry keeps the update time for version stamps (ETags)
+        """
+        key = document_key(collection, doc_id)
+        cached = await shared_cache.get(key)
+        if cached is not None:
+            version_stamps.record(collection, doc_id, cached['version'])
+            return cached['data']
+        
+        doc = self.db.collection(collection).document(doc_id).get()
+        if not doc.exists:
+            return None
+        
+        data = doc.to_dict()
+        version_stamps.record(collection, doc_id, doc.update_time)
+        await shared_cache.set(key, {'data': data, 'version': doc.update_time})
+        return data
+    
+    async def _client_changed(self, client_id: str):
+        """Drop local and shared copies derived from a client document"""
+        version_stamps.invalidate('clients', client_id)
+        await shared_cache.invalidate('clients', client_id, client_progress_key(client_id))
+    
+    def _org_metrics_ref(self, organization_id: str):
+        """Running aggregates for an organization"""
+        return self.db.collection('org_metrics').document(organization_id)
+    
+    def _status_event_ref(self, client_ref, seq: int):
+        """Status event by sequence number (zero-padded ids sort in order)"""
+        return client_ref.collection(STATUS_EVENTS).document(f"{seq:08d}")
+    
+    def _record_status_change(
+        self,
+        batch,
+        doc_ref,
+        before: Dict[str, Any],
+        fields: Dict[str, Any],
+        actor: Optional[str] = None,
+        mirror=None
+    ):
+        """
+        Add the status event, the client's timeline projection fields and
+        org metric increments for a status transition
+        The event is created under the next sequence number, so a
+        concurrent transition makes the commit fail instead of forking
+        the history (mirror: partitioned copy also given the event)
+        """
+        old_status = before.get('status', 'intake')
+        new_status = fields['status']
+        changed_at = fields['updated_at']
+        if old_status == new_status:
+            return
+        
+        organization_id = before.get('organization_id')
+        zone = before.get('zone', 'default')
+        seq = before.get('status_event_count', 0) + 1
+        event = {
+            'seq': seq,
+            'from_status': old_status,
+            'to_status': new_status,
+            'at': changed_at,
+            'actor': actor,
+            'organization_id': organization_id,
+            'zone': zone
+        }
+        batch.create(self._status_event_ref(doc_ref, seq), event)
+        if mirror is not None:
+            batch.create(self._status_event_ref(mirror, seq), event)
+        
+        # Timeline projection: first time the client entered each status
+        timeline = before.get('status_timeline')
+        if timeline is None:
+            # Clients created before status events: approximate as before
+            created_at = before.get('created_at') or changed_at
+            timeline = {'intake': created_at, old_status: created_at}
+            fields['status_timeline'] = {**timeline, new_status: changed_at}
+        elif new_status not in timeline:
+            fields[f'status_timeline.{new_status}'] = changed_at
+        fields['status_changed_at'] = changed_at
+        fields['status_event_count'] = seq
+        
+        if not organization_id:
+            return
+        
+        # Time spent in the status being left
+        entered_at = before.get('status_changed_at') or before.get('created_at')
+        metrics = {
+            'status_counts': {
+                old_status: firestore.Increment(-1),
+                new_status: firestore.Increment(1)
+            },
+            'zone_status_counts': {
+                zone: {
+                    old_status: firestore.Increment(-1),
+                    new_status: firestore.Increment(1)
+                }
+            },
+            'transition_counts': {
+                f"{old_status}_to_{new_status}": firestore.Increment(1)
+            },
+            'updated_at': changed_at
+        }
+        if entered_at:
+            metrics['status_days_sum'] = {
+                old_status: firestore.Increment(_elapsed_seconds(entered_at, changed_at) / 86400)
+            }
+            metrics['status_exits'] = {old_status: firestore.Increment(1)}
+        
+        # Days to placement: intake to first placement
+        if (
+            new_status == 'placed'
+            and 'placed' not in timeline
+            and not before.get('housing_placed_at')
+        ):
+            intake_at = (
+                timeline.get('intake')
+                or before.get('intake_completed_at')
+                or before.get('created_at')
+            )
+            if intake_at:
+                days = _elapsed_seconds(intake_at, changed_at) / 86400
+                metrics.update({
+                    'placement_count': firestore.Increment(1),
+                    'placement_days_sum': firestore.Increment(days),
+                    'placement_days_sketch': {
+                        QuantileSketch.bucket_key(days): firestore.Increment(1)
+                    }
+                })
+        
+        batch.set(self._org_metrics_ref(organization_id), metrics, merge=True)
+
+
+def _summarize_metrics(
+    data: Dict[str, Any],
+    response_sketch: QuantileSketch,
+    placement_sketch: QuantileSketch
+) -> Dict[str, Any]:
+    """Averages, percentiles and compliance from running sums and counts"""
+    response_count = data.get('response_count', 0)
+    placement_count = data.get('placement_count', 0)
+    completed = data.get('actions_completed', 0)
+    exits = data.get('status_exits', {})
+    
+    return {
+        'avg_response_time_hours': (
+            data.get('response_hours_sum', 0) / response_count if response_count else 0
+        ),
+        'p50_response_time_hours': response_sketch.quantile(0.5) or 0,
+        'p90_response_time_hours': response_sketch.quantile(0.9) or 0,
+        'avg_placement_days': (
+            data.get('placement_days_sum', 0) / placement_count if placement_count else 0
+        ),
+        'p50_placement_days': placement_sketch.quantile(0.5) or 0,
+        'p90_placement_days': placement_sketch.quantile(0.9) or 0,
+        'documentation_compliance': (
+            data.get('actions_documented', 0) / completed * 100 if completed else 0.0
+        ),
+        'avg_days_in_status': {
+            status: days / exits[status]
+            for status, days in data.get('status_days_sum', {}).items()
+            if exits.get(status)
+        }
+    }
+
+
+def _elapsed_seconds(start: datetime, end: datetime) -> float:
+    """Seconds between two datetimes, tolerating naive UTC and aware values"""
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    return max((end - start).total_seconds(), 0.0)
 
 
 # Global Firestore instance
@@ -0,0 +1,236 @@
+"""
+Duplicate client detection
+The same person often completes intake more than once (different QR
+codes, different days). Each client document carries blocking keys, so
+an intake finds its candidate duplicates with one indexed lookup and
+scores only that small block
+
+Blocking keys (dedup_keys on the client document):
+- p:<E.164 phone>
+- d:<date of birth>:<Soundex of first name> and of last name (swapped
+  first/last names land in the same block)
+
+A pair can only reach the flag score if its phone or date of birth
+agree, so name-only blocks (every "Maria Garcia") aren't needed
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import re
+
+from app.core.config import settings
+from app.services.notifications import to_e164
+
+# Fields the keys and the score are computed from
+IDENTITY_FIELDS = ('first_name', 'last_name', 'date_of_birth', 'phone')
+
+# Candidate fields read from Firestore (projection)
+CANDIDATE_FIELDS = [*IDENTITY_FIELDS, 'status', 'organization_id', 'assigned_caseworker_id']
+
+# Score weights; name similarity is Jaro-Winkler, the rest agree or not
+NAME_WEIGHT = 0.5
+DOB_WEIGHT = 0.3
+PHONE_WEIGHT = 0.2
+
+POLICIES = ('off', 'flag', 'merge')
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase letters only ("O'Brien-Diaz" -> "obriendiaz")"""
+    return re.sub(r"[^a-z]", "", (name or "").lower())
+
+
+def soundex(name: Optional[str]) -> str:
+    """American Soundex code ("Robert" -> "R163"); empty if no letters"""
+    letters = normalize_name(name)
+    if not letters:
+        return ""
+    
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code; vowels do
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1]"""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    
+    window = max(len(a), len(b)) // 2 - 1
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == char:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    
+    # Matched characters out of order, counted in pairs
+    a_chars = [char for char, matched in zip(a, a_matched) if matched]
+    b_chars = [char for char, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def birth_date(value: Any) -> Optional[str]:
+    """Date of birth as YYYY-MM-DD (datetimes read as UTC, like Firestore stores them)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, str) and value:
+        return value[:10]
+    return None
+
+
+@dataclass
+class DuplicateCandidate:
+    """A scored existing client that may be the same person"""
+    client_id: str
+    score: float
+    matched_on: List[str] = field(default_factory=list)
+    client: Dict[str, Any] = field(default_factory=dict, repr=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Stored on the new client (possible_duplicates)"""
+        return {'client_id': self.client_id, 'score': self.score, 'matched_on': self.matched_on}
+
+
+class DuplicateDetector:
+    """Blocking keys and pairwise scoring for duplicate intakes"""
+    
+    def __init__(
+        self,
+        policy: str = "flag",
+        flag_score: float = 0.7,
+        merge_score: float = 0.95,
+        max_candidates: int = 50
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown duplicate policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.flag_score = flag_score
+        self.merge_score = merge_score
+        self.max_candidates = max_candidates
+    
+    @property
+    def enabled(self) -> bool:
+        return self.policy != 'off'
+    
+    def keys(self, record: Dict[str, Any]) -> List[str]:
+        """Blocking keys of a client record (at most 3)"""
+        keys = []
+        phone = to_e164(record.get('phone'))
+        if phone:
+            keys.append(f"p:{phone}")
+        
+        dob = birth_date(record.get('date_of_birth'))
+        if dob:
+            for name in (record.get('first_name'), record.get('last_name')):
+                code = soundex(name)
+                if code and f"d:{dob}:{code}" not in keys:
+                    keys.append(f"d:{dob}:{code}")
+        return keys
+    
+    def score(self, record: Dict[str, Any], other: Dict[str, Any]) -> DuplicateCandidate:
+        """Weighted agreement of names, date of birth and phone"""
+        first = normalize_name(record.get('first_name'))
+        last = normalize_name(record.get('last_name'))
+        other_first = normalize_name(other.get('first_name'))
+        other_last = normalize_name(other.get('last_name'))
+        
+        name = max(
+            (jaro_winkler(first, other_first) + jaro_winkler(last, other_last)) / 2,
+            (jaro_winkler(first, other_last) + jaro_winkler(last, other_first)) / 2
+        )
+        total = NAME_WEIGHT * name
+        matched_on = ['name'] if name >= 0.9 else []
+        
+        dob = birth_date(record.get('date_of_birth'))
+        if dob and dob == birth_date(other.get('date_of_birth')):
+            total += DOB_WEIGHT
+            matched_on.append('date_of_birth')
+        
+        phone = to_e164(record.get('phone'))
+        if phone and phone == to_e164(other.get('phone')):
+            total += PHONE_WEIGHT
+            matched_on.append('phone')
+        
+        return DuplicateCandidate(
+            client_id=other.get('id', ''),
+            score=round(total, 3),
+            matched_on=matched_on,
+            client=other
+        )
+    
+    def rank(self, record: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[DuplicateCandidate]:
+        """Candidates at or above the flag score, best first"""
+        matches = [self.score(record, candidate) for candidate in candidates]
+        matches = [match for match in matches if match.score >= self.flag_score]
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches
+    
+    def in_organization(
+        self,
+        matches: List[DuplicateCandidate],
+        organization_id: Optional[str]
+    ) -> List[DuplicateCandidate]:
+        """
+        Matches among the intake organization's own clients; whether
+        someone is a client elsewhere is never recorded or disclosed
+        """
+        return [match for match in matches if match.client.get('organization_id') == organization_id]
+    
+    def should_merge(self, match: DuplicateCandidate, organization_id: Optional[str]) -> bool:
+        """
+        Merge policy: fold the intake into the existing client
+        Only within the intake's organization (see in_organization)
+        """
+        return (
+            self.policy == 'merge'
+            and match.score >= self.merge_score
+            and match.client.get('status') != 'inactive'
+            and match.client.get('organization_id') == organization_id
+        )
+
+
+# Global duplicate detector
+duplicate_detector = DuplicateDetector(
+    policy=settings.DEDUP_POLICY,
+    flag_score=settings.DEDUP_FLAG_SCORE,
+    merge_score=settings.DEDUP_MERGE_SCORE,
+    max_candidates=settings.DEDUP_MAX_CANDIDATES
+)
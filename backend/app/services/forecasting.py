@@ -0,0 +1,183 @@
+"""
+Intake volume forecasting
+Seasonal exponential smoothing over daily intake counts
+
+All series (zone x acuity) are smoothed together as NumPy arrays, and
+every candidate smoothing parameter set is evaluated in the same pass,
+so the only Python loop is over days of history.
+This runs in the forecast worker process, never on the request path.
+"""
+
+from typing import Dict, List, Tuple
+import itertools
+import numpy as np
+
+from app.models.client import HousingType
+
+# Weekly seasonality in daily intake counts
+SEASON_LENGTH = 7
+
+# Candidate smoothing parameters (level, trend, season)
+ALPHAS = (0.05, 0.1, 0.2, 0.4)
+BETAS = (0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.3)
+
+# Trend damping keeps long horizons from running away
+DAMPING = 0.98
+
+# z-score for the upper bound used in capacity planning (90%)
+UPPER_Z = 1.2816
+
+# Same acuity -> housing program mapping as VI-SPDAT scoring
+ACUITY_HOUSING_TYPE = {
+    'high': HousingType.PERMANENT_SUPPORTIVE,
+    'medium': HousingType.RAPID_REHOUSING,
+    'low': HousingType.EMERGENCY_SHELTER,
+}
+
+
+def _parameter_grid() -> np.ndarray:
+    """All (alpha, beta, gamma) combinations as a (P, 3) array"""
+    return np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+
+
+def holt_winters_forecast(
+    history: np.ndarray,
+    horizon: int,
+    season_length: int = SEASON_LENGTH
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Damped additive Holt-Winters forecast for many series at once
+    
+    history: (S, T) daily counts, one row per series
+    Returns (forecast (S, horizon), one-step residual std (S,))
+    
+    Parameters are chosen per series by one-step-ahead squared error
+    over the candidate grid.
+    """
+    y = np.asarray(history, dtype=np.float64)
+    if y.ndim != 2:
+        raise ValueError("history must be a 2-D array (series x days)")
+    
+    n_series, n_days = y.shape
+    m = season_length
+    if n_days < 2 * m:
+        # Not enough history for seasonality: flat mean forecast
+        mean = y.mean(axis=1) if n_days else np.zeros(n_series)
+        std = y.std(axis=1) if n_days else np.zeros(n_series)
+        return np.repeat(mean[:, None], horizon, axis=1), std
+    
+    grid = _parameter_grid()
+    alpha = grid[:, 0][:, None]
+    beta = grid[:, 1][:, None]
+    gamma = grid[:, 2][:, None]
+    n_params = grid.shape[0]
+    
+    # Initial state from the first two seasons, broadcast to (P, S)
+    first = y[:, :m].mean(axis=1)
+    second = y[:, m:2 * m].mean(axis=1)
+    level = np.broadcast_to(first, (n_params, n_series)).copy()
+    trend = np.broadcast_to((second - first) / m, (n_params, n_series)).copy()
+    season = np.broadcast_to(
+        (y[:, :m] - first[:, None]).T[:, None, :], (m, n_params, n_series)
+    ).copy()
+    
+    sse = np.zeros((n_params, n_series))
+    for t in range(m, n_days):
+        slot = t % m
+        observed = y[:, t]
+        seasonal = season[slot]
+        
+        predicted = level + DAMPING * trend + seasonal
+        error = observed - predicted
+        sse += error * error
+        
+        new_level = alpha * (observed - seasonal) + (1 - alpha) * (level + DAMPING * trend)
+        trend = beta * (new_level - level) + (1 - beta) * DAMPING * trend
+        season[slot] = gamma * (observed - new_level) + (1 - gamma) * seasonal
+        level = new_level
+    
+    # Pick the best parameter set per series
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_series)
+    level = level[best, columns]
+    trend = trend[best, columns]
+    season = season[:, best, columns]
+    residual_std = np.sqrt(sse[best, columns] / (n_days - m))
+    
+    # Damped trend: sum of phi^1..phi^h
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(DAMPING ** steps)
+    slots = (n_days + steps - 1) % m
+    forecast = level[:, None] + trend[:, None] * damped[None, :] + season[slots].T
+    
+    return np.clip(forecast, 0, None), residual_std
+
+
+def build_history_matrix(
+    daily_counts: Dict[str, Dict[Tuple[str, str], int]],
+    days: List[str]
+) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """
+    Dense (series x days) matrix from sparse per-day counts
+    daily_counts: {date: {(zone, acuity): count}}
+    """
+    keys = sorted({key for counts in daily_counts.values() for key in counts})
+    index = {key: i for i, key in enumerate(keys)}
+    matrix = np.zeros((len(keys), len(days)))
+    
+    for day_index, day in enumerate(days):
+        for key, count in daily_counts.get(day, {}).items():
+            matrix[index[key], day_index] = count
+    
+    return keys, matrix
+
+
+def summarize_forecast(
+    keys: List[Tuple[str, str]],
+    forecast: np.ndarray,
+    residual_std: np.ndarray,
+    periods: Tuple[int, ...] = (7, 30)
+) -> Dict[str, object]:
+    """
+    Expected intakes per zone/acuity and demand per housing type
+    Upper bounds assume independent daily errors
+    """
+    by_zone: Dict[str, Dict[str, Dict[str, float]]] = {}
+    housing_demand = {
+        housing_type.value: {f"next_{p}_days": 0.0 for p in periods}
+        for housing_type in HousingType
+    }
+    for demand in housing_demand.values():
+        demand.update({f"next_{p}_days_upper": 0.0 for p in periods})
+    
+    housing_variance = {
+        housing_type.value: {p: 0.0 for p in periods} for housing_type in HousingType
+    }
+    
+    for row, (zone, acuity) in enumerate(keys):
+        housing_type = ACUITY_HOUSING_TYPE.get(acuity, HousingType.OTHER).value
+        zone_entry = by_zone.setdefault(zone, {}).setdefault(acuity, {})
+        for p in periods:
+            expected = float(forecast[row, :p].sum())
+            zone_entry[f"next_{p}_days"] = round(expected, 2)
+            housing_demand[housing_type][f"next_{p}_days"] += expected
+            housing_variance[housing_type][p] += float(residual_std[row]) ** 2 * p
+    
+    for housing_type, demand in housing_demand.items():
+        for p in periods:
+            expected = demand[f"next_{p}_days"]
+            upper = expected + UPPER_Z * housing_variance[housing_type][p] ** 0.5
+            demand[f"next_{p}_days"] = round(expected, 2)
+            demand[f"next_{p}_days_upper"] = round(upper, 2)
+    
+    daily_total = forecast.sum(axis=0) if len(keys) else np.zeros(forecast.shape[1])
+    
+    return {
+        'daily_total': [round(float(v), 2) for v in daily_total],
+        'by_zone': by_zone,
+        'housing_demand': housing_demand,
+        'total': {
+            f"next_{p}_days": round(float(daily_total[:p].sum()), 2) for p in periods
+        },
+    }
@@ -0,0 +1,209 @@
+"""
+Idempotency keys for retried writes
+A request carrying an Idempotency-Key runs at most once per key within
+the TTL; replays get the stored result without re-running the handler
+
+- Concurrent duplicates on one worker process share a single execution
+- Across workers and instances the first request claims the key in the
+  shared cache (SET NX) and renews the claim while it runs; others wait
+  for its result. A claim outlives a crashed worker by at most claim_ttl
+- Reusing a key with a different payload is an error
+- Failed executions are not stored, so the client can retry them
+
+Collapsing across worker processes needs the shared cache (REDIS_URL):
+without it, or while Redis is down, each worker only collapses its own
+duplicates
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+
+import orjson
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.services.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """Key reused with a different request payload"""
+
+
+class IdempotencyInProgress(Exception):
+    """Key claimed by a request that hasn't finished yet"""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON-serializable request payload"""
+    canonical = orjson.loads(dumps(payload))
+    return hashlib.sha256(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+@dataclass
+class IdempotencyEntry:
+    fingerprint: str
+    future: asyncio.Future
+    expires_at: float
+
+
+class IdempotencyStore:
+    """Short-lived results by idempotency key (local, plus shared cache)"""
+    
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = 3600,
+        wait_timeout: float = 15.0,
+        claim_ttl: int = 30,
+        max_entries: int = 10_000,
+        shared=None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.claim_ttl = claim_ttl
+        self.shared = shared
+        # Insertion order == expiry order (constant TTL)
+        self._entries: Dict[str, IdempotencyEntry] = {}
+        self.stats = {'executed': 0, 'replayed': 0, 'collapsed': 0}
+    
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Result for key, running compute only if no result exists
+        Returns (result, replayed); compute must return JSON-serializable data
+        """
+        self._expire()
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            replayed = entry.future.done()
+            self.stats['replayed' if replayed else 'collapsed'] += 1
+            return await asyncio.shield(entry.future), True
+        
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._entries[key] = IdempotencyEntry(
+            fingerprint=fingerprint,
+            future=future,
+            expires_at=time.monotonic() + self.ttl
+        )
+        
+        try:
+            result, replayed = await self._run_shared(key, fingerprint, compute)
+        except BaseException as e:
+            self._entries.pop(key, None)
+            if not future.done():
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            raise
+        
+        future.set_result(result)
+        return result, replayed
+    
+    async def _run_shared(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Claim key in the shared cache, or wait for the instance that did"""
+        shared_key = f"idem:{self.namespace}:{key}"
+        claimed = None
+        if self.shared is not None:
+            claimed = await self.shared.add(
+                shared_key,
+                {'state': 'pending', 'fingerprint': fingerprint},
+                ttl=self.claim_ttl
+            )
+        
+        if claimed is False:
+            return await self._wait_shared(shared_key, fingerprint), True
+        
+        heartbeat = None
+        if claimed:
+            heartbeat = asyncio.ensure_future(self._hold_claim(shared_key))
+        try:
+            result = await compute()
+        except BaseException:
+            if claimed:
+                await self.shared.delete(shared_key)
+            raise
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+        
+        self.stats['executed'] += 1
+        if claimed:
+            await self.shared.set(
+                shared_key,
+                {'state': 'done', 'fingerprint': fingerprint, 'result': result},
+                ttl=self.ttl
+            )
+        return result, False
+    
+    async def _hold_claim(self, shared_key: str):
+        """Renew the claim while the request runs, however long it takes"""
+        while True:
+            await asyncio.sleep(self.claim_ttl / 3)
+            if await self.shared.expire(shared_key, self.claim_ttl) is False:
+                logger.warning(f"Idempotency claim {shared_key} expired while running")
+                return
+    
+    async def _wait_shared(self, shared_key: str, fingerprint: str) -> Any:
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.05
+        while True:
+            record = await self.shared.get(shared_key)
+            if record is not None:
+                if record['fingerprint'] != fingerprint:
+                    raise IdempotencyConflict(shared_key)
+                if record['state'] == 'done':
+                    self.stats['replayed'] += 1
+                    return record['result']
+            else:
+                # First attempt failed or expired (or Redis is gone): retryable
+                raise IdempotencyInProgress(shared_key)
+            
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(shared_key)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+    
+    def _expire(self):
+        """Drop expired entries and the oldest ones beyond max_entries"""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) < self.max_entries:
+                break
+            self._entries.pop(key, None)
+
+
+def _consume_exception(future: asyncio.Future):
+    """Failed executions may have no waiters; don't report them as unhandled"""
+    if not future.cancelled():
+        future.exception()
+
+
+# Intake submissions (mobile retries on flaky networks)
+intake_idempotency = IdempotencyStore(
+    namespace="intake_submit",
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    shared=shared_cache
+)
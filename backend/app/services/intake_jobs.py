@@ -0,0 +1,91 @@
+"""
+Post-intake background jobs
+Side effects of an intake submission that run after the response is sent
+
+Payloads carry only ids; handlers read the client record themselves so
+no contact details are copied into the job backlog.
+"""
+
+from typing import Any, Dict, Optional
+import logging
+
+from app.services.database import db_service
+from app.services.job_queue import job_queue
+from app.services.notifications import NotificationError, notifications, to_e164
+
+logger = logging.getLogger(__name__)
+
+SEND_INTAKE_CONFIRMATION = "send_intake_confirmation"
+ALERT_CASEWORKER = "alert_caseworker"
+
+CONFIRMATION_SMS = (
+    "H.O.M.E.: We received your information. "
+    "A caseworker will contact you soon. Reply STOP to opt out."
+)
+CONFIRMATION_SUBJECT = "We received your information"
+CONFIRMATION_EMAIL = (
+    "Hi -first_name-,\n\n"
+    "Thank you for completing your intake with H.O.M.E. "
+    "A caseworker will contact you soon.\n"
+)
+ALERT_SUBJECT = "New high acuity intake"
+# No client details over SMS/email; caseworkers open the queue for them
+ALERT_TEXT = "H.O.M.E.: A new high acuity intake was assigned to you. Open your action queue for details."
+
+
+@job_queue.handler(SEND_INTAKE_CONFIRMATION)
+async def send_intake_confirmation(payload: Dict[str, Any]):
+    """Confirm receipt to the client over their preferred channel"""
+    client = await db_service.get_client(payload['client_id'])
+    if not client:
+        logger.warning(f"Confirmation skipped, client not found: {payload['client_id']}")
+        return
+    
+    phone = to_e164(client.get('phone'))
+    email = client.get('email')
+    prefers_email = client.get('preferred_contact') == 'email'
+    
+    if phone and notifications.sms_enabled and not (prefers_email and email):
+        await _deliver(notifications.send_sms(phone, CONFIRMATION_SMS), client['id'])
+    elif email and notifications.email_enabled:
+        await _deliver(
+            notifications.send_email(
+                email,
+                CONFIRMATION_SUBJECT,
+                CONFIRMATION_EMAIL,
+                substitutions={'-first_name-': client.get('preferred_name') or client['first_name']}
+            ),
+            client['id']
+        )
+    else:
+        logger.info(f"Confirmation skipped, no usable contact channel: {client['id']}")
+
+
+@job_queue.handler(ALERT_CASEWORKER)
+async def alert_caseworker(payload: Dict[str, Any]):
+    """Tell the assigned caseworker about an urgent new intake"""
+    caseworker = await db_service.get_caseworker(payload['caseworker_id'])
+    if not caseworker:
+        logger.warning(f"Alert skipped, caseworker not found: {payload['caseworker_id']}")
+        return
+    
+    phone = to_e164(caseworker.get('phone'))
+    if phone and notifications.sms_enabled:
+        await _deliver(notifications.send_sms(phone, ALERT_TEXT), payload['client_id'])
+    elif caseworker.get('email') and notifications.email_enabled:
+        await _deliver(
+            notifications.send_email(caseworker['email'], ALERT_SUBJECT, ALERT_TEXT),
+            payload['client_id']
+        )
+    else:
+        logger.info(f"Alert skipped, no usable contact channel: {payload['caseworker_id']}")
+
+
+async def _deliver(send, client_id: Optional[str]):
+    """Await a send; permanent provider errors are logged, not retried"""
+    try:
+        await send
+    except NotificationError as e:
+        if e.retryable:
+            raise
+        logger.warning(f"Notification for client {client_id} rejected: {e}")
@@ -0,0 +1,359 @@
+"""
+Background job queue
+In-process asyncio queue for request side effects that must not add
+third-party latency to requests (confirmations, caseworker alerts)
+
+- A bounded pool of workers runs registered handlers and retries
+  failures with exponential backoff (tenacity)
+- Every job is persisted in job_backlog before it is queued and deleted
+  once it succeeds. enqueue() doesn't wait for the write: jobs enqueued
+  meanwhile are committed together in one batch (off the event loop)
+  and queued once it lands
+- Each retry renews the job's lease, so a job that is still retrying
+  isn't reclaimed elsewhere. Jobs whose lease expired (instance
+  restarted, or its queue was full) are reclaimed by whichever instance
+  sees them first; jobs that exhaust their retries stay there marked
+  failed
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential_jitter
+
+from app.core.config import settings
+from app.services.quantile_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+BACKLOG_COLLECTION = 'job_backlog'
+
+# Backlog writes per commit (Firestore allows 500)
+BATCH_SIZE = 400
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    payload: Dict[str, Any]
+    max_attempts: int
+    attempts: int = 0
+    enqueued_at: float = 0.0  # wall clock, for latency
+    lease_until: Optional[datetime] = None
+
+
+class JobQueue:
+    """Bounded asyncio worker pool with retries and a Firestore backlog"""
+    
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue: int = 1000,
+        max_attempts: int = 5,
+        job_timeout: float = 30.0,
+        backoff_seconds: float = 1.0,
+        lease_seconds: int = 300,
+        recover_interval: float = 60.0
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.job_timeout = job_timeout
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.recover_interval = recover_interval
+        self.db = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: List[asyncio.Task] = []
+        # Backlog writes not committed yet: (job, document, queue after commit)
+        self._writes: List[Tuple[Job, Dict[str, Any], bool]] = []
+        self._unqueued = 0
+        self._flushing: Optional[asyncio.Task] = None
+        self.in_flight = 0
+        self.latency = QuantileSketch()
+        self.stats = {
+            'enqueued': 0, 'completed': 0, 'failed': 0, 'retries': 0,
+            'overflowed': 0, 'recovered': 0,
+        }
+    
+    def handler(self, name: str):
+        """Decorator registering the handler for a job name"""
+        
+        def decorator(func: JobHandler) -> JobHandler:
+            self._handlers[name] = func
+            return func
+        
+        return decorator
+    
+    async def start(self, db=None):
+        """Start workers (and backlog recovery when db is given)"""
+        if self._tasks:
+            return
+        self.db = db
+        self._tasks = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+        ]
+        if db is not None:
+            self._tasks.append(asyncio.ensure_future(self._recover_loop()))
+        logger.info(f"Job queue started: {self.workers} workers")
+    
+    async def stop(self, timeout: float = 10.0):
+        """Let queued jobs finish for up to timeout; the rest stay in the backlog"""
+        if not self._tasks:
+            return
+        if self._flushing is not None:
+            await asyncio.wait([self._flushing], timeout=timeout)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Job queue stopped with {self._queue.qsize()} jobs pending")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def enqueue(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        max_attempts: Optional[int] = None
+    ) -> str:
+        """Persist and queue a job; returns without waiting for either"""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job: {name}")
+        
+        job = Job(
+            id=uuid.uuid4().hex,
+            name=name,
+            payload=payload,
+            max_attempts=max_attempts or self.max_attempts,
+            enqueued_at=time.time()
+        )
+        overflow = self._queue.qsize() + self._unqueued >= self._queue.maxsize
+        
+        self.stats['enqueued'] += 1
+        if overflow:
+            self.stats['overflowed'] += 1
+        
+        if self.db is None:
+            if overflow:
+                logger.error(f"Job queue full, dropped {name} job {job.id}")
+            else:
+                self._queue.put_nowait(job)
+            return job.id
+        
+        now = datetime.utcnow()
+        # Overflowed jobs are left for recovery right away
+        job.lease_until = now if overflow else now + timedelta(seconds=self.lease_seconds)
+        self._writes.append((job, {
+            'name': job.name,
+            'payload': job.payload,
+            'status': 'pending',
+            'attempts': 0,
+            'max_attempts': job.max_attempts,
+            'created_at': now,
+            'lease_until': job.lease_until
+        }, not overflow))
+        if not overflow:
+            self._unqueued += 1
+        if self._flushing is None:
+            self._flushing = asyncio.ensure_future(self._flush())
+        return job.id
+    
+    async def _flush(self):
+        """Commit pending backlog writes in batches, then queue their jobs"""
+        try:
+            while self._writes:
+                writes = self._writes[:BATCH_SIZE]
+                del self._writes[:BATCH_SIZE]
+                batch = self.db.batch()
+                for job, document, _ in writes:
+                    batch.set(self._backlog_ref(job.id), document)
+                try:
+                    await asyncio.to_thread(batch.commit)
+                except Exception as e:
+                    # Still run them here; only a restart would lose them
+                    logger.error(f"Job backlog write failed for {len(writes)} jobs: {e}")
+                
+                for job, _, queue in writes:
+                    if not queue:
+                        continue
+                    self._unqueued -= 1
+                    try:
+                        self._queue.put_nowait(job)
+                    except asyncio.QueueFull:
+                        logger.warning(f"Job queue full, {job.name} job {job.id} left for recovery")
+        finally:
+            self._flushing = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput, failures and latency (enqueue to done)"""
+        return {
+            'queue_depth': self._queue.qsize() + self._unqueued,
+            'in_flight': self.in_flight,
+            'workers': self.workers,
+            **self.stats,
+            'latency_seconds': {
+                f'p{int(q * 100)}': self.latency.quantile(q)
+                for q in (0.5, 0.95, 0.99)
+            },
+        }
+    
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Job {job.name} {job.id} crashed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+    
+    async def _run(self, job: Job):
+        handler = self._handlers[job.name]
+        self.in_flight += 1
+        try:
+            retrying = AsyncRetrying(
+                stop=stop_after_attempt(max(1, job.max_attempts - job.attempts)),
+                wait=wait_exponential_jitter(
+                    initial=self.backoff_seconds,
+                    max=60,
+                    jitter=self.backoff_seconds
+                ),
+                reraise=True
+            )
+            async for attempt in retrying:
+                with attempt:
+                    if job.attempts:
+                        self.stats['retries'] += 1
+                    await self._renew_lease(job, retry=attempt.retry_state.attempt_number > 1)
+                    job.attempts += 1
+                    await asyncio.wait_for(handler(job.payload), self.job_timeout)
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"Job {job.name} {job.id} failed after {job.attempts} attempts: {e}")
+            if self.db is not None:
+                await self._write(self._backlog_ref(job.id).update, {
+                    'status': 'failed',
+                    'attempts': job.attempts,
+                    'last_error': str(e)[:500],
+                    'failed_at': datetime.utcnow()
+                })
+            return
+        finally:
+            self.in_flight -= 1
+        
+        self.stats['completed'] += 1
+        self.latency.add(max(time.time() - job.enqueued_at, 0.0))
+        if self.db is not None:
+            await self._write(self._backlog_ref(job.id).delete)
+    
+    async def _renew_lease(self, job: Job, retry: bool):
+        """
+        Keep the job leased for another lease_seconds before an attempt
+        Retries always renew (backoff plus slow attempts can outlast a
+        lease); a first attempt only when the job sat queued for half of it
+        """
+        if self.db is None or job.lease_until is None:
+            return
+        now = datetime.utcnow()
+        if not retry and job.lease_until - now > timedelta(seconds=self.lease_seconds / 2):
+            return
+        
+        job.lease_until = now + timedelta(seconds=self.lease_seconds)
+        await self._write(self._backlog_ref(job.id).update, {
+            'lease_until': job.lease_until,
+            'attempts': job.attempts
+        })
+    
+    async def _write(self, operation, *args):
+        """One backlog write off the event loop; the job goes on regardless"""
+        try:
+            await asyncio.to_thread(operation, *args)
+        except NotFound:
+            pass
+        except Exception as e:
+            logger.warning(f"Job backlog write failed: {e}")
+    
+    async def _recover_loop(self):
+        while True:
+            await asyncio.sleep(self.recover_interval)
+            try:
+                await self._recover()
+            except Exception as e:
+                logger.warning(f"Job backlog recovery failed: {e}")
+    
+    async def _recover(self) -> int:
+        """Queue pending jobs with expired leases, claimed off the event loop"""
+        room = self._queue.maxsize - self._queue.qsize() - self._unqueued
+        if room <= 0:
+            return 0
+        
+        jobs = await asyncio.to_thread(self._claim_expired, room)
+        recovered = 0
+        for job in jobs:
+            if self._queue.full():
+                break  # the lease expires again and another pass takes it
+            self._queue.put_nowait(job)
+            recovered += 1
+        
+        if recovered:
+            self.stats['recovered'] += recovered
+            logger.info(f"Recovered {recovered} jobs from backlog")
+        return recovered
+    
+    def _claim_expired(self, limit: int) -> List[Job]:
+        """Claim up to limit expired jobs (blocking; optimistic, per document)"""
+        now = datetime.utcnow()
+        query = self.db.collection(BACKLOG_COLLECTION)
+        query = query.where('status', '==', 'pending')
+        query = query.where('lease_until', '<', now)
+        query = query.limit(limit)
+        
+        jobs = []
+        for doc in query.stream():
+            data = doc.to_dict()
+            if data.get('name') not in self._handlers:
+                continue
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            try:
+                doc.reference.update(
+                    {'lease_until': lease_until},
+                    option=self.db.write_option(last_update_time=doc.update_time)
+                )
+            except (FailedPrecondition, NotFound):
+                continue  # claimed or finished elsewhere
+            
+            created_at = data.get('created_at')
+            if created_at and created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            jobs.append(Job(
+                id=doc.id,
+                name=data['name'],
+                payload=data.get('payload') or {},
+                max_attempts=data.get('max_attempts', self.max_attempts),
+                attempts=data.get('attempts', 0),
+                enqueued_at=created_at.timestamp() if created_at else time.time(),
+                lease_until=lease_until
+            ))
+        return jobs
+    
+    def _backlog_ref(self, job_id: str):
+        return self.db.collection(BACKLOG_COLLECTION).document(job_id)
+
+
+# Global job queue (workers started by the app lifespan)
+job_queue = JobQueue(
+    workers=settings.JOB_QUEUE_WORKERS,
+    max_queue=settings.JOB_QUEUE_MAX_SIZE,
+    max_attempts=settings.JOB_MAX_ATTEMPTS
+)
@@ -0,0 +1,360 @@
+"""
+Housing matching engine
+Assigns assessed clients to open units in housing_resources in
+coordinated entry priority order: highest VI-SPDAT score first, longest
+wait breaking ties. Clients are only offered resources that serve their
+recommended housing type and whose eligibility rules they meet
+
+- Waiting clients sit in one priority queue (heap) per housing type
+- Resources with open units sit in buckets by (housing type, zone,
+  veterans only), so placing a client checks a few buckets, not every
+  resource: own zone first, and units reserved for veterans before
+  general ones for veterans (best fit keeps general units open)
+- Incremental: a new client takes the best open unit if there is one;
+  a unit that opens goes to the highest priority eligible client
+  waiting for that housing type
+
+Pure in-memory; app.jobs.match_housing loads it from Firestore and
+writes the matches
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import heapq
+
+from app.models.client import HousingType
+
+MAX_SCORE = 17
+
+# Client fields read from Firestore (projection)
+CLIENT_FIELDS = [
+    'status',
+    'zone',
+    'veteran_status',
+    'matched_housing_id',
+    'vi_spdat_score.total_score',
+    'vi_spdat_score.recommended_housing_type',
+    'vi_spdat_score.calculated_at',
+    'created_at',
+]
+
+
+def _epoch_seconds(value: Any) -> float:
+    if not isinstance(value, datetime):
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class WaitingClient:
+    """Assessed client waiting for a housing match"""
+    id: str
+    housing_type: str
+    score: int
+    zone: Optional[str] = None
+    veteran: bool = False
+    waiting_since: float = 0.0  # epoch seconds
+    
+    @property
+    def priority(self) -> Tuple[int, float, str]:
+        """
+        Heap key: higher score, then earlier assessment (else intake),
+        first; the coordinated entry by-name list ranks in this order
+        """
+        return (-self.score, self.waiting_since, self.id)
+    
+    @classmethod
+    def from_doc(cls, client_id: str, data: Dict[str, Any]) -> Optional['WaitingClient']:
+        """None unless the client is assessed, unmatched and scored"""
+        score = data.get('vi_spdat_score') or {}
+        if (
+            data.get('status') != 'assessed'
+            or data.get('matched_housing_id')
+            or not score.get('recommended_housing_type')
+        ):
+            return None
+        housing_type = score['recommended_housing_type']
+        return cls(
+            id=client_id,
+            housing_type=getattr(housing_type, 'value', housing_type),
+            score=score.get('total_score') or 0,
+            zone=data.get('zone'),
+            veteran=bool(data.get('veteran_status')),
+            waiting_since=_epoch_seconds(score.get('calculated_at') or data.get('created_at'))
+        )
+
+
+@dataclass
+class Resource:
+    """Housing resource and its eligibility rules"""
+    id: str
+    housing_type: str
+    open_units: int = 0
+    name: str = ""
+    zone: Optional[str] = None  # None: citywide
+    serves: Tuple[str, ...] = ()  # housing types it takes (default: its own type)
+    veterans_only: bool = False
+    min_score: int = 0
+    max_score: int = MAX_SCORE
+    zones: Optional[FrozenSet[str]] = None  # only clients from these zones
+    
+    def __post_init__(self):
+        if not self.serves:
+            self.serves = (self.housing_type,)
+    
+    def accepts(self, client: WaitingClient) -> bool:
+        return (
+            client.housing_type in self.serves
+            and self.min_score <= client.score <= self.max_score
+            and (client.veteran or not self.veterans_only)
+            and (self.zones is None or client.zone in self.zones)
+        )
+    
+    @classmethod
+    def from_doc(cls, resource_id: str, data: Dict[str, Any]) -> 'Resource':
+        """
+        housing_resources document: type, available_beds, name, and the
+        optional zone, serves and eligibility {veterans_only, min_score,
+        max_score, zones}
+        """
+        eligibility = data.get('eligibility') or {}
+        zones = eligibility.get('zones')
+        return cls(
+            id=resource_id,
+            housing_type=data.get('type', HousingType.OTHER.value),
+            open_units=max(int(data.get('available_beds') or 0), 0),
+            name=data.get('name', ''),
+            zone=data.get('zone'),
+            serves=tuple(data.get('serves') or ()),
+            veterans_only=bool(eligibility.get('veterans_only')),
+            min_score=eligibility.get('min_score', 0),
+            max_score=eligibility.get('max_score', MAX_SCORE),
+            zones=frozenset(zones) if zones else None
+        )
+
+
+# Waiting client queue: (housing type, zone, veteran)
+QueueKey = Tuple[str, Optional[str], bool]
+
+
+@dataclass
+class Match:
+    client_id: str
+    resource_id: str
+    score: int
+    housing_type: str
+
+
+class MatchingEngine:
+    """Waiting clients and open units; every change returns the new matches"""
+    
+    def __init__(self):
+        self.clients: Dict[str, WaitingClient] = {}
+        self.resources: Dict[str, Resource] = {}
+        
+        # (housing type, zone, veteran) -> heap of (priority, client id), so
+        # restricted units only look at clients they could take; stale
+        # entries (client removed, matched or re-queued) are skipped lazily
+        self._queues: Dict[QueueKey, List[Tuple[Tuple[int, float, str], str]]] = {}
+        self._queue_keys: Dict[str, Dict[QueueKey, None]] = {}
+        self._queued_entries = 0
+        # (housing type, zone, veterans only) -> resource ids with open units
+        self._buckets: Dict[Tuple[str, Optional[str], bool], Dict[str, None]] = {}
+        # housing type -> zone -> resources with open units there
+        self._zones: Dict[str, Dict[Optional[str], int]] = {}
+    
+    # -- clients --
+    
+    def add_client(self, client: WaitingClient) -> List[Match]:
+        """Queue (or re-queue) a client; matched right away if a unit is open"""
+        self.remove_client(client.id)
+        resource = self._best_unit(client)
+        if resource is not None:
+            return [self._assign(client, resource)]
+        
+        self.clients[client.id] = client
+        heapq.heappush(self._queue(client), (client.priority, client.id))
+        self._queued_entries += 1
+        if self._queued_entries > 2 * len(self.clients) + 1024:
+            self._compact()
+        return []
+    
+    def remove_client(self, client_id: str):
+        """Client no longer waiting (its heap entry goes stale)"""
+        self.clients.pop(client_id, None)
+    
+    def match_all(self, clients: List[WaitingClient]) -> List[Match]:
+        """
+        Batch run: clients in priority order, each taking its best open
+        unit (rather than units picking clients in resource order)
+        """
+        matches = []
+        for client in sorted(clients, key=lambda c: c.priority):
+            matches.extend(self.add_client(client))
+        return matches
+    
+    # -- resources --
+    
+    def set_resource(self, resource: Resource, fill: bool = True) -> List[Match]:
+        """Add or replace a resource; open units go to waiting clients"""
+        previous = self.resources.get(resource.id)
+        if previous is not None and previous.open_units > 0:
+            self._unindex(previous)
+        self.resources[resource.id] = resource
+        if resource.open_units > 0:
+            self._index(resource)
+        return self._fill(resource) if fill else []
+    
+    def release(self, resource_id: str, units: int = 1) -> List[Match]:
+        """Units opened again (e.g. a match that couldn't be written)"""
+        resource = self.resources[resource_id]
+        if resource.open_units == 0:
+            self._index(resource)
+        resource.open_units += units
+        return self._fill(resource)
+    
+    def remove_resource(self, resource_id: str):
+        resource = self.resources.pop(resource_id, None)
+        if resource is not None and resource.open_units > 0:
+            self._unindex(resource)
+    
+    # -- matching --
+    
+    def _best_unit(self, client: WaitingClient) -> Optional[Resource]:
+        """Best fit open resource: own zone first, restricted units before general"""
+        zones = self._zones.get(client.housing_type)
+        if not zones:
+            return None
+        
+        restrictions = (True, False) if client.veteran else (False,)
+        order = [client.zone] if client.zone in zones else []
+        order.extend(zone for zone in zones if zone != client.zone)
+        for zone in order:
+            for veterans_only in restrictions:
+                bucket = self._buckets.get((client.housing_type, zone, veterans_only))
+                if not bucket:
+                    continue
+                for resource_id in bucket:
+                    resource = self.resources[resource_id]
+                    if resource.accepts(client):
+                        return resource
+        return None
+    
+    def _fill(self, resource: Resource) -> List[Match]:
+        """Give open units to the highest priority eligible waiting clients"""
+        matches = []
+        while resource.open_units > 0:
+            client = self._pop_eligible(resource)
+            if client is None:
+                break
+            matches.append(self._assign(client, resource))
+        return matches
+    
+    def _pop_eligible(self, resource: Resource) -> Optional[WaitingClient]:
+        """Best waiting client the resource accepts, across the queues it can take from"""
+        best = None
+        for housing_type in resource.serves:
+            for key in self._queue_keys.get(housing_type, ()):
+                _, zone, veteran = key
+                if resource.veterans_only and not veteran:
+                    continue
+                if resource.zones is not None and zone not in resource.zones:
+                    continue
+                client = self._peek_eligible(self._queues[key], resource)
+                if client is not None and (best is None or client.priority < best.priority):
+                    best = client
+        
+        if best is not None:
+            del self.clients[best.id]
+        return best
+    
+    def _peek_eligible(self, queue, resource: Resource) -> Optional[WaitingClient]:
+        """
+        Best client in one queue the resource accepts (left queued)
+        Only score bounds can differ within a queue; the heap is ordered
+        by score, so a client under min_score ends the search
+        """
+        found = None
+        skipped = []
+        while queue:
+            priority, client_id = queue[0]
+            client = self.clients.get(client_id)
+            if client is None or client.priority != priority:
+                heapq.heappop(queue)
+                self._queued_entries -= 1
+                continue
+            if client.score < resource.min_score:
+                break
+            if resource.accepts(client):
+                found = client
+                break
+            skipped.append(heapq.heappop(queue))
+        for entry in skipped:
+            heapq.heappush(queue, entry)
+        return found
+    
+    def _assign(self, client: WaitingClient, resource: Resource) -> Match:
+        resource.open_units -= 1
+        if resource.open_units == 0:
+            self._unindex(resource)
+        return Match(client.id, resource.id, client.score, client.housing_type)
+    
+    # -- indexes --
+    
+    def _queue(self, client: WaitingClient) -> list:
+        key = (client.housing_type, client.zone, client.veteran)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = []
+            self._queue_keys.setdefault(client.housing_type, {})[key] = None
+        return queue
+    
+    def _index(self, resource: Resource):
+        for housing_type in resource.serves:
+            key = (housing_type, resource.zone, resource.veterans_only)
+            self._buckets.setdefault(key, {})[resource.id] = None
+            zones = self._zones.setdefault(housing_type, {})
+            zones[resource.zone] = zones.get(resource.zone, 0) + 1
+    
+    def _unindex(self, resource: Resource):
+        for housing_type in resource.serves:
+            key = (housing_type, resource.zone, resource.veterans_only)
+            bucket = self._buckets.get(key)
+            if bucket is None or resource.id not in bucket:
+                continue
+            del bucket[resource.id]
+            if not bucket:
+                del self._buckets[key]
+            zones = self._zones[housing_type]
+            zones[resource.zone] -= 1
+            if not zones[resource.zone]:
+                del zones[resource.zone]
+            if not zones:
+                del self._zones[housing_type]
+    
+    def _compact(self):
+        """Rebuild the heaps without stale entries"""
+        self._queues = {}
+        self._queue_keys = {}
+        for client in self.clients.values():
+            self._queue(client).append((client.priority, client.id))
+        for queue in self._queues.values():
+            heapq.heapify(queue)
+        self._queued_entries = len(self.clients)
+    
+    # -- reporting --
+    
+    def status(self) -> Dict[str, Any]:
+        waiting: Dict[str, int] = {}
+        for client in self.clients.values():
+            waiting[client.housing_type] = waiting.get(client.housing_type, 0) + 1
+        open_units: Dict[str, int] = {}
+        for resource in self.resources.values():
+            if resource.open_units > 0:
+                open_units[resource.housing_type] = (
+                    open_units.get(resource.housing_type, 0) + resource.open_units
+                )
+        return {'waiting': waiting, 'open_units': open_units}
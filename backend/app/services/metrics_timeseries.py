@@ -0,0 +1,145 @@
+"""
+Metrics time series from daily snapshots
+Filters and downsamples metrics_daily documents (day/week/month)
+
+Status counts are gauges: a period reports its last snapshot.
+Intakes/placements are flows: a period reports the change in the
+cumulative counters since the end of the previous period.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+INTERVALS = ('day', 'week', 'month')
+
+# Statuses that count as active caseload
+ACTIVE_STATUSES = ('intake', 'assessed', 'matched', 'placed', 'follow_up')
+
+
+def period_start(day: str, interval: str) -> str:
+    """First day of the period containing day (weeks start Monday)"""
+    current = date.fromisoformat(day)
+    if interval == 'week':
+        current -= timedelta(days=current.weekday())
+    elif interval == 'month':
+        current = current.replace(day=1)
+    return current.isoformat()
+
+
+def _reduce_snapshot(
+    snapshot: Dict[str, Any],
+    organization_id: Optional[str],
+    zone: Optional[str],
+    status: Optional[str]
+) -> Dict[str, Any]:
+    """Collapse one snapshot to filtered status counts and cumulative flows"""
+    by_status: Dict[str, int] = {}
+    for row_org, by_zone in (snapshot.get('counts') or {}).items():
+        if organization_id and row_org != organization_id:
+            continue
+        for row_zone, counts in by_zone.items():
+            if zone and row_zone != zone:
+                continue
+            for row_status, count in counts.items():
+                if status and row_status != status:
+                    continue
+                by_status[row_status] = by_status.get(row_status, 0) + count
+    
+    cumulative = {'intakes': 0, 'placements': 0}
+    for org, totals in (snapshot.get('totals') or {}).items():
+        if organization_id and org != organization_id:
+            continue
+        cumulative['intakes'] += totals.get('intakes', 0)
+        cumulative['placements'] += totals.get('placement_count', 0)
+    
+    return {'by_status': by_status, 'cumulative': cumulative}
+
+
+def downsample(
+    snapshots: List[Dict[str, Any]],
+    interval: str = 'day',
+    start_date: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    status: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Time series points from snapshots sorted by date
+    
+    Snapshots dated before start_date only serve as the baseline for the
+    first period's flows; without one, flows start at the first snapshot.
+    Flows are not split by zone or status; they follow the org filter.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    
+    baseline = None
+    periods: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        reduced = _reduce_snapshot(snapshot, organization_id, zone, status)
+        if start_date and snapshot['date'] < start_date:
+            baseline = reduced['cumulative']
+            continue
+        
+        key = period_start(snapshot['date'], interval)
+        if key not in periods:
+            periods[key] = {'first': reduced['cumulative']}
+        periods[key].update(date=snapshot['date'], **reduced)
+    
+    points = []
+    previous = baseline
+    for key, period in periods.items():
+        cumulative = period['cumulative']
+        base = previous if previous is not None else period['first']
+        points.append({
+            'period_start': key,
+            'snapshot_date': period['date'],
+            'by_status': period['by_status'],
+            'active_clients': sum(
+                count for s, count in period['by_status'].items()
+                if s in ACTIVE_STATUSES
+            ),
+            'intakes': cumulative['intakes'] - base['intakes'],
+            'placements': cumulative['placements'] - base['placements'],
+        })
+        previous = cumulative
+    
+    return points
+
+
+def intake_trend(
+    snapshots: List[Dict[str, Any]],
+    window_days: int = 7,
+    threshold: float = 0.1
+) -> str:
+    """
+    Compare intakes over the last window with the window before
+    Needs snapshots for the latest day and 1 and 2 windows earlier,
+    otherwise reports 'stable'
+    """
+    if not snapshots:
+        return 'stable'
+    
+    intakes = {
+        s['date']: _reduce_snapshot(s, None, None, None)['cumulative']['intakes']
+        for s in snapshots
+    }
+    latest = date.fromisoformat(max(intakes))
+    days = [
+        (latest - timedelta(days=offset)).isoformat()
+        for offset in (0, window_days, 2 * window_days)
+    ]
+    if any(day not in intakes for day in days):
+        return 'stable'
+    
+    recent = intakes[days[0]] - intakes[days[1]]
+    prior = intakes[days[1]] - intakes[days[2]]
+    if prior == 0:
+        return 'increasing' if recent > 0 else 'stable'
+    
+    change = (recent - prior) / prior
+    if change > threshold:
+        return 'increasing'
+    if change < -threshold:
+        return 'decreasing'
+    return 'stable'
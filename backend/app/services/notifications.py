@@ -0,0 +1,340 @@
+"""
+Notification dispatcher (Twilio SMS, SendGrid email)
+Talks to the provider REST APIs over one pooled HTTP client instead of
+the vendor SDKs, which open a connection per call
+
+- Emails sent within a short window with the same subject and body are
+  combined into one SendGrid request (one personalization per
+  recipient, with per-recipient substitutions). A batch rejected for a
+  recipient (400 on a personalizations field, e.g. one invalid address)
+  is split in halves and sent again, so only the requests holding a bad
+  recipient fail; any other rejection (bad API key, too large) fails
+  the whole batch at once
+- Provider rate limits are respected with token buckets; a 429 drains
+  the bucket for its Retry-After
+- Base URLs and the HTTP transport are configurable, so tests and
+  benchmarks can point the dispatcher at local stub servers
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import asyncio
+import logging
+import re
+
+import httpx
+
+from app.core.admission import TokenBucket
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# SendGrid accepts at most 1000 personalizations per request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+EmailBatchKey = Tuple[str, str]
+
+
+class NotificationError(Exception):
+    """Provider rejected or failed a send"""
+    
+    def __init__(
+        self,
+        provider: str,
+        status_code: Optional[int],
+        detail: str,
+        retry_after: Optional[float] = None,
+        fields: Sequence[str] = ()
+    ):
+        super().__init__(f"{provider}: {status_code} {detail}")
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.fields = tuple(fields)  # request fields the provider rejected
+    
+    @property
+    def retryable(self) -> bool:
+        """Network errors, throttling and provider outages are worth retrying"""
+        return (
+            self.status_code is None
+            or self.status_code == 429
+            or self.status_code >= 500
+        )
+    
+    @property
+    def recipient_rejected(self) -> bool:
+        """Validation failed on a recipient (SendGrid personalizations field)"""
+        return self.status_code == 400 and any(
+            field.startswith('personalizations') for field in self.fields
+        )
+
+
+def to_e164(phone: Optional[str], country_code: str = "1") -> Optional[str]:
+    """Normalize a phone number for Twilio; None if it can't be"""
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if phone.strip().startswith("+"):
+        return f"+{digits}" if 8 <= len(digits) <= 15 else None
+    if len(digits) == 10:
+        return f"+{country_code}{digits}"
+    if len(digits) == 11 and digits.startswith(country_code):
+        return f"+{digits}"
+    return None
+
+
+class NotificationDispatcher:
+    """Pooled, rate-limited SMS and batched email sending"""
+    
+    def __init__(
+        self,
+        twilio_account_sid: str = "",
+        twilio_auth_token: str = "",
+        twilio_from: str = "",
+        sendgrid_api_key: str = "",
+        sendgrid_from: str = "",
+        twilio_base_url: str = "https://api.twilio.com",
+        sendgrid_base_url: str = "https://api.sendgrid.com",
+        sms_rate: float = 1.0,
+        email_rate: float = 10.0,
+        batch_size: int = SENDGRID_MAX_PERSONALIZATIONS,
+        batch_window: float = 0.05,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.twilio_account_sid = twilio_account_sid
+        self.twilio_auth_token = twilio_auth_token
+        self.twilio_from = twilio_from
+        self.sendgrid_api_key = sendgrid_api_key
+        self.sendgrid_from = sendgrid_from
+        self.twilio_base_url = twilio_base_url.rstrip("/")
+        self.sendgrid_base_url = sendgrid_base_url.rstrip("/")
+        self.batch_size = min(batch_size, SENDGRID_MAX_PERSONALIZATIONS)
+        self.batch_window = batch_window
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.transport = transport
+        self.sms_bucket = TokenBucket(sms_rate, max(1.0, sms_rate))
+        self.email_bucket = TokenBucket(email_rate, max(1.0, email_rate))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[EmailBatchKey, List[Tuple[dict, asyncio.Future]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.stats = {
+            'sms_sent': 0, 'emails_sent': 0, 'email_requests': 0,
+            'errors': 0, 'throttled': 0, 'batch_splits': 0,
+        }
+    
+    @property
+    def sms_enabled(self) -> bool:
+        return bool(self.twilio_account_sid and self.twilio_auth_token and self.twilio_from)
+    
+    @property
+    def email_enabled(self) -> bool:
+        return bool(self.sendgrid_api_key and self.sendgrid_from)
+    
+    def _http(self) -> httpx.AsyncClient:
+        """Shared client, created on first use (keep-alive pool per instance)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """Send pending email batches and close the connection pool"""
+        self._flush()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def send_sms(self, to: str, body: str) -> Optional[str]:
+        """Send one SMS; returns the Twilio message SID (None if SMS is not configured)"""
+        if not self.sms_enabled:
+            logger.info("SMS not configured, message not sent")
+            return None
+        
+        await self._throttle(self.sms_bucket)
+        response = await self._request(
+            "twilio",
+            self.sms_bucket,
+            "POST",
+            f"{self.twilio_base_url}/2010-04-01/Accounts/{self.twilio_account_sid}/Messages.json",
+            data={'To': to, 'From': self.twilio_from, 'Body': body},
+            auth=(self.twilio_account_sid, self.twilio_auth_token)
+        )
+        self.stats['sms_sent'] += 1
+        return response.json().get('sid')
+    
+    async def send_email(
+        self,
+        to: str,
+        subject: str,
+        text: str,
+        substitutions: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Queue one email into the current batch and wait for the batch to be sent
+        Returns False if email is not configured
+        """
+        if not self.email_enabled:
+            logger.info("Email not configured, message not sent")
+            return False
+        
+        personalization = {'to': [{'email': to}]}
+        if substitutions:
+            personalization['substitutions'] = substitutions
+        
+        future = asyncio.get_running_loop().create_future()
+        key = (subject, text)
+        batch = self._pending.setdefault(key, [])
+        batch.append((personalization, future))
+        
+        if len(batch) >= self.batch_size:
+            self._start_batch(key, self._pending.pop(key))
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush
+            )
+        
+        await future
+        return True
+    
+    def _flush(self):
+        """Send every pending batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for key, batch in pending.items():
+            self._start_batch(key, batch)
+    
+    def _start_batch(self, key: EmailBatchKey, batch: List[Tuple[dict, asyncio.Future]]):
+        task = asyncio.ensure_future(self._send_batch(key, batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+    
+    async def _send_batch(self, key: EmailBatchKey, batch: List[Tuple[dict, asyncio.Future]]):
+        subject, text = key
+        try:
+            await self._throttle(self.email_bucket)
+            # A cancelled sender (job timeout) retries on its own, so its
+            # email must not go out with this batch as well
+            batch = [
+                (personalization, future) for personalization, future in batch
+                if not future.cancelled()
+            ]
+            if not batch:
+                return
+            await self._request(
+                "sendgrid",
+                self.email_bucket,
+                "POST",
+                f"{self.sendgrid_base_url}/v3/mail/send",
+                json={
+                    'personalizations': [personalization for personalization, _ in batch],
+                    'from': {'email': self.sendgrid_from},
+                    'subject': subject,
+                    'content': [{'type': 'text/plain', 'value': text}]
+                },
+                headers={'Authorization': f"Bearer {self.sendgrid_api_key}"}
+            )
+        except Exception as e:
+            if isinstance(e, NotificationError) and e.recipient_rejected and len(batch) > 1:
+                # Rejected for some recipient: bisect until only the
+                # requests holding bad recipients fail
+                self.stats['batch_splits'] += 1
+                middle = len(batch) // 2
+                await asyncio.gather(
+                    self._send_batch(key, batch[:middle]),
+                    self._send_batch(key, batch[middle:])
+                )
+                return
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self.stats['emails_sent'] += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+    
+    async def _throttle(self, bucket: TokenBucket):
+        """Wait for a token from bucket"""
+        while True:
+            wait = bucket.try_acquire()
+            if not wait:
+                return
+            self.stats['throttled'] += 1
+            await asyncio.sleep(wait)
+    
+    async def _request(
+        self,
+        provider: str,
+        bucket: TokenBucket,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> httpx.Response:
+        if provider == "sendgrid":
+            self.stats['email_requests'] += 1
+        
+        try:
+            response = await self._http().request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats['errors'] += 1
+            raise NotificationError(provider, None, str(e)) from e
+        
+        if response.status_code < 400:
+            return response
+        
+        self.stats['errors'] += 1
+        retry_after = None
+        fields = ()
+        if response.status_code == 400:
+            fields = _error_fields(response)
+        if response.status_code == 429:
+            retry_after = _retry_after(response)
+            # Hold every sender on this provider until the limit resets
+            bucket.refill()
+            bucket.tokens = min(bucket.tokens, 0.0) - retry_after * bucket.rate
+        raise NotificationError(provider, response.status_code, response.text[:200], retry_after, fields)
+
+
+def _error_fields(response: httpx.Response) -> List[str]:
+    """Fields named in a SendGrid error body ({"errors": [{"field": ...}]})"""
+    try:
+        errors = response.json().get('errors') or []
+    except (ValueError, AttributeError):
+        return []
+    return [error['field'] for error in errors if isinstance(error, dict) and error.get('field')]
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(float(response.headers.get('Retry-After', 1)), 0.0)
+    except ValueError:
+        return 1.0
+
+
+# Global dispatcher (providers disabled until credentials are set)
+notifications = NotificationDispatcher(
+    twilio_account_sid=settings.TWILIO_ACCOUNT_SID,
+    twilio_auth_token=settings.TWILIO_AUTH_TOKEN,
+    twilio_from=settings.TWILIO_PHONE_NUMBER,
+    sendgrid_api_key=settings.SENDGRID_API_KEY,
+    sendgrid_from=settings.SENDGRID_FROM_EMAIL,
+    twilio_base_url=settings.TWILIO_API_BASE_URL,
+    sendgrid_base_url=settings.SENDGRID_API_BASE_URL,
+    sms_rate=settings.TWILIO_SMS_RATE,
+    email_rate=settings.SENDGRID_REQUEST_RATE,
+    batch_window=settings.SENDGRID_BATCH_WINDOW_SECONDS
+)
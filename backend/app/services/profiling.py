@@ -0,0 +1,262 @@
+"""
+On-demand profiling of a live worker
+Sampling CPU profiles (collapsed stacks, the input format of
+flamegraph.pl and speedscope) and tracemalloc snapshots and diffs
+
+- The CPU profiler samples the event loop thread with a SIGPROF
+  interval timer (process CPU time), so samples land wherever the loop
+  is burning CPU; other threads are sampled from a background thread
+  with sys._current_frames(). The loop keeps serving requests and pays
+  only for a stack walk per sample
+- tracemalloc is off until explicitly started and stops itself after
+  a maximum duration, since tracing slows every allocation
+- Only one profile or snapshot runs at a time per worker
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusy(Exception):
+    """A profile or snapshot is already running in this worker"""
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the longest matching sys.path entry"""
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+class SamplingProfiler:
+    """Collapsed-stack sampling profiler for threads of this process"""
+    
+    def __init__(self, max_seconds: float = 60.0, min_interval: float = 0.001):
+        self.max_seconds = max_seconds
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._labels: Dict[Any, str] = {}
+    
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+    
+    async def profile(
+        self,
+        seconds: float,
+        interval: float = 0.005,
+        thread_ids: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sample the given threads (default: the event loop thread) for
+        seconds; returns {'stacks': collapsed text, 'samples', 'seconds'}
+        """
+        if self._lock.locked():
+            raise ProfilerBusy("A CPU profile is already running")
+        
+        async with self._lock:
+            seconds = min(max(seconds, 0.1), self.max_seconds)
+            interval = max(interval, self.min_interval)
+            counts: Counter = Counter()
+            started = time.monotonic()
+            if thread_ids is None and threading.current_thread() is threading.main_thread():
+                await self._profile_signal(seconds, interval, counts)
+            else:
+                await self._profile_thread(
+                    seconds, interval, set(thread_ids or [threading.get_ident()]), counts
+                )
+            
+            elapsed = time.monotonic() - started
+            samples = sum(counts.values())
+            logger.info(f"CPU profile: {samples} samples over {elapsed:.1f}s")
+            stacks = "\n".join(
+                f"{stack} {count}" for stack, count in counts.most_common()
+            )
+            return {'stacks': stacks + "\n" if stacks else "", 'samples': samples, 'seconds': elapsed}
+    
+    async def _profile_signal(self, seconds: float, interval: float, counts: Counter):
+        """Sample the main (event loop) thread on SIGPROF"""
+        def on_signal(signum, frame):
+            counts[self._collapse(frame)] += 1
+        
+        previous = signal.signal(signal.SIGPROF, on_signal)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+    
+    async def _profile_thread(self, seconds: float, interval: float, targets: set, counts: Counter):
+        """
+        Sample threads from a background thread; samples are biased
+        towards points where the sampled thread releases the GIL
+        """
+        done = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(targets, interval, counts, done),
+            name="sampling-profiler",
+            daemon=True
+        )
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            done.set()
+            await asyncio.to_thread(sampler.join)
+    
+    def _sample(self, targets: set, interval: float, counts: Counter, done: threading.Event):
+        own_id = threading.get_ident()
+        while not done.wait(interval):
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id in targets and thread_id != own_id:
+                    counts[self._collapse(frame)] += 1
+            del frames
+    
+    def _collapse(self, frame) -> str:
+        """Root-first 'func (path:line);...' stack for one frame"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                self._labels[code] = label.replace(";", ":")
+                label = self._labels[code]
+            parts.append(label)
+            frame = frame.f_back
+        parts.reverse()
+        return ";".join(parts)
+
+
+class MemoryProfiler:
+    """tracemalloc tracing with a stored baseline snapshot for diffs"""
+    
+    def __init__(self, max_seconds: float = 600.0):
+        self.max_seconds = max_seconds
+        self._lock = asyncio.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_by_us = False
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+    
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            'tracing': self.tracing,
+            'traced_bytes': current,
+            'peak_traced_bytes': peak,
+            'baseline': self._baseline is not None,
+        }
+    
+    def start(self, frames: int = 1, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Start tracing (no-op if already tracing); stops after seconds"""
+        if not self.tracing:
+            tracemalloc.start(max(1, min(frames, 50)))
+            self._started_by_us = True
+            self._baseline = None
+            logger.info(f"tracemalloc started ({frames} frames)")
+        
+        seconds = min(seconds or self.max_seconds, self.max_seconds)
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+        self._stop_handle = asyncio.get_running_loop().call_later(seconds, self.stop)
+        return self.status()
+    
+    def stop(self) -> Dict[str, Any]:
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+        if self.tracing and self._started_by_us:
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+        self._started_by_us = False
+        self._baseline = None
+        return self.status()
+    
+    async def snapshot(self, top: int = 20, key_type: str = 'lineno') -> Dict[str, Any]:
+        """Top allocation sites now; the snapshot becomes the diff baseline"""
+        async with self._exclusive():
+            snapshot = await self._take()
+            stats = await asyncio.to_thread(snapshot.statistics, key_type)
+            self._baseline = snapshot
+        return {
+            **self.status(),
+            'top': [_stat_dict(stat) for stat in stats[:top]],
+        }
+    
+    async def diff(self, top: int = 20, key_type: str = 'lineno', reset: bool = False) -> Dict[str, Any]:
+        """Top allocation growth since the baseline snapshot"""
+        async with self._exclusive():
+            if self._baseline is None:
+                raise ValueError("No baseline snapshot; take a snapshot first")
+            snapshot = await self._take()
+            stats = await asyncio.to_thread(snapshot.compare_to, self._baseline, key_type)
+            if reset:
+                self._baseline = snapshot
+        return {
+            **self.status(),
+            'top': [_stat_diff_dict(stat) for stat in stats[:top]],
+        }
+    
+    def _exclusive(self) -> asyncio.Lock:
+        if self._lock.locked():
+            raise ProfilerBusy("A memory snapshot is already being taken")
+        return self._lock
+    
+    async def _take(self) -> tracemalloc.Snapshot:
+        if not self.tracing:
+            raise ValueError("tracemalloc is not tracing; start it first")
+        return await asyncio.to_thread(_filtered_snapshot)
+
+
+def _filtered_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot without tracemalloc's own and import machinery frames"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def _trace_location(stat) -> List[str]:
+    return [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+
+
+def _stat_dict(stat: tracemalloc.Statistic) -> Dict[str, Any]:
+    return {'location': _trace_location(stat), 'size_bytes': stat.size, 'count': stat.count}
+
+
+def _stat_diff_dict(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    return {
+        'location': _trace_location(stat),
+        'size_bytes': stat.size,
+        'size_diff_bytes': stat.size_diff,
+        'count': stat.count,
+        'count_diff': stat.count_diff,
+    }
+
+
+# Profilers for this worker process
+cpu_profiler = SamplingProfiler(max_seconds=settings.PROFILE_MAX_SECONDS)
+memory_profiler = MemoryProfiler(max_seconds=settings.MEMORY_TRACE_MAX_SECONDS)
@@ -0,0 +1,97 @@
+"""
+Streaming quantile sketch
+Log-bucketed histogram with bounded relative error (DDSketch style)
+
+Bucket counts are plain integers keyed by short strings, so two sketches
+merge by adding counts and a sketch stored in Firestore can be updated
+with Increment transforms without reading it first.
+"""
+
+from typing import Dict, Optional
+import math
+
+# Values at or below this are counted in the zero bucket
+MIN_TRACKED_VALUE = 1e-6
+
+# Default relative accuracy of reported quantiles (2%)
+DEFAULT_RELATIVE_ACCURACY = 0.02
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch
+    Every reported quantile is within relative_accuracy of the true value
+    """
+    
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        buckets: Optional[Dict[str, int]] = None
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets: Dict[str, int] = dict(buckets or {})
+    
+    @staticmethod
+    def bucket_key(
+        value: float,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+    ) -> str:
+        """
+        Bucket key for a value
+        Keys are valid Firestore field names: z (zero), p<i> or n<i>
+        """
+        if value <= MIN_TRACKED_VALUE:
+            return 'z'
+        
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        index = math.ceil(math.log(value) / math.log(gamma))
+        return f"p{index}" if index >= 0 else f"n{-index}"
+    
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+    
+    def add(self, value: float, count: int = 1):
+        """Add an observation"""
+        key = self.bucket_key(value, self.relative_accuracy)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+    
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Merge another sketch into this one (same accuracy required)"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+    
+    def _bucket_value(self, key: str) -> float:
+        """Representative value of a bucket (midpoint in log space)"""
+        if key == 'z':
+            return 0.0
+        
+        index = int(key[1:]) if key[0] == 'p' else -int(key[1:])
+        return 2 * self.gamma ** index / (self.gamma + 1)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), None when empty"""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        
+        total = self.count
+        if total == 0:
+            return None
+        
+        ordered = sorted(
+            ((self._bucket_value(key), count) for key, count in self.buckets.items() if count > 0),
+            key=lambda item: item[0]
+        )
+        rank = q * (total - 1)
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen > rank:
+                return value
+        
+        return ordered[-1][0]
@@ -0,0 +1,225 @@
+"""
+Live cache of caseworker action queues
+Keeps a sorted in-memory view of each active caseworker's pending
+action_queue, maintained by a Firestore snapshot listener, so queue
+and stats reads don't query Firestore
+
+- A view is created on first read; until its initial snapshot arrives
+  reads fall back to Firestore
+- Views idle for longer than idle_seconds are evicted (listener closed),
+  and at most max_views listeners are open at once
+- Listener callbacks run on Firestore's watch thread, so views are only
+  touched under a lock
+"""
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SortKey = Tuple[int, float, str]
+
+
+def queue_sort_key(item_id: str, data: Dict[str, Any]) -> SortKey:
+    """Same order as the Firestore query: priority desc, created_at, id"""
+    created_at = data.get('created_at')
+    if isinstance(created_at, datetime):
+        # Listener values are tz-aware, local writes naive UTC
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        created_at = created_at.timestamp()
+    else:
+        created_at = 0.0
+    return (-(data.get('priority') or 0), created_at, item_id)
+
+
+@dataclass
+class QueueView:
+    """Pending action items for one caseworker, kept sorted"""
+    caseworker_id: str
+    items: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    order: List[SortKey] = field(default_factory=list)
+    ready: bool = False
+    last_access: float = field(default_factory=time.monotonic)
+    watch: Any = None
+    
+    def upsert(self, item_id: str, data: Dict[str, Any]):
+        self.remove(item_id)
+        item = dict(data)
+        item['id'] = item_id
+        self.items[item_id] = item
+        insort(self.order, queue_sort_key(item_id, item))
+    
+    def remove(self, item_id: str):
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        index = bisect_left(self.order, queue_sort_key(item_id, item))
+        if index < len(self.order) and self.order[index][2] == item_id:
+            del self.order[index]
+
+
+class ActionQueueCache:
+    """Snapshot-listener-backed pending queues for active caseworkers"""
+    
+    def __init__(
+        self,
+        db,
+        idle_seconds: float = 600,
+        max_views: int = 500,
+        high_priority: int = 4
+    ):
+        self.db = db
+        self.idle_seconds = idle_seconds
+        self.max_views = max_views
+        self.high_priority = high_priority
+        self._views: Dict[str, QueueView] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get_queue(self, caseworker_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Top pending items, or None if the view isn't ready yet"""
+        view = self._touch(caseworker_id)
+        if view is None:
+            return None
+        
+        with self._lock:
+            return [dict(view.items[key[2]]) for key in view.order[:limit]]
+    
+    def get_summary(self, caseworker_id: str) -> Optional[Dict[str, int]]:
+        """Pending and high-priority counts, or None if not ready"""
+        view = self._touch(caseworker_id)
+        if view is None:
+            return None
+        
+        with self._lock:
+            return {
+                'pending': len(view.order),
+                'high_priority': sum(
+                    1 for key in view.order if -key[0] >= self.high_priority
+                )
+            }
+    
+    def apply_write(
+        self,
+        caseworker_id: str,
+        item_id: str,
+        data: Optional[Dict[str, Any]]
+    ):
+        """
+        Apply a write made by this process right away (read-your-writes)
+        data None or completed removes the item; the listener confirms later
+        """
+        with self._lock:
+            view = self._views.get(caseworker_id)
+            if view is None or not view.ready:
+                return
+            if data is None or data.get('completed'):
+                view.remove(item_id)
+            else:
+                view.upsert(item_id, data)
+    
+    def close(self):
+        """Close every listener"""
+        with self._lock:
+            views = list(self._views.values())
+            self._views.clear()
+        for view in views:
+            self._unsubscribe(view)
+    
+    def _touch(self, caseworker_id: str) -> Optional[QueueView]:
+        """Ready view for caseworker, starting a listener on first use"""
+        self._sweep()
+        
+        with self._lock:
+            view = self._views.get(caseworker_id)
+            if view is not None:
+                view.last_access = time.monotonic()
+                if view.watch is not None and not view.watch.is_active:
+                    # Listener died (e.g. stream error): rebuild it
+                    self._views.pop(caseworker_id, None)
+                    view = None
+                elif view.ready:
+                    self.stats['hits'] += 1
+                    return view
+            
+            self.stats['misses'] += 1
+            if view is not None:
+                return None
+            
+            view = QueueView(caseworker_id=caseworker_id)
+            self._views[caseworker_id] = view
+            evicted = self._evict_over_capacity()
+        
+        for old in evicted:
+            self._unsubscribe(old)
+        self._subscribe(view)
+        return None
+    
+    def _subscribe(self, view: QueueView):
+        query = self.db.collection('caseworkers').document(view.caseworker_id)
+        query = query.collection('action_queue').where('completed', '==', False)
+        
+        def on_snapshot(docs, changes, read_time):
+            with self._lock:
+                for change in changes:
+                    if change.type.name == 'REMOVED':
+                        view.remove(change.document.id)
+                    else:
+                        view.upsert(change.document.id, change.document.to_dict())
+                view.ready = True
+        
+        try:
+            view.watch = query.on_snapshot(on_snapshot)
+        except Exception as e:
+            logger.warning(f"Queue listener failed for {view.caseworker_id}: {e}")
+            with self._lock:
+                if self._views.get(view.caseworker_id) is view:
+                    self._views.pop(view.caseworker_id, None)
+    
+    def _sweep(self):
+        """Evict idle views (at most once per minute)"""
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        
+        with self._lock:
+            idle = [
+                view for view in self._views.values()
+                if now - view.last_access > self.idle_seconds
+            ]
+            for view in idle:
+                self._views.pop(view.caseworker_id, None)
+            self.stats['evictions'] += len(idle)
+        
+        for view in idle:
+            self._unsubscribe(view)
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle queue listeners")
+    
+    def _evict_over_capacity(self) -> List[QueueView]:
+        """Drop least recently used views beyond max_views (lock held)"""
+        excess = len(self._views) - self.max_views
+        if excess <= 0:
+            return []
+        
+        oldest = sorted(self._views.values(), key=lambda v: v.last_access)[:excess]
+        for view in oldest:
+            self._views.pop(view.caseworker_id, None)
+        self.stats['evictions'] += len(oldest)
+        return oldest
+    
+    def _unsubscribe(self, view: QueueView):
+        if view.watch is None:
+            return
+        try:
+            view.watch.unsubscribe()
+        except Exception as e:
+            logger.warning(f"Failed to close queue listener for {view.caseworker_id}: {e}")
@@ -0,0 +1,296 @@
+"""
+Caseworker action queue events
+Per-process broker behind the /caseworkers/queue/stream SSE endpoint
+
+Events come from a Firestore snapshot listener on each streamed
+caseworker's pending queue, so writes made by any worker, instance or
+job reach every stream: an added item is action_created, a modified one
+action_updated, and one that leaves the pending queue (completed or
+deleted) action_completed. The listener starts with the first stream
+and stops LINGER_SECONDS after the last one closes.
+
+Every event gets an id "<epoch>-<seq>" (epoch identifies this process,
+seq increases monotonically). Each caseworker keeps a ring buffer of
+recent events, so a reconnect with Last-Event-ID replays only the
+missed deltas. When they are no longer available (buffer overrun,
+listener restarted, another process) the stream sends a fresh snapshot
+of the queue instead.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+import asyncio
+import logging
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_CREATED = "action_created"
+EVENT_UPDATED = "action_updated"
+EVENT_COMPLETED = "action_completed"
+
+# Listener change type -> event
+CHANGE_EVENTS = {
+    'ADDED': EVENT_CREATED,
+    'MODIFIED': EVENT_UPDATED,
+    'REMOVED': EVENT_COMPLETED
+}
+
+
+@dataclass
+class QueueEvent:
+    """One queue delta"""
+    id: str
+    seq: int
+    type: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class EventLog:
+    """Recent events for one caseworker"""
+    events: Deque[QueueEvent]
+    # Replay needs a last seq at or after this one (older events were
+    # evicted from the buffer, or published while no listener ran)
+    evicted_through: int = 0
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One connected stream"""
+    caseworker_id: str
+    queue: asyncio.Queue
+    overflowed: bool = False
+
+
+@dataclass(eq=False)
+class Feed:
+    """Snapshot listener on one caseworker's pending queue"""
+    caseworker_id: str
+    ready: asyncio.Event
+    watch: Any = None
+    closing: Optional[asyncio.TimerHandle] = None
+    
+    @property
+    def active(self) -> bool:
+        return self.watch is not None and getattr(self.watch, 'is_active', True)
+
+
+class QueueEventBroker:
+    """Per-caseworker fan-out of action queue events with replay"""
+    
+    def __init__(
+        self,
+        replay_size: int = 500,
+        subscriber_buffer: int = 256,
+        linger_seconds: float = 60.0,
+        ready_timeout: float = 10.0
+    ):
+        self.replay_size = replay_size
+        self.subscriber_buffer = subscriber_buffer
+        self.linger_seconds = linger_seconds
+        self.ready_timeout = ready_timeout
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._logs: Dict[str, EventLog] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._feeds: Dict[str, Feed] = {}
+    
+    @property
+    def last_event_id(self) -> str:
+        """Id of the most recent event (stream position for a snapshot)"""
+        return f"{self.epoch}-{self._seq}"
+    
+    def publish(self, caseworker_id: str, event_type: str, data: Dict[str, Any]) -> QueueEvent:
+        """Record an event and deliver it to the caseworker's streams"""
+        self._seq += 1
+        event = QueueEvent(
+            id=f"{self.epoch}-{self._seq}",
+            seq=self._seq,
+            type=event_type,
+            data=data
+        )
+        
+        log = self._logs.get(caseworker_id)
+        if log is None:
+            log = self._logs[caseworker_id] = EventLog(events=deque())
+        if len(log.events) >= self.replay_size:
+            log.evicted_through = log.events.popleft().seq
+        log.events.append(event)
+        
+        for subscription in list(self._subscribers.get(caseworker_id, ())):
+            self._deliver(subscription, event)
+        
+        return event
+    
+    async def subscribe(self, caseworker_id: str, db) -> Subscription:
+        """
+        Register a stream; events from now on are queued
+        Returns once the caseworker's listener has its initial snapshot,
+        so a queue read made afterwards misses no write
+        """
+        subscription = Subscription(
+            caseworker_id=caseworker_id,
+            queue=asyncio.Queue(maxsize=self.subscriber_buffer)
+        )
+        self._subscribers.setdefault(caseworker_id, set()).add(subscription)
+        await self._start_feed(caseworker_id, db)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.caseworker_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if subscribers:
+            return
+        
+        # Keep listening for a while so a reconnect can still replay
+        self._subscribers.pop(subscription.caseworker_id, None)
+        feed = self._feeds.get(subscription.caseworker_id)
+        if feed is not None and feed.closing is None:
+            feed.closing = asyncio.get_running_loop().call_later(
+                self.linger_seconds,
+                self._close_feed,
+                feed
+            )
+    
+    async def revive(self, caseworker_id: str, db) -> bool:
+        """Restart a listener that stopped; True if streams must resync"""
+        feed = self._feeds.get(caseworker_id)
+        if feed is not None and feed.active:
+            return False
+        logger.warning(f"Queue listener for caseworker {caseworker_id} stopped; restarting")
+        await self._start_feed(caseworker_id, db)
+        return True
+    
+    def close(self):
+        """Stop every listener"""
+        for feed in list(self._feeds.values()):
+            self._stop(feed)
+    
+    def replay(self, caseworker_id: str, last_event_id: str) -> Optional[List[QueueEvent]]:
+        """
+        Events after last_event_id, or None if some of them are gone
+        (other epoch, malformed id or evicted from the buffer)
+        """
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        
+        last_seq = int(seq)
+        log = self._logs.get(caseworker_id)
+        if log is None or last_seq < log.evicted_through:
+            return None
+        
+        return [event for event in log.events if event.seq > last_seq]
+    
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+    
+    def listener_count(self) -> int:
+        return len(self._feeds)
+    
+    # -- listeners --
+    
+    async def _start_feed(self, caseworker_id: str, db):
+        feed = self._feeds.get(caseworker_id)
+        if feed is not None and feed.closing is not None:
+            feed.closing.cancel()
+            feed.closing = None
+        
+        if feed is None or not feed.active:
+            if feed is not None:
+                self._stop(feed)
+            feed = self._feeds[caseworker_id] = Feed(
+                caseworker_id=caseworker_id,
+                ready=asyncio.Event()
+            )
+            
+            # Writes made before this listener aren't in the log
+            self._seq += 1
+            log = self._logs.get(caseworker_id)
+            if log is None:
+                log = self._logs[caseworker_id] = EventLog(events=deque())
+            log.events.clear()
+            log.evicted_through = self._seq
+            
+            query = db.collection('caseworkers').document(caseworker_id)
+            query = query.collection('action_queue').where('completed', '==', False)
+            loop = asyncio.get_running_loop()
+            
+            def on_snapshot(docs, changes, read_time):
+                # Firestore's watch thread: hand over to the event loop
+                try:
+                    loop.call_soon_threadsafe(self._apply, feed, changes)
+                except RuntimeError:
+                    pass  # loop closed during shutdown
+            
+            try:
+                feed.watch = query.on_snapshot(on_snapshot)
+            except Exception as e:
+                logger.warning(f"Queue listener failed for caseworker {caseworker_id}: {e}")
+                self._feeds.pop(caseworker_id, None)
+                return
+        
+        try:
+            await asyncio.wait_for(feed.ready.wait(), timeout=self.ready_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Queue listener for caseworker {caseworker_id} not ready yet")
+    
+    def _apply(self, feed: Feed, changes):
+        """Publish one listener callback's changes (event loop)"""
+        if self._feeds.get(feed.caseworker_id) is not feed:
+            return
+        if not feed.ready.is_set():
+            # Initial snapshot: the stream reads the queue itself
+            feed.ready.set()
+            return
+        
+        for change in changes:
+            data = change.document.to_dict() or {}
+            data['id'] = change.document.id
+            event_type = CHANGE_EVENTS.get(change.type.name, EVENT_UPDATED)
+            if event_type == EVENT_COMPLETED:
+                # The last version seen while it was pending
+                data['completed'] = True
+            self.publish(feed.caseworker_id, event_type, data)
+    
+    def _close_feed(self, feed: Feed):
+        """Linger expired: stop listening unless a stream came back"""
+        feed.closing = None
+        if not self._subscribers.get(feed.caseworker_id):
+            self._stop(feed)
+    
+    def _stop(self, feed: Feed):
+        if feed.closing is not None:
+            feed.closing.cancel()
+            feed.closing = None
+        if self._feeds.get(feed.caseworker_id) is feed:
+            self._feeds.pop(feed.caseworker_id, None)
+            self._logs.pop(feed.caseworker_id, None)
+        if feed.watch is not None:
+            try:
+                feed.watch.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Queue listener close failed for caseworker {feed.caseworker_id}: {e}")
+    
+    def _deliver(self, subscription: Subscription, event: QueueEvent):
+        """Queue without blocking; a full queue marks the stream for reset"""
+        if subscription.overflowed:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscription.overflowed = True
+            logger.warning(
+                f"Queue stream overflow for caseworker {subscription.caseworker_id}; "
+                f"client will resync"
+            )
+
+
+# Global broker (one per API process)
+queue_events = QueueEventBroker(replay_size=settings.QUEUE_STREAM_REPLAY_SIZE)
@@ -0,0 +1,182 @@
+"""
+Response cache for expensive read endpoints
+TTL + stale-while-revalidate + single-flight coalescing
+
+- Fresh entries are returned directly
+- Stale entries are returned immediately while one background task
+  recomputes them
+- Concurrent misses for the same key share a single computation
+- With a shared tier, computations first look for a value another
+  instance already computed
+"""
+
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.services.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with freshness deadlines (monotonic seconds)"""
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class ResponseCache:
+    """In-process async cache with stale-while-revalidate and single-flight"""
+    
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int = 1024,
+        shared=None
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ) -> Any:
+        """Return cached value for key, computing it at most once at a time"""
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        
+        if entry and now < entry.fresh_until:
+            self.stats['hits'] += 1
+            return entry.value
+        
+        if entry and now < entry.stale_until:
+            # Serve stale, refresh in the background (once)
+            self.stats['stale_hits'] += 1
+            if key not in self._inflight:
+                self._start(key, compute, ttl, stale_ttl, background=True)
+            return entry.value
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['misses'] += 1
+            inflight = self._start(key, compute, ttl, stale_ttl, background=False)
+        
+        # Shield so one cancelled request doesn't cancel the shared work
+        return await asyncio.shield(inflight)
+    
+    def _start(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float,
+        background: bool
+    ) -> asyncio.Future:
+        """Run compute as a task shared by every waiter for key"""
+        
+        async def run():
+            try:
+                if self.shared is not None:
+                    value = await self.shared.get_or_compute(key, compute, ttl=int(ttl) or None)
+                else:
+                    value = await compute()
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            
+            self._store(key, value, ttl, stale_ttl)
+            return value
+        
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: _consume_result(key, t, background))
+        
+        return task
+    
+    def _store(self, key: str, value: Any, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # Drop the entry closest to expiry
+            oldest = min(self._entries, key=lambda k: self._entries[k].stale_until)
+            self._entries.pop(oldest, None)
+        
+        self._entries[key] = CacheEntry(
+            value=value,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl
+        )
+    
+    def invalidate(self, prefix: str = ""):
+        """Drop entries whose key starts with prefix (all by default)"""
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self._entries.pop(key, None)
+    
+    def cached(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ):
+        """
+        Decorator for async endpoints
+        Key is namespace plus the endpoint's keyword arguments, and the
+        wrapped signature is preserved for FastAPI parameter parsing
+        """
+        
+        def decorator(func: Callable[..., Awaitable[Any]]):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = namespace
+                if kwargs:
+                    key += "?" + "&".join(f"{k}={kwargs[k]}" for k in sorted(kwargs))
+                return await self.get_or_compute(
+                    key,
+                    lambda: func(*args, **kwargs),
+                    ttl=ttl,
+                    stale_ttl=stale_ttl
+                )
+            
+            return wrapper
+        
+        return decorator
+
+
+def _consume_result(key: str, task: asyncio.Future, background: bool):
+    """
+    Retrieve task errors so they are never reported as unhandled
+    Background refresh errors keep the stale value and are only logged
+    """
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and background:
+        logger.warning(f"Background refresh failed for {key}: {exc}")
+
+
+# Cache for city oversight dashboards
+city_cache = ResponseCache(
+    ttl=settings.CITY_CACHE_TTL_SECONDS,
+    stale_ttl=settings.CITY_CACHE_STALE_SECONDS,
+    shared=shared_cache
+)
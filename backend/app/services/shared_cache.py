@@ -0,0 +1,277 @@
+"""
+Shared cache tier (Redis)
+Cache shared by every API instance for reference documents, city
+metrics and client progress payloads
+
+- Values are stored as JSON (datetimes come back as ISO strings)
+- Writers delete shared keys and publish an invalidation message; every
+  instance drops its local copies (version stamps, response caches)
+- Redis problems never fail a request: operations degrade to cache
+  misses, and Redis is skipped for a short backoff after an error
+"""
+
+from typing import Any, Awaitable, Callable, List, Optional
+import asyncio
+import logging
+import time
+
+import orjson
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+InvalidationHandler = Callable[[str, str], None]
+
+
+def client_progress_key(client_id: str) -> str:
+    """Portal progress payload, invalidated by client writes"""
+    return f"client_progress:{client_id}"
+
+
+def document_key(collection: str, doc_id: str) -> str:
+    """Cached reference document"""
+    return f"doc:{collection}:{doc_id}"
+
+
+class SharedCache:
+    """Redis-backed cache with pub/sub invalidation and graceful degradation"""
+    
+    def __init__(
+        self,
+        url: str = "",
+        client=None,
+        namespace: str = "home",
+        default_ttl: int = 300,
+        retry_seconds: float = 5.0,
+        timeout: float = 0.25
+    ):
+        self.url = url
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.retry_seconds = retry_seconds
+        self.timeout = timeout
+        self.channel = f"{namespace}:invalidate"
+        self._client = client
+        self._handlers: List[InvalidationHandler] = []
+        self._listener: Optional[asyncio.Task] = None
+        self._closing = False
+        self._down_until = 0.0
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0, 'invalidations': 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None or bool(self.url)
+    
+    @property
+    def available(self) -> bool:
+        return self._client is not None and time.monotonic() >= self._down_until
+    
+    @property
+    def status(self) -> str:
+        """disabled, connected or degraded (for health checks)"""
+        if not self.enabled:
+            return "disabled"
+        return "connected" if self.available else "degraded"
+    
+    async def connect(self):
+        """Create the client (unless injected) and start the invalidation listener"""
+        if not self.enabled:
+            logger.info("Shared cache disabled (REDIS_URL not set)")
+            return
+        
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(
+                self.url,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout
+            )
+        
+        try:
+            await self._client.ping()
+            logger.info("Shared cache connected")
+        except Exception as e:
+            self._mark_down(e)
+        
+        self._closing = False
+        self._listener = asyncio.ensure_future(self._listen())
+    
+    async def close(self):
+        if self._listener is not None:
+            # redis-py can swallow a cancel that lands on a read timeout,
+            # so the listener also checks _closing between reads
+            self._closing = True
+            self._listener.cancel()
+            await asyncio.wait([self._listener], timeout=2.0)
+            if self._listener.done() and not self._listener.cancelled():
+                self._listener.exception()
+            self._listener = None
+        
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception:
+                pass
+            self._client = None
+    
+    def on_invalidate(self, handler: InvalidationHandler):
+        """Register handler(collection, doc_id) for invalidation messages"""
+        self._handlers.append(handler)
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None on miss or when Redis is unavailable"""
+        if not self.available:
+            return None
+        
+        try:
+            raw = await self._client.get(self._key(key))
+        except Exception as e:
+            self._mark_down(e)
+            return None
+        
+        if raw is None:
+            self.stats['misses'] += 1
+            return None
+        
+        self.stats['hits'] += 1
+        return orjson.loads(raw)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        if not self.available:
+            return
+        
+        try:
+            await self._client.set(self._key(key), dumps(value), ex=ttl or self.default_ttl)
+        except Exception as e:
+            self._mark_down(e)
+    
+    async def add(self, key: str, value: Any, ttl: Optional[int] = None) -> Optional[bool]:
+        """
+        Set key only if absent (SET NX)
+        True if stored, False if the key exists, None if Redis is unavailable
+        """
+        if not self.available:
+            return None
+        
+        try:
+            stored = await self._client.set(
+                self._key(key), dumps(value), ex=ttl or self.default_ttl, nx=True
+            )
+        except Exception as e:
+            self._mark_down(e)
+            return None
+        return bool(stored)
+    
+    async def expire(self, key: str, ttl: int) -> Optional[bool]:
+        """
+        Restart key's TTL
+        True if renewed, False if the key is gone, None if Redis is unavailable
+        """
+        if not self.available:
+            return None
+        
+        try:
+            renewed = await self._client.expire(self._key(key), ttl)
+        except Exception as e:
+            self._mark_down(e)
+            return None
+        return bool(renewed)
+    
+    async def delete(self, key: str):
+        if not self.available:
+            return
+        
+        try:
+            await self._client.delete(self._key(key))
+        except Exception as e:
+            self._mark_down(e)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """Shared value for key, computing and storing it on a miss"""
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        value = await compute()
+        if value is not None:
+            await self.set(key, value, ttl)
+        return value
+    
+    async def invalidate(self, collection: str, doc_id: str, *keys: str):
+        """
+        A document changed: delete dependent shared keys and tell every
+        instance (including this one) to drop local copies
+        """
+        self._dispatch(collection, doc_id)
+        if not self.available:
+            return
+        
+        try:
+            if keys:
+                await self._client.delete(*(self._key(key) for key in keys))
+            await self._client.publish(
+                self.channel,
+                dumps({'collection': collection, 'id': doc_id})
+            )
+        except Exception as e:
+            self._mark_down(e)
+    
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    def _mark_down(self, error: Exception):
+        """Skip Redis for retry_seconds after an error"""
+        self.stats['errors'] += 1
+        if time.monotonic() >= self._down_until:
+            logger.warning(f"Shared cache unavailable, degrading to local only: {error}")
+        self._down_until = time.monotonic() + self.retry_seconds
+    
+    def _dispatch(self, collection: str, doc_id: str):
+        self.stats['invalidations'] += 1
+        for handler in self._handlers:
+            try:
+                handler(collection, doc_id)
+            except Exception as e:
+                logger.warning(f"Invalidation handler failed: {e}")
+    
+    async def _listen(self):
+        """Apply invalidations published by other instances (resubscribes on errors)"""
+        while not self._closing:
+            pubsub = None
+            try:
+                pubsub = self._client.pubsub()
+                await pubsub.subscribe(self.channel)
+                while not self._closing:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=1.0
+                    )
+                    if message is None:
+                        continue
+                    data = orjson.loads(message['data'])
+                    self._dispatch(data['collection'], data['id'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._mark_down(e)
+                await asyncio.sleep(self.retry_seconds)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+
+# Global shared cache (disabled unless REDIS_URL is set)
+shared_cache = SharedCache(
+    url=settings.REDIS_URL,
+    default_ttl=settings.SHARED_CACHE_TTL_SECONDS
+)
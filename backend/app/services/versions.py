@@ -0,0 +1,81 @@
+"""
+Document version stamps
+Last seen version (update time) of documents read by this process, so
+conditional requests can be answered without reading them again
+
+Writes from this process drop stamps immediately; the short TTL bounds
+staleness from writes made by other instances
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import time
+
+from app.core.config import settings
+
+
+@dataclass
+class VersionStamp:
+    """Version of one document plus ids of documents it references"""
+    version: str
+    refs: Dict[str, Optional[str]] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+
+class VersionStampCache:
+    """Bounded in-process map of (collection, id) -> VersionStamp"""
+    
+    def __init__(self, ttl: float, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stamps: Dict[Tuple[str, str], VersionStamp] = {}
+    
+    def record(
+        self,
+        collection: str,
+        doc_id: str,
+        version,
+        refs: Optional[Dict[str, Optional[str]]] = None
+    ):
+        """Remember a document version (datetime or string)"""
+        if version is None or self.ttl <= 0:
+            return
+        
+        if isinstance(version, datetime):
+            version = version.isoformat()
+        
+        if len(self._stamps) >= self.max_entries:
+            # Drop the oldest insertion (dicts keep insertion order)
+            self._stamps.pop(next(iter(self._stamps)))
+        
+        key = (collection, doc_id)
+        self._stamps.pop(key, None)
+        self._stamps[key] = VersionStamp(
+            version=str(version),
+            refs=refs or {},
+            expires_at=time.monotonic() + self.ttl
+        )
+    
+    def get(self, collection: str, doc_id: str) -> Optional[VersionStamp]:
+        """Current stamp, or None if unknown or expired"""
+        stamp = self._stamps.get((collection, doc_id))
+        if stamp is None:
+            return None
+        
+        if stamp.expires_at < time.monotonic():
+            self._stamps.pop((collection, doc_id), None)
+            return None
+        
+        return stamp
+    
+    def invalidate(self, collection: str, doc_id: str):
+        """Forget a document's version (called on writes)"""
+        self._stamps.pop((collection, doc_id), None)
+    
+    def clear(self):
+        self._stamps.clear()
+
+
+# Global version stamp cache
+version_stamps = VersionStampCache(ttl=settings.VERSION_STAMP_TTL_SECONDS)
@@ -0,0 +1,124 @@
+"""
+Benchmark: columnar client snapshot vs document scans
+Builds a snapshot of synthetic clients and times the aggregates the
+dashboards run (citywide and per-caseworker status counts) against the
+same aggregation over client documents in Python, which is the floor for
+any approach that streams documents. Also reports column and id index
+memory
+
+Usage:
+    python benchmarks/bench_client_snapshot.py
+    python benchmarks/bench_client_snapshot.py --clients 500000
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.client_snapshot import STATUSES, ClientSnapshot
+
+ORGANIZATIONS = 40
+CASEWORKERS_PER_ORG = 25
+ZONES = 60
+
+
+def make_docs(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    for i in range(n):
+        org = rng.randrange(ORGANIZATIONS)
+        created = start + timedelta(minutes=rng.randrange(1_000_000))
+        total = rng.randrange(18)
+        yield f"client_{i:07d}", {
+            'status': rng.choice(STATUSES),
+            'organization_id': f"org_{org:03d}",
+            'zone': f"zone_{rng.randrange(ZONES):03d}",
+            'assigned_caseworker_id': f"cw_{org:03d}_{rng.randrange(CASEWORKERS_PER_ORG):02d}",
+            'veteran_status': rng.random() < 0.1,
+            'vi_spdat_score': {
+                'total_score': total,
+                'housing_history_score': min(total, 6),
+                'wellness_score': min(max(total - 6, 0), 6),
+                'risk_score': min(max(total - 12, 0), 5),
+                'acuity_level': 'high' if total >= 8 else 'medium' if total >= 4 else 'low',
+            },
+            'created_at': created,
+            'updated_at': created,
+            'status_changed_at': created,
+        }
+
+
+def best_of(fn, repeats: int = 5) -> float:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def scan_status_counts(docs, caseworker_id=None):
+    counts = {status: 0 for status in STATUSES}
+    for _doc_id, data in docs:
+        if caseworker_id is None or data['assigned_caseworker_id'] == caseworker_id:
+            counts[data['status']] += 1
+    return counts
+
+
+def main(n: int):
+    docs = list(make_docs(n))
+    snapshot = ClientSnapshot()
+    
+    started = time.perf_counter()
+    for doc_id, data in docs:
+        snapshot.upsert(doc_id, data)
+    build = time.perf_counter() - started
+    snapshot.ready = True
+    index_bytes = sys.getsizeof(snapshot._rows) + sum(sys.getsizeof(doc_id) for doc_id in snapshot._rows)
+    
+    caseworker = "cw_007_03"
+    assert snapshot.status_counts() == scan_status_counts(docs)
+    assert snapshot.status_counts(caseworker_id=caseworker) == scan_status_counts(docs, caseworker)
+    
+    print(f"{n} clients")
+    print(f"build (upserts):          {build:8.2f} s ({build / n * 1e6:.1f} us/client)")
+    print(f"columns:                  {snapshot.nbytes / 1e6:8.1f} MB "
+          f"({snapshot.nbytes / n:.0f} bytes/client)")
+    print(f"id index:                 {index_bytes / 1e6:8.1f} MB")
+    print()
+    print(f"{'aggregate':<34}{'snapshot ms':>12}{'doc scan ms':>13}")
+    for label, fn, scan in (
+        ("citywide status counts", snapshot.status_counts, lambda: scan_status_counts(docs)),
+        ("caseworker status counts",
+         lambda: snapshot.status_counts(caseworker_id=caseworker),
+         lambda: scan_status_counts(docs, caseworker)),
+        ("org + status count",
+         lambda: snapshot.count(organization_id="org_003", status="placed"),
+         lambda: sum(1 for _, d in docs if d['organization_id'] == "org_003" and d['status'] == "placed")),
+    ):
+        print(f"{label:<34}{best_of(fn) * 1000:>12.2f}{best_of(scan, 3) * 1000:>13.1f}")
+    
+    started = time.perf_counter()
+    updates = 10_000
+    rng = random.Random(3)
+    for _ in range(updates):
+        doc_id, _ = docs[rng.randrange(n)]
+        snapshot.apply_write(doc_id, {'status': rng.choice(STATUSES), 'updated_at': datetime.utcnow()})
+    elapsed = time.perf_counter() - started
+    print(f"\nincremental update:       {elapsed / updates * 1e6:8.1f} us/write")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=300_000)
+    args = parser.parse_args()
+    main(args.clients)
@@ -0,0 +1,85 @@
+"""
+Benchmark: capacity forecasting on synthetic multi-year intake history
+Measures fit time and 30-day holdout accuracy of the vectorized
+Holt-Winters forecast used by the capacity forecast job
+
+Usage:
+    python benchmarks/bench_forecasting.py
+    python benchmarks/bench_forecasting.py --years 5 --zones 40
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.forecasting import holt_winters_forecast, summarize_forecast
+
+ACUITY_LEVELS = ('low', 'medium', 'high')
+
+
+def synthetic_history(n_series: int, n_days: int, seed: int = 7) -> np.ndarray:
+    """Poisson daily counts with trend, weekly and yearly seasonality"""
+    rng = np.random.default_rng(seed)
+    days = np.arange(n_days)
+    base = rng.uniform(0.5, 12, size=(n_series, 1))
+    trend = rng.normal(0, 0.0004, size=(n_series, 1)) * days
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * (days % 7) / 7 + rng.uniform(0, np.pi, (n_series, 1)))
+    yearly = 1 + 0.15 * np.sin(2 * np.pi * days / 365.25)
+    rate = np.clip(base * (1 + trend) * weekly * yearly, 0.05, None)
+    return rng.poisson(rate).astype(np.float64)
+
+
+def run(years: int, zones: int, horizon: int, repeats: int):
+    n_series = zones * len(ACUITY_LEVELS)
+    n_days = int(years * 365)
+    history = synthetic_history(n_series, n_days + horizon)
+    train, holdout = history[:, :n_days], history[:, n_days:]
+    
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        forecast, residual_std = holt_winters_forecast(train, horizon)
+        timings.append(time.perf_counter() - started)
+    
+    keys = [(f"zone_{z}", a) for z in range(zones) for a in ACUITY_LEVELS]
+    started = time.perf_counter()
+    summarize_forecast(keys, forecast, residual_std)
+    summarize_ms = (time.perf_counter() - started) * 1000
+    
+    # Accuracy on 30-day totals, against a seasonal-naive baseline
+    actual = holdout.sum(axis=1)
+    predicted = forecast.sum(axis=1)
+    naive = np.tile(train[:, -7:], horizon // 7 + 1)[:, :horizon].sum(axis=1)
+    error = np.abs(predicted - actual).sum() / actual.sum() * 100
+    naive_error = np.abs(naive - actual).sum() / actual.sum() * 100
+    
+    print(f"series={n_series} days={n_days} horizon={horizon}")
+    print(f"  fit: best {min(timings) * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms")
+    print(f"  summarize: {summarize_ms:.2f} ms")
+    print(f"  30-day total WAPE: {error:.2f}% (seasonal naive {naive_error:.2f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--years', type=float, default=None)
+    parser.add_argument('--zones', type=int, default=None)
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    
+    if args.years or args.zones:
+        run(args.years or 3, args.zones or 10, args.horizon, args.repeats)
+        return
+    
+    for years, zones in ((1, 10), (3, 10), (5, 10), (5, 100), (5, 1000)):
+        run(years, zones, args.horizon, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: housing matching engine
+Matches synthetic assessed clients to housing units (batch run), then
+times incremental events: new intakes arriving and units opening. A
+small world is checked against the priority rule by brute force: no
+unmatched client outranks a matched one for a unit that accepts them
+
+Usage:
+    python benchmarks/bench_matching.py
+    python benchmarks/bench_matching.py --clients 100000 --units 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.matching import MatchingEngine, Resource, WaitingClient
+
+ZONES = [f"zone_{i}" for i in range(8)]
+PSH = 'permanent_supportive'
+RRH = 'rapid_rehousing'
+SHELTER = 'emergency_shelter'
+
+
+def housing_type(score: int) -> str:
+    return PSH if score >= 8 else RRH if score >= 4 else SHELTER
+
+
+def make_clients(n: int, rng: random.Random, start: int = 0):
+    clients = []
+    for i in range(start, start + n):
+        score = min(int(rng.expovariate(1 / 5)), 17)
+        clients.append(WaitingClient(
+            id=f"client_{i:07d}",
+            housing_type=housing_type(score),
+            score=score,
+            zone=rng.choice(ZONES),
+            veteran=rng.random() < 0.1,
+            waiting_since=1.7e9 + rng.randrange(10**7)
+        ))
+    return clients
+
+
+def make_resources(units: int, rng: random.Random):
+    resources = []
+    while units > 0:
+        size = min(rng.randint(1, 10), units)
+        units -= size
+        kind = rng.random()
+        resource = Resource(
+            id=f"housing_{len(resources):05d}",
+            housing_type=PSH if kind < 0.4 else RRH if kind < 0.75 else SHELTER,
+            open_units=size,
+            zone=rng.choice(ZONES + [None])
+        )
+        if kind > 0.9:
+            # Transitional programs taking both rapid rehousing and shelter referrals
+            resource.housing_type = 'transitional'
+            resource.serves = (RRH, SHELTER)
+        rule = rng.random()
+        if rule < 0.1:
+            resource.veterans_only = True
+        elif rule < 0.15:
+            resource.zones = frozenset(rng.sample(ZONES, 2))
+        elif rule < 0.2:
+            resource.min_score = 12
+        resources.append(resource)
+    return resources
+
+
+def check_priority(clients, resources, matches):
+    """Brute force: no unmatched client outranks a client matched to a unit that accepts them"""
+    matched = {match.client_id: match.resource_id for match in matches}
+    worst_priority = {}
+    by_id = {client.id: client for client in clients}
+    for client_id, resource_id in matched.items():
+        priority = by_id[client_id].priority
+        if resource_id not in worst_priority or priority > worst_priority[resource_id]:
+            worst_priority[resource_id] = priority
+    for client in clients:
+        if client.id in matched:
+            continue
+        for resource in resources:
+            if resource.id in worst_priority and resource.accepts(client):
+                assert client.priority > worst_priority[resource.id], (client, resource)
+            if resource.open_units > 0:
+                assert not resource.accepts(client), (client, resource)
+
+
+def main(n_clients: int, n_units: int):
+    rng = random.Random(5)
+    
+    small_clients = make_clients(600, rng)
+    small_resources = make_resources(150, rng)
+    engine = MatchingEngine()
+    for resource in small_resources:
+        engine.set_resource(resource, fill=False)
+    matches = engine.match_all(small_clients)
+    check_priority(small_clients, small_resources, matches)
+    
+    # An opened unit goes to the best waiting client it accepts
+    for resource in rng.choices(small_resources, k=50):
+        eligible = [client for client in engine.clients.values() if resource.accepts(client)]
+        released = engine.release(resource.id)
+        if eligible:
+            best = min(eligible, key=lambda client: client.priority)
+            assert [match.client_id for match in released] == [best.id], (resource, released)
+        else:
+            assert not released
+    print(f"priority check: {len(matches)} matches of 600 clients, 150 units ok")
+    
+    clients = make_clients(n_clients, rng)
+    resources = make_resources(n_units, rng)
+    
+    engine = MatchingEngine()
+    started = time.perf_counter()
+    for resource in resources:
+        engine.set_resource(resource, fill=False)
+    matches = engine.match_all(clients)
+    batch = time.perf_counter() - started
+    print(f"\n{n_clients} clients x {n_units} units ({len(resources)} resources)")
+    print(f"batch match:              {batch * 1000:8.0f} ms, {len(matches)} matches")
+    print(f"still waiting:            {len(engine.clients):8d}  {engine.status()['waiting']}")
+    
+    # New intakes while every unit is taken: straight into the queues
+    arrivals = make_clients(10_000, rng, start=n_clients)
+    started = time.perf_counter()
+    for client in arrivals:
+        engine.add_client(client)
+    elapsed = time.perf_counter() - started
+    print(f"client arrives (queued):  {elapsed / len(arrivals) * 1e6:8.1f} us")
+    
+    # Units opening one at a time go to the top eligible waiting client
+    opened = 0
+    started = time.perf_counter()
+    for resource in rng.choices(resources, k=2000):
+        matches = engine.release(resource.id)
+        opened += len(matches)
+    elapsed = time.perf_counter() - started
+    print(f"unit opens (matched):     {elapsed / 2000 * 1e6:8.1f} us ({opened} matched)")
+    
+    # New resources with open units while clients wait
+    new_resources = make_resources(1000, rng)
+    for resource in new_resources:
+        resource.id = f"new_{resource.id}"
+    started = time.perf_counter()
+    matched = sum(len(engine.set_resource(resource)) for resource in new_resources)
+    elapsed = time.perf_counter() - started
+    print(f"new resources:            {elapsed * 1000:8.1f} ms for 1000 units ({matched} matched)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--units", type=int, default=5_000)
+    args = parser.parse_args()
+    main(args.clients, args.units)
@@ -0,0 +1,81 @@
+"""
+Benchmark: per-request overhead of the metrics middleware
+Drives a minimal ASGI app directly (no sockets, no framework) with and
+without MetricsMiddleware, so the difference is the cost of recording
+counts, latency, size and Firestore call metrics. Also times a /metrics
+render with a realistic number of routes
+
+Usage:
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --requests 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.metrics import MetricsMiddleware, count_firestore_call, registry
+
+
+class FakeRoute:
+    path = "/api/v1/client/progress/{client_id}"
+
+
+async def endpoint(scope, receive, send):
+    """Matches a route, makes two Firestore calls and returns a small body"""
+    scope["route"] = FakeRoute
+    count_firestore_call("batch_get_documents")
+    count_firestore_call("batch_get_documents")
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        scope = {"type": "http", "method": "GET", "path": "/api/v1/client/progress/x"}
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+async def main(n: int):
+    wrapped = MetricsMiddleware(endpoint)
+    await drive(endpoint, 1000)
+    await drive(wrapped, 1000)
+    
+    bare = min([await drive(endpoint, n) for _ in range(3)])
+    measured = min([await drive(wrapped, n) for _ in range(3)])
+    overhead_us = (measured - bare) / n * 1e6
+    print(f"{n} requests")
+    print(f"bare app:           {bare / n * 1e6:8.2f} us/request")
+    print(f"with middleware:    {measured / n * 1e6:8.2f} us/request")
+    print(f"metrics overhead:   {overhead_us:8.2f} us/request")
+    
+    # Populate ~40 routes x 3 statuses, then time a scrape
+    for i in range(40):
+        FakeRoute.path = f"/api/v1/route_{i}/{{id}}"
+        for _ in range(3):
+            await wrapped({"type": "http", "method": "GET", "path": "/"}, receive, send)
+    started = time.perf_counter()
+    body = registry.render()
+    print(f"/metrics render:    {(time.perf_counter() - started) * 1000:8.2f} ms ({len(body)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
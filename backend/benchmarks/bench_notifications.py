@@ -0,0 +1,182 @@
+"""
+Benchmark: notification dispatch against local Twilio/SendGrid stubs
+Compares a new HTTP connection per message (what the vendor SDKs do)
+with the pooled dispatcher, and one SendGrid request per email with
+batched personalizations. The stub counts requests and connections and
+can add per-request latency to stand in for the provider round trip
+
+Usage:
+    python benchmarks/bench_notifications.py
+    python benchmarks/bench_notifications.py --messages 2000 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+import httpx
+import orjson
+import uvicorn
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.notifications import NotificationDispatcher
+
+
+class ProviderStub:
+    """ASGI app answering Twilio Messages and SendGrid mail/send"""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.connections = set()
+        self.recipients = 0
+    
+    def reset(self):
+        self.requests = 0
+        self.connections = set()
+        self.recipients = 0
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        
+        self.requests += 1
+        self.connections.add(scope["client"])
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        if scope["path"].endswith("/Messages.json"):
+            self.recipients += 1
+            status, payload = 201, b'{"sid": "SM0000"}'
+        else:
+            self.recipients += len(orjson.loads(body)["personalizations"])
+            status, payload = 202, b""
+        
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def dispatcher(base_url: str, **kwargs) -> NotificationDispatcher:
+    return NotificationDispatcher(
+        twilio_account_sid="AC_bench",
+        twilio_auth_token="token",
+        twilio_from="+15625550100",
+        sendgrid_api_key="SG.bench",
+        sendgrid_from="noreply@example.org",
+        twilio_base_url=base_url,
+        sendgrid_base_url=base_url,
+        sms_rate=1e6,
+        email_rate=1e6,
+        transport=httpx.AsyncHTTPTransport(),
+        **kwargs
+    )
+
+
+async def bounded(coros, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run(coro):
+        async with semaphore:
+            return await coro
+    
+    await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def sms_per_connection(base_url: str, n: int, concurrency: int):
+    async def send(i: int):
+        async with httpx.AsyncClient(transport=httpx.AsyncHTTPTransport()) as client:
+            response = await client.post(
+                f"{base_url}/2010-04-01/Accounts/AC_bench/Messages.json",
+                data={'To': f"+1562555{i:04d}", 'From': "+15625550100", 'Body': "hi"},
+                auth=("AC_bench", "token")
+            )
+            response.raise_for_status()
+    
+    await bounded((send(i) for i in range(n)), concurrency)
+
+
+async def sms_pooled(base_url: str, n: int, concurrency: int):
+    notifier = dispatcher(base_url, max_connections=concurrency)
+    await bounded((notifier.send_sms(f"+1562555{i:04d}", "hi") for i in range(n)), concurrency)
+    await notifier.close()
+
+
+async def email_unbatched(base_url: str, n: int, concurrency: int):
+    notifier = dispatcher(base_url, batch_size=1, max_connections=concurrency)
+    await bounded(
+        (notifier.send_email(f"c{i}@example.org", "Hello", "Hi -n-", {'-n-': str(i)}) for i in range(n)),
+        concurrency
+    )
+    await notifier.close()
+
+
+async def email_batched(base_url: str, n: int, concurrency: int):
+    notifier = dispatcher(base_url, max_connections=concurrency)
+    await asyncio.gather(*(
+        notifier.send_email(f"c{i}@example.org", "Hello", "Hi -n-", {'-n-': str(i)}) for i in range(n)
+    ))
+    await notifier.close()
+
+
+async def main(messages: int, concurrency: int, latency_ms: float):
+    stub = ProviderStub(latency_ms / 1000)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(stub, port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    base_url = f"http://127.0.0.1:{port}"
+    
+    print(f"{messages} messages, concurrency {concurrency}, stub latency {latency_ms:.0f} ms")
+    print(f"{'scenario':<24}{'seconds':>9}{'msg/s':>10}{'requests':>10}{'conns':>8}")
+    for name, scenario in (
+        ("sms, connection each", sms_per_connection),
+        ("sms, pooled", sms_pooled),
+        ("email, request each", email_unbatched),
+        ("email, batched", email_batched),
+    ):
+        stub.reset()
+        started = time.perf_counter()
+        await scenario(base_url, messages, concurrency)
+        elapsed = time.perf_counter() - started
+        assert stub.recipients == messages
+        print(
+            f"{name:<24}{elapsed:>9.2f}{messages / elapsed:>10.0f}"
+            f"{stub.requests:>10}{len(stub.connections):>8}"
+        )
+    
+    server.should_exit = True
+    await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.concurrency, args.latency_ms))
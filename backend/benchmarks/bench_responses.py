@@ -0,0 +1,135 @@
+"""
+Benchmark: /caseworkers/clients response serialization and compression
+Compares FastAPI's default JSON rendering with the orjson default
+response class, then measures full requests at page_size=100 with
+identity, gzip and brotli encodings
+
+Usage:
+    python benchmarks/bench_responses.py
+"""
+
+from datetime import datetime, timedelta
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The benchmark never talks to Firestore; the emulator setting only lets
+# the client be constructed without credentials
+os.environ.setdefault("FIRESTORE_EMULATOR_HOST", "localhost:8681")
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import ORJSONResponse
+from app.main import app
+from app.models.client import Client, ClientListResponse
+from app.services.database import db_service
+
+PAGE_SIZE = 100
+
+
+def make_client_doc(i: int) -> dict:
+    """Client document shaped like a submitted intake"""
+    created = datetime(2025, 1, 1) + timedelta(hours=i)
+    return {
+        'id': f"client_{i:06d}",
+        'first_name': f"First{i}",
+        'last_name': f"Last{i}",
+        'preferred_name': None,
+        'phone': f"+1562555{i % 10000:04d}",
+        'email': f"client{i}@example.org",
+        'date_of_birth': datetime(1980, 1, 1) + timedelta(days=i),
+        'race': ['white', 'black'],
+        'veteran_status': i % 7 == 0,
+        'qr_code': 'QR001',
+        'organization_id': 'org_demo',
+        'assigned_caseworker_id': 'cw_demo_1',
+        'zone': 'downtown',
+        'status': 'assessed',
+        'intake_data': {
+            'currently_homeless': True,
+            'nights_homeless_past_3_years': 400 + i % 300,
+            'living_situation': 'street',
+            'chronic_health': i % 2 == 0,
+            'substance_use': i % 3 == 0,
+            'mental_health': i % 5 == 0,
+            'has_income': False,
+            'additional_info': 'Prefers text messages in the evening',
+        },
+        'vi_spdat_score': {
+            'total_score': 9,
+            'housing_history_score': 3,
+            'wellness_score': 4,
+            'risk_score': 2,
+            'acuity_level': 'high',
+            'recommended_housing_type': 'permanent_supportive',
+            'calculated_at': created,
+        },
+        'notes': ['Initial contact made', 'Needs ID replacement'],
+        'created_at': created,
+        'updated_at': created,
+    }
+
+
+def timeit(fn, repeats: int = 200):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.95)]
+
+
+def main():
+    docs = [make_client_doc(i) for i in range(PAGE_SIZE)]
+    payload = ClientListResponse(
+        clients=[Client(**d) for d in docs],
+        total=5000,
+        page=1,
+        page_size=PAGE_SIZE,
+        has_more=True
+    )
+    dumped = payload.model_dump()
+    
+    print(f"Serialization, {PAGE_SIZE} clients (median / p95 µs)")
+    for name, fn in (
+        ("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(dumped))),
+        ("ORJSONResponse", lambda: ORJSONResponse(dumped)),
+    ):
+        median, p95 = timeit(fn)
+        print(f"  {name:34s} {median:9.0f} {p95:9.0f}")
+    
+    # Full request path with a stubbed database
+    async def list_clients(**kwargs):
+        return [dict(d) for d in docs]
+    
+    async def count_clients(**kwargs):
+        return 5000
+    
+    db_service.list_clients = list_clients
+    db_service.count_clients = count_clients
+    
+    client = TestClient(app)
+    url = "/api/v1/caseworkers/clients"
+    params = {'caseworker_id': 'cw_demo_1', 'page_size': PAGE_SIZE}
+    
+    print(f"\nGET {url}?page_size={PAGE_SIZE} (median / p95 µs, bytes on the wire)")
+    for encoding in ("identity", "gzip", "br"):
+        headers = {'Accept-Encoding': encoding}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        size = int(response.headers.get('content-length', len(response.content)))
+        median, p95 = timeit(lambda: client.get(url, params=params, headers=headers), repeats=100)
+        print(f"  {encoding:10s} {median:9.0f} {p95:9.0f} {size:9d}")
+
+
+if __name__ == "__main__":
+    main()
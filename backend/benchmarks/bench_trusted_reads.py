@@ -0,0 +1,102 @@
+"""
+Benchmark: per-row cost of building and serializing database reads
+Compares the validated path (Model(**doc), then FastAPI's response_model
+re-validation and serialization) with the trusted path (validate once,
+serialize directly) for Client, ClientActionItem and a
+ClientListResponse page
+
+Usage:
+    python benchmarks/bench_trusted_reads.py
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import ORJSONResponse
+from app.models.client import Client, ClientActionItem, ClientListResponse
+from app.models.trusted import action_items_json, client_json, client_list_json
+from bench_responses import make_client_doc
+
+ROWS = 100
+
+
+def make_action_doc(i: int) -> dict:
+    return {
+        'id': f"action_{i:06d}",
+        'client_id': f"client_{i:06d}",
+        'client_name': f"First{i} Last{i}",
+        'action_type': 'initial_contact',
+        'priority': 5 if i % 3 == 0 else 3,
+        'description': f"New intake: high acuity, score {i % 17}/17",
+        'recommendations': {'timeline': 'Immediate priority - contact within 24 hours'},
+        'completed': False,
+        'created_at': datetime(2025, 1, 1) + timedelta(minutes=i),
+    }
+
+
+def per_row_us(fn, rows: int, repeats: int = 50) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) / rows * 1e6
+
+
+def main():
+    client_docs = [make_client_doc(i) for i in range(ROWS)]
+    action_docs = [make_action_doc(i) for i in range(ROWS)]
+    loop = asyncio.new_event_loop()
+    
+    client_field = create_response_field(name="client", type_=Client)
+    action_field = create_response_field(name="actions", type_=List[ClientActionItem])
+    page_field = create_response_field(name="page", type_=ClientListResponse)
+    
+    def validated(field, content):
+        body = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return ORJSONResponse(body)
+    
+    cases = {
+        'Client': (
+            lambda: [validated(client_field, Client(**d)) for d in client_docs],
+            lambda: [client_json(d) for d in client_docs],
+        ),
+        'ClientActionItem': (
+            lambda: validated(action_field, [ClientActionItem(**d) for d in action_docs]),
+            lambda: action_items_json(action_docs),
+        ),
+        'ClientListResponse': (
+            lambda: validated(page_field, ClientListResponse(
+                clients=[Client(**d) for d in client_docs],
+                total=5000, page=1, page_size=ROWS, has_more=True
+            )),
+            lambda: client_list_json(
+                client_docs, total=5000, page=1, page_size=ROWS, has_more=True
+            ),
+        ),
+    }
+    
+    print(f"Per-row cost over {ROWS} rows (µs/row)")
+    print(f"  {'model':20s} {'validated':>10s} {'trusted':>10s} {'speedup':>8s}")
+    for name, (slow, fast) in cases.items():
+        slow_us = per_row_us(slow, ROWS)
+        fast_us = per_row_us(fast, ROWS)
+        print(f"  {name:20s} {slow_us:10.1f} {fast_us:10.1f} {slow_us / fast_us:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: requests per second against app.serve at several worker counts
+Starts the production entry point as a subprocess for each worker count
+and drives it from separate load generator processes (keep-alive
+connections), so the server is measured rather than the client
+
+Throughput only scales while there are idle cores for both the workers
+and the load generators; run it on a machine with spare cores.
+
+Usage:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --duration 10 --path /health
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The benchmarked paths don't read Firestore; the emulator setting only
+# lets each worker construct its client without credentials
+os.environ.setdefault("FIRESTORE_EMULATOR_HOST", "localhost:8681")
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.serve import available_cpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, SERVER_WORKERS=str(workers), PORT=str(port))
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.serve"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, trust_env=False).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not start: {url}")
+
+
+async def _generate(url: str, connections: int, duration: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    
+    async with httpx.AsyncClient(limits=limits, trust_env=False) as client:
+        async def connection():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+        
+        await asyncio.gather(*(connection() for _ in range(connections)))
+    return latencies
+
+
+def generate_load(args) -> list:
+    """One load generator process"""
+    return asyncio.run(_generate(*args))
+
+
+def measure(url: str, generators: int, connections: int, duration: float):
+    with multiprocessing.Pool(generators) as pool:
+        results = pool.map(generate_load, [(url, connections, duration)] * generators)
+    latencies = sorted(latency for result in results for latency in result)
+    if not latencies:
+        return 0.0, 0.0, 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / duration, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--generators", type=int, default=4, help="load generator processes")
+    parser.add_argument("--connections", type=int, default=16, help="connections per generator")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+    
+    print(f"available cpus: {available_cpus()}, path {args.path}, "
+          f"{args.generators}x{args.connections} connections, {args.duration:.0f}s each")
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'speedup':>9}")
+    
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            url = f"http://127.0.0.1:{port}{args.path}"
+            wait_ready(url)
+            measure(url, args.generators, args.connections, 1.0)  # warm up every worker
+            rps, p50, p99 = measure(url, args.generators, args.connections, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+        
+        baseline = baseline or rps
+        print(f"{workers:>8}{rps:>10.0f}{p50:>9.1f}{p99:>9.1f}{rps / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
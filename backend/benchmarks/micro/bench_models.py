@@ -0,0 +1,49 @@
+"""
+Pydantic validation and serialization of intake and client models
+"""
+
+import json
+
+from app.models.client import Client, ClientCreate, ClientListResponse
+
+from conftest import client_doc, intake_submission
+
+
+def bench_client_create_validate_json(benchmark):
+    """Request body parsing of POST /intake/submit"""
+    body = json.dumps(intake_submission('high'))
+    client = benchmark(ClientCreate.model_validate_json, body)
+    assert client.intake_data.currently_homeless
+
+
+def bench_client_create_dump(benchmark):
+    """model_dump() before the client is stored"""
+    client = ClientCreate(**intake_submission('high'))
+    benchmark(client.model_dump)
+
+
+def bench_client_validate(benchmark):
+    """Client(**doc) for a Firestore read"""
+    doc = client_doc(0)
+    client = benchmark(Client.model_validate, doc)
+    assert client.id == doc['id']
+
+
+def bench_client_dump_json(benchmark):
+    """Client.model_dump(mode='json'), the intake response"""
+    client = Client(**client_doc(0))
+    benchmark(client.model_dump, mode='json')
+
+
+def bench_client_list_validate(benchmark, client_docs):
+    """One 100-client page of /caseworkers/clients"""
+    page = {'clients': client_docs, 'total': 1000, 'page': 1, 'page_size': 100, 'has_more': True}
+    response = benchmark(ClientListResponse.model_validate, page)
+    assert len(response.clients) == 100
+
+
+def bench_client_list_dump_json(benchmark, client_docs):
+    response = ClientListResponse(
+        clients=client_docs, total=1000, page=1, page_size=100, has_more=True
+    )
+    benchmark(response.model_dump_json)
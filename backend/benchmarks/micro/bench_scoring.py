@@ -0,0 +1,31 @@
+"""
+VI-SPDAT scoring: runs on every intake submission
+"""
+
+from app.models.client import IntakeData
+from app.services.vi_spdat import vi_spdat_service
+
+from conftest import INTAKES
+
+
+def bench_calculate_score(benchmark, acuity):
+    intake = IntakeData(**INTAKES[acuity])
+    score = benchmark(vi_spdat_service.calculate_score, intake)
+    assert score.acuity_level == acuity
+
+
+def bench_intervention_recommendations(benchmark, acuity):
+    score = vi_spdat_service.calculate_score(IntakeData(**INTAKES[acuity]))
+    recommendations = benchmark(vi_spdat_service.get_intervention_recommendations, score)
+    assert recommendations['acuity_level'] == acuity
+
+
+def bench_score_and_recommend(benchmark):
+    """The scoring work of one submission, from validated intake data"""
+    intake = IntakeData(**INTAKES['high'])
+    
+    def score_and_recommend():
+        score = vi_spdat_service.calculate_score(intake)
+        return vi_spdat_service.get_intervention_recommendations(score)
+    
+    benchmark(score_and_recommend)
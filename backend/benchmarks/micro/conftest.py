@@ -0,0 +1,141 @@
+"""
+Micro-benchmarks for per-request hot paths: VI-SPDAT scoring and
+Pydantic validation/serialization of intake and client models
+
+Usage (from backend/):
+    pytest benchmarks/micro
+    pytest benchmarks/micro --benchmark-save=baseline
+    pytest benchmarks/micro --benchmark-compare
+    pytest benchmarks/micro --benchmark-compare=0001 --benchmark-compare-fail=mean:5%
+
+Runs are saved under benchmarks/micro/baselines/<machine>/. A plain
+--benchmark-compare compares against the latest saved run and fails if
+any benchmark's median got slower by more than benchmark_fail_percent
+(pytest.ini). Baselines only mean something on the machine that
+recorded them; save one from the main branch before comparing a change
+"""
+
+from datetime import datetime, timedelta
+import os
+import sys
+
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ.setdefault("GCP_PROJECT_ID", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from pytest_benchmark.utils import parse_compare_fail
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        "benchmark_fail_percent",
+        "With --benchmark-compare, fail when a median regresses by more than this percentage",
+        default="10"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Keep baselines next to the suite and gate comparisons by default"""
+    option = config.option
+    if option.benchmark_storage == DEFAULT_STORAGE:
+        option.benchmark_storage = f"file://{BASELINES_DIR}"
+    
+    if option.benchmark_compare and not option.benchmark_compare_fail:
+        percent = int(config.getini("benchmark_fail_percent"))
+        option.benchmark_compare_fail = [parse_compare_fail(f"median:{percent}%")]
+
+
+# Intake answers at each acuity level (scores 1, 5 and 15)
+INTAKES = {
+    'low': {
+        'currently_homeless': False,
+        'has_income': True,
+        'has_id': True,
+        'has_family_support': True,
+    },
+    'medium': {
+        'currently_homeless': True,
+        'nights_homeless_past_3_years': 200,
+        'living_situation': 'vehicle',
+        'history_victimization': True,
+        'has_income': True,
+        'has_id': True,
+    },
+    'high': {
+        'currently_homeless': True,
+        'nights_homeless_past_3_years': 900,
+        'living_situation': 'street',
+        'chronic_health': True,
+        'substance_use': True,
+        'mental_health': True,
+        'history_foster_care': True,
+        'history_incarceration': True,
+        'history_victimization': True,
+        'transportation_barriers': True,
+        'additional_info': 'Prefers text messages in the evening',
+    },
+}
+
+
+def intake_submission(acuity: str = 'high') -> dict:
+    """JSON body of POST /intake/submit"""
+    return {
+        'first_name': 'Maria',
+        'last_name': 'Lopez',
+        'preferred_name': 'Mari',
+        'phone': '+15625551234',
+        'email': 'maria@example.org',
+        'date_of_birth': '1984-03-02T00:00:00',
+        'race': ['hispanic'],
+        'veteran_status': False,
+        'primary_language': 'spanish',
+        'needs_interpreter': True,
+        'qr_code': 'QR001',
+        'intake_data': dict(INTAKES[acuity]),
+    }
+
+
+def client_doc(i: int) -> dict:
+    """Client document as read from Firestore"""
+    created = datetime(2025, 1, 1) + timedelta(hours=i)
+    doc = intake_submission(('low', 'medium', 'high')[i % 3])
+    doc.update({
+        'id': f"client_{i:06d}",
+        'date_of_birth': datetime(1980, 1, 1) + timedelta(days=i),
+        'organization_id': 'org_demo',
+        'assigned_caseworker_id': 'cw_demo_1',
+        'zone': 'downtown',
+        'status': 'assessed',
+        'vi_spdat_score': {
+            'total_score': 9,
+            'housing_history_score': 3,
+            'wellness_score': 4,
+            'risk_score': 2,
+            'acuity_level': 'high',
+            'recommended_housing_type': 'permanent_supportive',
+            'calculated_at': created,
+        },
+        'status_timeline': {'intake': created, 'assessed': created},
+        'notes': ['Initial contact made', 'Needs ID replacement'],
+        'created_at': created,
+        'updated_at': created,
+    })
+    return doc
+
+
+@pytest.fixture(params=['low', 'medium', 'high'])
+def acuity(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def client_docs():
+    return [client_doc(i) for i in range(100)]
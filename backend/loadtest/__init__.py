@@ -0,0 +1,5 @@
+"""
+Load testing harness
+Runs the API in-process against an in-memory Firestore fake with
+injected latency; see loadtest/run.py for usage
+"""
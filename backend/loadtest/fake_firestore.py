@@ -0,0 +1,630 @@
+"""
+In-memory Firestore fake for load tests
+Implements the subset of google.cloud.firestore used by the app
+(documents, queries, batches, transactions, preconditions, listeners)
+with injectable latency per round trip. Latency is a blocking sleep,
+like the real client's blocking RPCs
+"""
+
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.field_path import FieldPath
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import copy
+import itertools
+import threading
+import time
+import uuid
+
+
+_DELETE = object()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _split_path(path: str) -> List[str]:
+    """Split a dotted field path honoring backtick quoting"""
+    return FieldPath.from_string(path).parts if '`' in path else path.split('.')
+
+
+def _get_field(data: Dict[str, Any], path: str):
+    if path == '__name__':
+        return data.get('__name__')
+    node: Any = data
+    for part in _split_path(path):
+        if not isinstance(node, dict) or part not in node:
+            return _DELETE
+        node = node[part]
+    return node
+
+
+def _apply_value(target: Dict[str, Any], parts: List[str], value: Any):
+    node = target
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        node = child
+    key = parts[-1]
+    if isinstance(value, transforms.Increment):
+        current = node.get(key, 0)
+        if not isinstance(current, (int, float)):
+            current = 0
+        node[key] = current + value.value
+    elif isinstance(value, transforms.ArrayUnion):
+        current = list(node.get(key) or [])
+        for v in value.values:
+            if v not in current:
+                current.append(v)
+        node[key] = current
+    elif isinstance(value, transforms.ArrayRemove):
+        node[key] = [v for v in (node.get(key) or []) if v not in value.values]
+    elif value is transforms.DELETE_FIELD:
+        node.pop(key, None)
+    elif value is transforms.SERVER_TIMESTAMP:
+        node[key] = _now()
+    else:
+        node[key] = copy.deepcopy(value)
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any], prefix=()):
+    for key, value in data.items():
+        parts = list(prefix) + [key]
+        if isinstance(value, dict) and value:
+            _merge(target, value, parts)
+        else:
+            _apply_value(target, parts, value)
+
+
+def _resolve_transforms(data: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    _merge(out, data)
+    return out
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, update_time=None, create_time=None):
+        self.reference = reference
+        self._data = data
+        self.update_time = update_time
+        self.create_time = create_time
+    
+    @property
+    def id(self):
+        return self.reference.id
+    
+    @property
+    def exists(self):
+        return self._data is not None
+    
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+    
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        return None if value is _DELETE else value
+
+
+class FakeDocumentReference:
+    def __init__(self, client, path: str):
+        self._client = client
+        self._path = path
+    
+    @property
+    def id(self):
+        return self._path.rsplit('/', 1)[-1]
+    
+    @property
+    def path(self):
+        return self._path
+    
+    @property
+    def parent(self):
+        return FakeCollectionReference(self._client, self._path.rsplit('/', 1)[0])
+    
+    def collection(self, name):
+        return FakeCollectionReference(self._client, f"{self._path}/{name}")
+    
+    def get(self, field_paths=None, transaction=None):
+        return self._client._read(self)
+    
+    def set(self, data, merge=False):
+        self._client._write(self, data, merge=merge)
+    
+    def create(self, data):
+        if self._client._exists(self._path):
+            from google.api_core.exceptions import Conflict
+            raise Conflict(f"Document already exists: {self._path}")
+        self._client._write(self, data, merge=False)
+    
+    def update(self, data, option=None):
+        with self._client._lock:
+            if option is not None:
+                option.check(self._client, self._path)
+            self._client._update(self, data)
+    
+    def delete(self):
+        self._client._delete(self)
+    
+    def on_snapshot(self, callback):
+        return self.parent._listen(callback, doc_path=self._path)
+    
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentReference) and other._path == self._path
+    
+    def __hash__(self):
+        return hash(self._path)
+
+
+class FakeQuery:
+    def __init__(self, client, parent_path: str, all_descendants=False,
+                 filters=(), orders=(), limit_=None, offset_=0,
+                 start_after_=None, projection=None):
+        self._client = client
+        self._parent_path = parent_path
+        self._all_descendants = all_descendants
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit_
+        self._offset = offset_
+        self._start_after = start_after_
+        self._projection = projection
+    
+    def _copy(self, **kwargs):
+        params = dict(
+            filters=self._filters, orders=self._orders, limit_=self._limit,
+            offset_=self._offset, start_after_=self._start_after,
+            projection=self._projection,
+        )
+        params.update(kwargs)
+        return FakeQuery(self._client, self._parent_path, self._all_descendants, **params)
+    
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+    
+    def order_by(self, field_path, direction='ASCENDING'):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+    
+    def limit(self, count):
+        return self._copy(limit_=count)
+    
+    def offset(self, num_to_skip):
+        return self._copy(offset_=num_to_skip)
+    
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start_after_=document_fields_or_snapshot)
+    
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+    
+    def _matches(self, data):
+        for field, op, value in self._filters:
+            if isinstance(field, FieldPath):
+                field = field.to_api_repr()
+            actual = _get_field(data, field)
+            if op == '==':
+                ok = actual is not _DELETE and actual == value
+            elif op == '!=':
+                ok = actual is not _DELETE and actual != value
+            elif op == 'array_contains':
+                ok = isinstance(actual, list) and value in actual
+            elif op == 'array_contains_any':
+                ok = isinstance(actual, list) and any(v in actual for v in value)
+            elif op == 'in':
+                ok = actual is not _DELETE and actual in value
+            elif actual is _DELETE or actual is None:
+                ok = False
+            else:
+                try:
+                    ok = {
+                        '<': actual < value, '<=': actual <= value,
+                        '>': actual > value, '>=': actual >= value,
+                    }[op]
+                except TypeError:
+                    ok = False
+            if not ok:
+                return False
+        return True
+    
+    def _sort_key(self, item):
+        path, data = item
+        keys = []
+        for field, _direction in self._orders:
+            value = path if field == '__name__' else _get_field(data, field)
+            keys.append(value)
+        keys.append(path)
+        return keys
+    
+    def _results(self):
+        items = [
+            (path, data) for path, data in self._client._iter_collection(
+                self._parent_path, self._all_descendants
+            )
+            if self._matches(data)
+        ]
+        for field, _ in self._orders:
+            if field != '__name__':
+                items = [i for i in items if _get_field(i[1], field) is not _DELETE]
+        for index in range(len(self._orders) - 1, -1, -1):
+            field, direction = self._orders[index]
+            reverse = str(direction).upper().endswith('DESCENDING')
+            items.sort(
+                key=lambda i: (i[0] if field == '__name__' else _get_field(i[1], field)),
+                reverse=reverse,
+            )
+        if self._start_after is not None:
+            anchor = getattr(self._start_after, 'reference', None)
+            anchor_path = anchor.path if anchor is not None else None
+            for position, (path, _data) in enumerate(items):
+                if path == anchor_path:
+                    items = items[position + 1:]
+                    break
+        items = items[self._offset:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        return items
+    
+    def stream(self, transaction=None):
+        results = self._client._run_query(self)
+        for path, data, update_time in results:
+            if self._projection is not None:
+                projected: Dict[str, Any] = {}
+                for field in self._projection:
+                    value = _get_field(data, field)
+                    if value is not _DELETE:
+                        _apply_value(projected, _split_path(field), value)
+                data = projected
+            yield FakeSnapshot(
+                FakeDocumentReference(self._client, path), data, update_time
+            )
+    
+    def get(self, transaction=None):
+        return list(self.stream())
+    
+    def count(self, alias=None):
+        return _FakeAggregation(self)
+    
+    def on_snapshot(self, callback):
+        return self._client._add_listener(self, callback)
+
+
+class _FakeAggregationResult:
+    def __init__(self, value):
+        self.value = value
+        self.alias = 'count'
+
+
+class _FakeAggregation:
+    def __init__(self, query):
+        self._query = query
+    
+    def get(self, transaction=None):
+        return [[_FakeAggregationResult(len(self._query._client._run_query(self._query)))]]
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client, path: str):
+        super().__init__(client, path)
+        self._path = path
+    
+    @property
+    def id(self):
+        return self._path.rsplit('/', 1)[-1]
+    
+    def document(self, document_id=None):
+        document_id = document_id or uuid.uuid4().hex[:20]
+        return FakeDocumentReference(self._client, f"{self._path}/{document_id}")
+    
+    def add(self, data, document_id=None):
+        ref = self.document(document_id)
+        ref.set(data)
+        return _now(), ref
+    
+    def list_documents(self):
+        return [
+            FakeDocumentReference(self._client, path)
+            for path, _ in self._client._iter_collection(self._path, False)
+        ]
+    
+    def _listen(self, callback, doc_path=None):
+        return self._client._add_listener(self, callback, doc_path=doc_path)
+
+
+class _FakeChange:
+    def __init__(self, change_type, document):
+        self.type = type('ChangeType', (), {'name': change_type})()
+        self.document = document
+
+
+class _FakeWatch:
+    def __init__(self, client, query, callback, doc_path=None):
+        self._client = client
+        self.query = query
+        self.callback = callback
+        self.doc_path = doc_path
+        self.active = True
+    
+    @property
+    def is_active(self):
+        return self.active
+    
+    def unsubscribe(self):
+        self.active = False
+        self._client._remove_listener(self)
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops: List[Callable[[], None]] = []
+    
+    def set(self, reference, data, merge=False):
+        self._ops.append(lambda: self._client._write(reference, data, merge=merge, _latency=False))
+        return self
+    
+    def create(self, reference, data):
+        self._ops.append(lambda: reference.create(data))
+        return self
+    
+    def update(self, reference, data):
+        self._ops.append(lambda: self._client._update(reference, data, _latency=False))
+        return self
+    
+    def delete(self, reference):
+        self._ops.append(lambda: self._client._delete(reference, _latency=False))
+        return self
+    
+    def commit(self):
+        self._client._delay('commit')
+        with self._client._lock:
+            for op in self._ops:
+                op()
+        self._ops = []
+        return []
+    
+    def __len__(self):
+        return len(self._ops)
+
+
+class FakeTransaction(FakeWriteBatch):
+    """
+    Write batch with the hooks firestore.transactional drives; the client
+    lock is held from begin to commit or rollback, so no other thread
+    writes between the transaction's reads and its writes
+    """
+    
+    def __init__(self, client, max_attempts=5, read_only=False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+    
+    def _clean_up(self):
+        self._ops = []
+    
+    def _begin(self, retry_id=None):
+        self._client._lock.acquire()
+        self._id = uuid.uuid4().bytes
+    
+    def _commit(self):
+        try:
+            return self.commit()
+        finally:
+            self._release()
+    
+    def _rollback(self):
+        self._ops = []
+        self._release()
+    
+    def _release(self):
+        if self._id is not None:
+            self._id = None
+            self._client._lock.release()
+
+
+class _FakeWriteOption:
+    """Precondition: document unchanged since last_update_time"""
+    
+    def __init__(self, last_update_time=None, exists=None):
+        self.last_update_time = last_update_time
+        self.exists = exists
+    
+    def check(self, client, path):
+        from google.api_core.exceptions import FailedPrecondition
+        if self.exists is not None and client._exists(path) != self.exists:
+            raise FailedPrecondition(f"Document existence precondition failed: {path}")
+        if self.last_update_time is not None and client._meta.get(path) != self.last_update_time:
+            raise FailedPrecondition(f"Document was modified: {path}")
+
+
+class FakeFirestoreClient:
+    """
+    Thread-safe in-memory stand-in for google.cloud.firestore.Client
+    
+    latency: optional callable(operation: str) -> seconds, called once per
+    Firestore round trip (get, set, update, delete, query, commit)
+    """
+    
+    def __init__(self, latency: Optional[Callable[[str], float]] = None):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._meta: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._latency = latency
+        self._listeners: List[_FakeWatch] = []
+        self._clock = itertools.count()
+        self.operation_counts: Dict[str, int] = {}
+    
+    # -- public API --
+    
+    def collection(self, *path):
+        return FakeCollectionReference(self, '/'.join(path))
+    
+    def document(self, *path):
+        return FakeDocumentReference(self, '/'.join(path))
+    
+    def collection_group(self, collection_id):
+        return FakeQuery(self, collection_id, all_descendants=True)
+    
+    def batch(self):
+        return FakeWriteBatch(self)
+    
+    def transaction(self, **kwargs):
+        return FakeTransaction(self, **kwargs)
+    
+    def write_option(self, last_update_time=None, exists=None):
+        return _FakeWriteOption(last_update_time, exists)
+    
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._delay('get_all')
+        with self._lock:
+            for ref in references:
+                yield self._snapshot(ref)
+    
+    def reset(self):
+        with self._lock:
+            self._docs.clear()
+            self._meta.clear()
+    
+    # -- internals --
+    
+    def _delay(self, operation):
+        self.operation_counts[operation] = self.operation_counts.get(operation, 0) + 1
+        if self._latency is not None:
+            seconds = self._latency(operation)
+            if seconds > 0:
+                time.sleep(seconds)
+    
+    def _exists(self, path):
+        return path in self._docs
+    
+    def _snapshot(self, ref):
+        data = self._docs.get(ref.path)
+        update_time = self._meta.get(ref.path)
+        return FakeSnapshot(ref, copy.deepcopy(data) if data is not None else None, update_time)
+    
+    def _read(self, ref):
+        self._delay('get')
+        with self._lock:
+            return self._snapshot(ref)
+    
+    def _touch(self, path):
+        self._meta[path] = _now()
+    
+    def _write(self, ref, data, merge=False, _latency=True):
+        if _latency:
+            self._delay('set')
+        with self._lock:
+            before = self._docs.get(ref.path)
+            if merge and before is not None:
+                target = copy.deepcopy(before)
+                _merge(target, data)
+            else:
+                target = _resolve_transforms(data)
+            self._docs[ref.path] = target
+            self._touch(ref.path)
+            self._notify(ref.path, before, target)
+    
+    def _update(self, ref, data, _latency=True):
+        if _latency:
+            self._delay('update')
+        with self._lock:
+            if ref.path not in self._docs:
+                from google.api_core.exceptions import NotFound
+                raise NotFound(f"No document to update: {ref.path}")
+            before = self._docs[ref.path]
+            target = copy.deepcopy(before)
+            for key, value in data.items():
+                parts = _split_path(key) if isinstance(key, str) else list(key.parts)
+                _apply_value(target, parts, value)
+            self._docs[ref.path] = target
+            self._touch(ref.path)
+            self._notify(ref.path, before, target)
+    
+    def _delete(self, ref, _latency=True):
+        if _latency:
+            self._delay('delete')
+        with self._lock:
+            before = self._docs.pop(ref.path, None)
+            self._meta.pop(ref.path, None)
+            if before is not None:
+                self._notify(ref.path, before, None)
+    
+    def _iter_collection(self, parent_path, all_descendants):
+        with self._lock:
+            items = list(self._docs.items())
+        for path, data in items:
+            collection_path, _, _doc_id = path.rpartition('/')
+            if all_descendants:
+                if collection_path.rsplit('/', 1)[-1] != parent_path:
+                    continue
+            elif collection_path != parent_path:
+                continue
+            yield path, data
+    
+    def _run_query(self, query):
+        self._delay('query')
+        with self._lock:
+            return [
+                (path, copy.deepcopy(data), self._meta.get(path))
+                for path, data in query._results()
+            ]
+    
+    # -- listeners --
+    
+    def _add_listener(self, query, callback, doc_path=None):
+        watch = _FakeWatch(self, query, callback, doc_path=doc_path)
+        with self._lock:
+            self._listeners.append(watch)
+            if doc_path is not None:
+                snapshot = self._snapshot(FakeDocumentReference(self, doc_path))
+                docs, changes = [snapshot], []
+            else:
+                results = query._results()
+                docs = [
+                    FakeSnapshot(FakeDocumentReference(self, p), copy.deepcopy(d), self._meta.get(p))
+                    for p, d in results
+                ]
+                changes = [_FakeChange('ADDED', doc) for doc in docs]
+        callback(docs, changes, _now())
+        return watch
+    
+    def _remove_listener(self, watch):
+        with self._lock:
+            if watch in self._listeners:
+                self._listeners.remove(watch)
+    
+    def _notify(self, path, before, after):
+        for watch in list(self._listeners):
+            if not watch.active:
+                continue
+            if watch.doc_path is not None:
+                if watch.doc_path != path:
+                    continue
+                snap = self._snapshot(FakeDocumentReference(self, path))
+                watch.callback([snap], [], _now())
+                continue
+            query = watch.query
+            collection_path = path.rpartition('/')[0]
+            if query._all_descendants:
+                if collection_path.rsplit('/', 1)[-1] != query._parent_path:
+                    continue
+            elif collection_path != query._parent_path:
+                continue
+            was = before is not None and query._matches(before)
+            now = after is not None and query._matches(after)
+            if not was and not now:
+                continue
+            ref = FakeDocumentReference(self, path)
+            snap = FakeSnapshot(ref, copy.deepcopy(after) if now else copy.deepcopy(before), self._meta.get(path))
+            if was and now:
+                change = 'MODIFIED'
+            elif now:
+                change = 'ADDED'
+            else:
+                change = 'REMOVED'
+            watch.callback([], [_FakeChange(change, snap)], _now())
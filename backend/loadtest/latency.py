@@ -0,0 +1,152 @@
+"""
+Firestore latency models for load tests
+Per-operation latency distributions for FakeFirestoreClient
+
+Operations are the fake's round trips: get, get_all, query, set, update,
+delete, commit. A model is a callable(operation) -> seconds
+"""
+
+from typing import Dict, Optional
+import math
+import random
+
+# z-score of the 99th percentile of a standard normal
+Z_99 = 2.326
+
+
+class Constant:
+    """Fixed latency"""
+    
+    def __init__(self, ms: float):
+        self.ms = ms
+    
+    def sample(self, rng: random.Random) -> float:
+        return self.ms / 1000
+    
+    def __repr__(self):
+        return f"const:{self.ms:g}"
+
+
+class LogNormal:
+    """Log-normal latency fitted to a median and p99 (long right tail)"""
+    
+    def __init__(self, median_ms: float, p99_ms: float):
+        if p99_ms < median_ms:
+            raise ValueError("p99 must be >= median")
+        self.median_ms = median_ms
+        self.p99_ms = p99_ms
+        self.mu = math.log(median_ms)
+        self.sigma = math.log(p99_ms / median_ms) / Z_99
+    
+    def sample(self, rng: random.Random) -> float:
+        return rng.lognormvariate(self.mu, self.sigma) / 1000
+    
+    def __repr__(self):
+        return f"lognormal:{self.median_ms:g}:{self.p99_ms:g}"
+
+
+class WithSpikes:
+    """A base distribution plus occasional fixed stalls (e.g. hot-spotting)"""
+    
+    def __init__(self, base, probability: float, spike_ms: float):
+        self.base = base
+        self.probability = probability
+        self.spike_ms = spike_ms
+    
+    def sample(self, rng: random.Random) -> float:
+        if rng.random() < self.probability:
+            return self.spike_ms / 1000
+        return self.base.sample(rng)
+    
+    def __repr__(self):
+        return f"{self.base!r}+spike:{self.probability:g}:{self.spike_ms:g}"
+
+
+def parse_distribution(spec: str):
+    """
+    Parse a distribution spec:
+    - const:<ms>
+    - lognormal:<median_ms>:<p99_ms>
+    - either followed by +spike:<probability>:<ms>
+    """
+    base_spec, _, spike_spec = spec.partition('+')
+    kind, *args = base_spec.split(':')
+    try:
+        values = [float(a) for a in args]
+        if kind == 'const' and len(values) == 1:
+            base = Constant(*values)
+        elif kind == 'lognormal' and len(values) == 2:
+            base = LogNormal(*values)
+        else:
+            raise ValueError
+        if spike_spec:
+            spike_kind, *spike_args = spike_spec.split(':')
+            if spike_kind != 'spike' or len(spike_args) != 2:
+                raise ValueError
+            base = WithSpikes(base, float(spike_args[0]), float(spike_args[1]))
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution: {spec!r}")
+    return base
+
+
+# Named profiles: operation -> distribution ('*' is the default)
+PROFILES: Dict[str, Dict[str, str]] = {
+    # No injected latency: measures app CPU cost only
+    'none': {'*': 'const:0'},
+    # Local emulator
+    'emulator': {'*': 'lognormal:1:4'},
+    # Same-region Cloud Run -> Firestore
+    'regional': {
+        '*': 'lognormal:8:45',
+        'get': 'lognormal:6:35',
+        'get_all': 'lognormal:8:45',
+        'query': 'lognormal:12:80',
+        'commit': 'lognormal:15:90',
+    },
+    # Regional with a contended backend: slower tail and rare stalls
+    'degraded': {
+        '*': 'lognormal:15:150+spike:0.01:500',
+        'query': 'lognormal:25:250+spike:0.01:800',
+        'commit': 'lognormal:30:300+spike:0.02:1000',
+    },
+}
+
+
+class LatencyModel:
+    """callable(operation) -> seconds, sampled from per-operation distributions"""
+    
+    def __init__(self, distributions: Dict[str, str], seed: Optional[int] = None):
+        self.distributions = {op: parse_distribution(spec) for op, spec in distributions.items()}
+        if '*' not in self.distributions:
+            self.distributions['*'] = Constant(0)
+        self._rng = random.Random(seed)
+    
+    @classmethod
+    def from_profile(
+        cls,
+        profile: str,
+        overrides: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None
+    ) -> 'LatencyModel':
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown latency profile {profile!r} (choose from {', '.join(PROFILES)})")
+        return cls({**PROFILES[profile], **(overrides or {})}, seed)
+    
+    def __call__(self, operation: str) -> float:
+        distribution = self.distributions.get(operation) or self.distributions['*']
+        return distribution.sample(self._rng)
+    
+    def describe(self) -> Dict[str, str]:
+        return {op: repr(distribution) for op, distribution in sorted(self.distributions.items())}
+
+
+def parse_overrides(items) -> Dict[str, str]:
+    """['query=lognormal:20:200', ...] -> {'query': 'lognormal:20:200'}"""
+    overrides = {}
+    for item in items or []:
+        operation, sep, spec = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected operation=distribution, got {item!r}")
+        overrides[operation] = spec
+    return overrides
+
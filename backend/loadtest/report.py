@@ -0,0 +1,144 @@
+"""
+Load test results
+Per-request latency recording, percentile summaries and release-to-release
+comparison of JSON reports
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import json
+import time
+
+# Requests with fewer samples than this are reported but never flagged
+MIN_SAMPLES = 20
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Collects latency and status per named request"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+    
+    def record(self, name: str, seconds: float, status: Any):
+        self.statuses[name][str(status)] += 1
+        if isinstance(status, int) and status < 400:
+            self.latencies[name].append(seconds)
+    
+    def stop(self):
+        self.finished = time.perf_counter()
+    
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """name -> counts, throughput and latency percentiles (ms) of successful requests"""
+        elapsed = self.elapsed
+        results = {}
+        all_latencies: List[float] = []
+        totals: Dict[str, int] = defaultdict(int)
+        
+        for name in sorted(self.statuses):
+            latencies = sorted(self.latencies.get(name, []))
+            all_latencies.extend(latencies)
+            for code, count in self.statuses[name].items():
+                totals[code] += count
+            results[name] = _stats(latencies, self.statuses[name], elapsed)
+        
+        all_latencies.sort()
+        results['ALL'] = _stats(all_latencies, totals, elapsed)
+        return results
+
+
+def _stats(latencies: List[float], statuses: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    requests = sum(statuses.values())
+    return {
+        'requests': requests,
+        'errors': requests - len(latencies),
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def print_summary(results: Dict[str, Dict[str, Any]]):
+    print(f"{'request':<28}{'count':>8}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:<28}{stats['requests']:>8}{stats['errors']:>8}{stats['rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+        errors = {code: n for code, n in stats['statuses'].items() if not code.isdigit() or int(code) >= 400}
+        if errors:
+            print(f"{'':<28}errors by status: {errors}")
+
+
+def save_report(path: str, report: Dict[str, Any]):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str = 'p95_ms',
+    threshold_pct: float = 10.0
+) -> List[str]:
+    """
+    Print current vs baseline per request; returns the requests whose
+    metric regressed by more than threshold_pct (or whose error rate rose)
+    """
+    if baseline.get('scenario') != current.get('scenario'):
+        print(f"warning: comparing different scenarios "
+              f"({baseline.get('scenario')} vs {current.get('scenario')})")
+    if baseline.get('latency') != current.get('latency'):
+        print("warning: latency models differ between reports")
+    
+    regressions = []
+    print(f"{'request':<28}{'base ' + metric:>14}{'now':>10}{'change':>9}{'base req/s':>12}{'now':>9}")
+    for name, now in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<28}{'-':>14}{now[metric]:>10.1f}{'new':>9}")
+            continue
+        
+        change = _change_pct(before[metric], now[metric])
+        error_rate_before = before['errors'] / before['requests'] if before['requests'] else 0.0
+        error_rate_now = now['errors'] / now['requests'] if now['requests'] else 0.0
+        flag = ""
+        if min(before['requests'], now['requests']) < MIN_SAMPLES:
+            flag = "  (few samples)"
+        elif change > threshold_pct:
+            flag = "  REGRESSION"
+        elif error_rate_now > error_rate_before + 0.01:
+            flag = "  MORE ERRORS"
+        if flag.strip() in ("REGRESSION", "MORE ERRORS"):
+            regressions.append(name)
+        print(f"{name:<28}{before[metric]:>14.1f}{now[metric]:>10.1f}{change:>+8.1f}%"
+              f"{before['rps']:>12.1f}{now['rps']:>9.1f}{flag}")
+    return regressions
+
+
+def _change_pct(before: float, now: float) -> float:
+    if before == 0:
+        return 0.0 if now == 0 else 100.0
+    return (now - before) / before * 100
@@ -0,0 +1,177 @@
+"""
+Load test runner
+Runs one scenario against the app in-process (httpx ASGI transport, no
+sockets) backed by the Firestore fake with injected latency, then prints
+p50/p95/p99 and throughput per request and optionally saves or compares
+JSON reports
+
+Requests are measured end to end through the full middleware stack; the
+load generator shares the event loop, so compare runs made with the
+same settings on the same machine rather than absolute numbers
+
+Usage:
+    python -m loadtest.run --list
+    python -m loadtest.run caseworker_polling
+    python -m loadtest.run intake_surge --users 100 --duration 60 --latency degraded
+    python -m loadtest.run portal_logins --latency-op query=lognormal:40:400
+    python -m loadtest.run city_fanin --json results/city.json
+    python -m loadtest.run city_fanin --compare results/city.json --fail-over 15
+"""
+
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from loadtest.fake_firestore import FakeFirestoreClient
+from loadtest.latency import PROFILES, LatencyModel, parse_overrides
+from loadtest.report import Recorder, compare, load_report, print_summary, save_report
+from loadtest.scenarios import SCENARIOS, Scenario, Session
+from loadtest.world import install_fake, seed_world
+
+
+async def run_stages(scenario: Scenario, sessions, stages):
+    """Grow or shrink the running user loops per stage"""
+    tasks = []
+    
+    async def user_loop(session: Session):
+        while True:
+            await asyncio.sleep(await scenario.step(session))
+    
+    try:
+        for stage in stages:
+            while len(tasks) < stage.users:
+                tasks.append(asyncio.create_task(user_loop(sessions[len(tasks)])))
+            while len(tasks) > stage.users:
+                tasks.pop().cancel()
+            await asyncio.sleep(stage.seconds)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run(args, fake: FakeFirestoreClient, latency: LatencyModel) -> dict:
+    import httpx
+    from app.main import app
+    from app.services.job_queue import job_queue
+    
+    scenario = SCENARIOS[args.scenario]
+    users = args.users or scenario.default_users
+    stages = scenario.stages(args.duration, users)
+    
+    async with app.router.lifespan_context(app):
+        print(f"seeding {args.orgs} organizations, {args.clients} clients...")
+        world = await seed_world(fake, organizations=args.orgs, clients=args.clients, seed=args.seed)
+        
+        fake._latency = latency
+        fake.operation_counts = {}
+        recorder = Recorder()
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            limits=limits,
+            timeout=60.0
+        ) as http:
+            sessions = [
+                Session(http, recorder, world, index, args.seed)
+                for index in range(max(stage.users for stage in stages))
+            ]
+            print(f"running {scenario.name}: {' -> '.join(f'{s.users} users/{s.seconds:g}s' for s in stages)}")
+            await run_stages(scenario, sessions, stages)
+        recorder.stop()
+        jobs = job_queue.metrics()
+    
+    return {
+        'scenario': scenario.name,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'config': {
+            'users': users,
+            'duration': args.duration,
+            'organizations': args.orgs,
+            'clients': args.clients,
+            'seed': args.seed,
+            'latency_profile': args.latency,
+        },
+        'latency': latency.describe(),
+        'elapsed_seconds': round(recorder.elapsed, 2),
+        'firestore_operations': dict(sorted(fake.operation_counts.items())),
+        'jobs': {key: jobs[key] for key in ('queue_depth', 'in_flight') if key in jobs},
+        'results': recorder.summary(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a load test scenario against the app in-process")
+    parser.add_argument("scenario", nargs="?", choices=sorted(SCENARIOS))
+    parser.add_argument("--list", action="store_true", help="list scenarios and latency profiles")
+    parser.add_argument("--users", type=int, default=0, help="peak concurrent users (default: per scenario)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--latency", default="regional", choices=sorted(PROFILES),
+                        help="Firestore latency profile")
+    parser.add_argument("--latency-op", action="append", metavar="OP=DIST",
+                        help="override one operation, e.g. query=lognormal:20:200 or get=const:5")
+    parser.add_argument("--orgs", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=500, help="clients seeded before the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", metavar="PATH", help="save the report as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON report to compare against")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms"])
+    parser.add_argument("--fail-over", type=float, default=10.0, metavar="PCT",
+                        help="exit 1 if any request's metric regresses by more than PCT")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    
+    if args.list or not args.scenario:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<20}{scenario.description} ({scenario.default_users} users)")
+        print()
+        for profile, distributions in PROFILES.items():
+            print(f"latency {profile:<12}{distributions}")
+        return
+    
+    latency = LatencyModel.from_profile(args.latency, parse_overrides(args.latency_op), seed=args.seed)
+    fake = FakeFirestoreClient()
+    install_fake(fake)
+    
+    import app.main  # noqa: F401  (configures logging)
+    logging.getLogger().setLevel(args.log_level.upper())
+    
+    report = asyncio.run(run(args, fake, latency))
+    print()
+    print_summary(report['results'])
+    print(f"\nfirestore operations: {report['firestore_operations']}")
+    
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        save_report(args.json, report)
+        print(f"saved {args.json}")
+    
+    if args.compare:
+        print()
+        regressions = compare(load_report(args.compare), report, args.metric, args.fail_over)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.fail_over:g}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Load test scenarios
+Each scenario is a virtual user loop plus a load shape (stages of
+concurrent users). Users are closed-loop with think time, like people
+behind dashboards and phones
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import random
+import time
+import uuid
+
+import httpx
+
+from loadtest.report import Recorder
+from loadtest.world import World, random_intake
+
+API = "/api/v1"
+
+
+@dataclass
+class Stage:
+    seconds: float
+    users: int
+
+
+class Session:
+    """One virtual user: HTTP client, recorder, world data and its own RNG"""
+    
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder, world: World, index: int, seed: int):
+        self.http = http
+        self.recorder = recorder
+        self.world = world
+        self.index = index
+        self.rng = random.Random(seed * 100_003 + index)
+    
+    async def request(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, **kwargs)
+        except Exception as e:
+            self.recorder.record(name, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.recorder.record(name, time.perf_counter() - started, response.status_code)
+        return response
+    
+    def think(self, low: float, high: float) -> float:
+        return self.rng.uniform(low, high)
+
+
+class Scenario:
+    name = ""
+    description = ""
+    default_users = 10
+    
+    def stages(self, duration: float, users: int) -> List[Stage]:
+        return [Stage(duration, users)]
+    
+    async def step(self, session: Session) -> float:
+        """Run one iteration; returns think time in seconds"""
+        raise NotImplementedError
+
+
+class IntakeSurge(Scenario):
+    name = "intake_surge"
+    description = "QR scans and intake submissions ramping 10x (e.g. a cold-weather night)"
+    default_users = 60
+    
+    def stages(self, duration: float, users: int) -> List[Stage]:
+        quiet = max(1, users // 10)
+        return [
+            Stage(duration * 0.2, quiet),
+            Stage(duration * 0.6, users),
+            Stage(duration * 0.2, quiet),
+        ]
+    
+    async def step(self, session: Session) -> float:
+        qr_code = session.rng.choice(session.world.qr_codes)
+        response = await session.request(
+            "intake.start", "POST", f"{API}/intake/start", params={'qr_code': qr_code}
+        )
+        if response is None or response.status_code != 200:
+            return session.think(0.5, 1.0)
+        
+        await session.request(
+            "intake.submit", "POST", f"{API}/intake/submit",
+            json=random_intake(session.rng, qr_code),
+            headers={'Idempotency-Key': uuid.uuid4().hex}
+        )
+        return session.think(0.2, 1.0)
+
+
+class CaseworkerPolling(Scenario):
+    name = "caseworker_polling"
+    description = "Caseworker dashboards polling queue, caseload and stats, opening clients"
+    default_users = 32
+    
+    async def step(self, session: Session) -> float:
+        world = session.world
+        caseworker_id = world.caseworkers[session.index % len(world.caseworkers)]
+        params = {'caseworker_id': caseworker_id}
+        
+        await session.request("caseworker.queue", "GET", f"{API}/caseworkers/queue", params=params)
+        response = await session.request(
+            "caseworker.clients", "GET", f"{API}/caseworkers/clients", params=params
+        )
+        await session.request("caseworker.stats", "GET", f"{API}/caseworkers/stats", params=params)
+        
+        clients = []
+        if response is not None and response.status_code == 200:
+            clients = response.json().get('clients', [])
+        if clients and session.rng.random() < 0.2:
+            client_id = session.rng.choice(clients)['id']
+            await session.request(
+                "caseworker.client", "GET", f"{API}/caseworkers/clients/{client_id}", params=params
+            )
+            await session.request(
+                "caseworker.timeline", "GET", f"{API}/caseworkers/clients/{client_id}/timeline",
+                params=params
+            )
+        return session.think(1.0, 3.0)
+
+
+class CityFanIn(Scenario):
+    name = "city_fanin"
+    description = "Many city dashboards reading citywide aggregates while intakes trickle in"
+    default_users = 50
+    
+    DASHBOARD = [
+        ("city.metrics", "/city/metrics"),
+        ("city.organizations", "/city/organizations"),
+        ("city.contractors", "/city/contractors/performance"),
+        ("city.qr_analytics", "/city/qr-codes/analytics"),
+        ("city.timeseries", "/city/metrics/timeseries"),
+    ]
+    
+    async def step(self, session: Session) -> float:
+        if session.index == 0:
+            # One writer keeps aggregates moving so caches expire and refill
+            qr_code = session.rng.choice(session.world.qr_codes)
+            await session.request(
+                "intake.submit", "POST", f"{API}/intake/submit",
+                json=random_intake(session.rng, qr_code)
+            )
+            return session.think(0.2, 0.6)
+        
+        for name, path in self.DASHBOARD:
+            await session.request(name, "GET", f"{API}{path}")
+        return session.think(1.0, 3.0)
+
+
+class PortalLogins(Scenario):
+    name = "portal_logins"
+    description = "Clients logging in to the portal and checking progress"
+    default_users = 40
+    
+    async def step(self, session: Session) -> float:
+        client_id, code, phone_last4 = session.rng.choice(session.world.clients)
+        response = await session.request(
+            "client.login", "POST", f"{API}/client/auth/login",
+            params={'confirmation_code': code, 'phone_last4': phone_last4}
+        )
+        if response is None or response.status_code != 200:
+            return session.think(1.0, 3.0)
+        
+        await session.request("client.progress", "GET", f"{API}/client/progress/{client_id}")
+        await session.request("client.profile", "GET", f"{API}/client/profile/{client_id}")
+        await session.request("client.caseworker", "GET", f"{API}/client/caseworker/{client_id}")
+        return session.think(2.0, 5.0)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (IntakeSurge(), CaseworkerPolling(), CityFanIn(), PortalLogins())
+}
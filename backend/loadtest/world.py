@@ -0,0 +1,148 @@
+"""
+Load test environment
+Wires the app to the in-memory Firestore fake and seeds a city-sized
+dataset: organizations, caseworkers, QR codes and clients created through
+the real intake code path
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Tuple
+import asyncio
+import os
+import random
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings required at import; nothing talks to GCP
+os.environ.setdefault("GCP_PROJECT_ID", "loadtest")
+os.environ.setdefault("SECRET_KEY", "loadtest")
+
+from loadtest.fake_firestore import FakeFirestoreClient
+
+ZONES = ['downtown', 'north', 'west', 'east']
+FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'David', 'Elena', 'Frank', 'Grace', 'Hector', 'Iris', 'Jamal']
+LAST_NAMES = ['Lopez', 'Nguyen', 'Smith', 'Johnson', 'Garcia', 'Kim', 'Brown', 'Davis', 'Martinez', 'Lee']
+
+
+def install_fake(fake: FakeFirestoreClient):
+    """Make every firestore.Client() in this process return the fake"""
+    from google.cloud import firestore
+    firestore.Client = lambda *args, **kwargs: fake
+
+
+@dataclass
+class World:
+    organizations: List[str] = field(default_factory=list)
+    caseworkers: List[str] = field(default_factory=list)
+    qr_codes: List[str] = field(default_factory=list)
+    # (client_id, confirmation_code, phone_last4)
+    clients: List[Tuple[str, str, str]] = field(default_factory=list)
+
+
+def random_intake(rng: random.Random, qr_code: str) -> dict:
+    """Intake submission with a realistic spread of acuity"""
+    phone = f"562{rng.randrange(10**7):07d}"
+    return {
+        'first_name': rng.choice(FIRST_NAMES),
+        'last_name': rng.choice(LAST_NAMES),
+        'phone': phone,
+        'email': f"client{rng.randrange(10**9)}@example.com",
+        'qr_code': qr_code,
+        'intake_data': {
+            'currently_homeless': rng.random() < 0.9,
+            'nights_homeless_past_3_years': rng.choice([None, 30, 200, 400, 900]),
+            'chronic_health': rng.random() < 0.4,
+            'substance_use': rng.random() < 0.3,
+            'mental_health': rng.random() < 0.4,
+            'history_foster_care': rng.random() < 0.15,
+            'history_incarceration': rng.random() < 0.25,
+            'history_victimization': rng.random() < 0.3,
+            'has_income': rng.random() < 0.3,
+            'has_id': rng.random() < 0.6,
+            'has_family_support': rng.random() < 0.3,
+        },
+    }
+
+
+async def seed_world(
+    fake: FakeFirestoreClient,
+    organizations: int = 4,
+    caseworkers_per_zone: int = 2,
+    clients: int = 500,
+    seed: int = 42
+) -> World:
+    """
+    Seed reference data directly and clients through the intake service
+    (scoring, assignment, action items, status events, org metrics).
+    Run with latency disabled and inside the app lifespan
+    """
+    from app.api.v1.intake import _submit_intake
+    from app.models.client import ClientCreate
+    
+    rng = random.Random(seed)
+    world = World()
+    now = datetime.utcnow()
+    
+    for o in range(organizations):
+        org_id = f"org_{o:02d}"
+        fake.collection('organizations').document(org_id).set({
+            'name': f"Service Provider {o}",
+            'contact_email': f"intake@provider{o}.org",
+            'contact_phone': f"+1562555{o:04d}",
+            'zones': ZONES,
+            'active': True,
+            'created_at': now,
+        })
+        world.organizations.append(org_id)
+        
+        for zone in ZONES:
+            for c in range(caseworkers_per_zone):
+                caseworker_id = f"cw_{o:02d}_{zone}_{c}"
+                fake.collection('caseworkers').document(caseworker_id).set({
+                    'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    'email': f"{caseworker_id}@provider{o}.org",
+                    'phone': f"+1562556{len(world.caseworkers):04d}",
+                    'organization_id': org_id,
+                    'assigned_zones': [zone],
+                    'active': True,
+                    'created_at': now,
+                })
+                world.caseworkers.append(caseworker_id)
+            
+            qr_code = f"QR_{o:02d}_{zone}"
+            fake.collection('qr_codes').document(qr_code).set({
+                'organization_id': org_id,
+                'location': f"{zone.title()} site {o}",
+                'zone': zone,
+                'scan_count': 0,
+                'active': True,
+                'created_at': now,
+                'last_scanned_at': None,
+            })
+            world.qr_codes.append(qr_code)
+    
+    for i in range(clients):
+        record = await _submit_intake(ClientCreate(**random_intake(rng, rng.choice(world.qr_codes))))
+        # Intake doesn't issue confirmation codes yet; give seeded clients one
+        code = f"H{i:06d}"
+        fake.collection('clients').document(record['id']).update({'confirmation_code': code})
+        world.clients.append((record['id'], code, record['phone'][-4:]))
+    
+    await _drain_jobs()
+    return world
+
+
+async def _drain_jobs(timeout: float = 60.0):
+    """Let post-intake jobs from seeding finish before measuring"""
+    from app.services.job_queue import job_queue
+    
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        metrics = job_queue.metrics()
+        if metrics['queue_depth'] == 0 and metrics['in_flight'] == 0:
+            return
+        await asyncio.sleep(0.05)
@@ -0,0 +1,40 @@
+"""
+Unit tests for services that can run without GCP
+
+Usage (from backend/):
+    pytest tests
+
+Firestore is replaced by the load test fake (loadtest/fake_firestore.py)
+and Redis by fakeredis, so no emulator or server is needed
+"""
+
+import os
+import sys
+
+import fakeredis
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GCP_PROJECT_ID", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from loadtest.fake_firestore import FakeFirestoreClient
+from app.services.database import db_service
+
+
+@pytest.fixture
+def redis_server():
+    """One Redis server shared by every client made from it"""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def firestore_db(monkeypatch):
+    """db_service backed by an empty in-memory Firestore"""
+    fake = FakeFirestoreClient()
+    monkeypatch.setattr(db_service, '_db', fake)
+    monkeypatch.setattr(db_service, '_pid', os.getpid())
+    monkeypatch.setattr(db_service, '_queue_cache', None)
+    return fake
@@ -0,0 +1,62 @@
+"""
+Completing action items: organization metrics count each completion
+once, however often it is requested
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import asyncio
+
+from app.services.database import db_service
+
+
+async def add_action(db, client_id='c1', created_at=None):
+    db.collection('clients').document(client_id).set({
+        'first_name': 'Ann',
+        'last_name': 'Lee',
+        'organization_id': 'org1',
+        'status': 'assessed',
+        'created_at': created_at or datetime.utcnow() - timedelta(hours=6)
+    })
+    return await db_service.create_action_item('cw1', {
+        'client_id': client_id,
+        'action_type': 'initial_contact',
+        'priority': 3
+    })
+
+
+def metrics(db):
+    return db.collection('org_metrics').document('org1').get().to_dict()
+
+
+async def test_complete_records_metrics_once(firestore_db):
+    action_id = await add_action(firestore_db)
+    
+    action = await db_service.complete_action_item('cw1', action_id, notes="Called")
+    again = await db_service.complete_action_item('cw1', action_id, notes="Called")
+    
+    assert action['completed'] and again['completed']
+    assert again['completed_at'] == action['completed_at']
+    recorded = metrics(firestore_db)
+    assert recorded['actions_completed'] == 1
+    assert recorded['actions_documented'] == 1
+    assert recorded['response_count'] == 1
+    assert 5.9 < recorded['response_hours_sum'] < 6.1
+    assert await db_service.complete_action_item('cw1', 'missing') is None
+
+
+def test_concurrent_completes_count_once(firestore_db):
+    action_id = asyncio.run(add_action(firestore_db))
+    # Round trips slow enough for the completes to overlap
+    firestore_db._latency = lambda operation: 0.01
+    
+    def complete(_):
+        return asyncio.run(db_service.complete_action_item('cw1', action_id))
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(complete, range(8)))
+    
+    assert len({result['completed_at'] for result in results}) == 1
+    recorded = metrics(firestore_db)
+    assert recorded['actions_completed'] == 1
+    assert recorded['response_count'] == 1
@@ -0,0 +1,113 @@
+"""
+By-name list: ranked in the housing matching engine's order, served
+only from the index its first request loads
+"""
+
+from datetime import datetime
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.services.by_name_list import ByNameList
+from app.services.client_snapshot import ClientSnapshot
+from app.services.database import db_service
+from app.services.matching import WaitingClient
+
+
+def add_client(db, client_id, score, created_at, calculated_at=None):
+    db.collection('clients').document(client_id).set({
+        'status': 'assessed',
+        'zone': 'downtown',
+        'created_at': created_at,
+        'updated_at': created_at,
+        'vi_spdat_score': {
+            'total_score': score,
+            'acuity_level': 'high',
+            'recommended_housing_type': 'permanent_supportive',
+            'calculated_at': calculated_at
+        }
+    })
+
+
+def test_ties_break_like_the_matching_engine(firestore_db):
+    # Same score: c1 came in first, c2 was assessed first
+    add_client(firestore_db, 'c1', 12, datetime(2024, 1, 1), datetime(2024, 3, 1))
+    add_client(firestore_db, 'c2', 12, datetime(2024, 2, 1), datetime(2024, 2, 2))
+    add_client(firestore_db, 'c3', 12, datetime(2024, 1, 15))
+    add_client(firestore_db, 'c4', 15, datetime(2024, 4, 1), datetime(2024, 4, 1))
+    
+    snapshot = ClientSnapshot()
+    snapshot.db = firestore_db
+    ranked = ByNameList()
+    snapshot.on_change(ranked)
+    snapshot.load()
+    
+    engine_order = sorted(
+        (WaitingClient.from_doc(doc.id, doc.to_dict()) for doc in firestore_db.collection('clients').stream()),
+        key=lambda client: client.priority
+    )
+    _, page = ranked.page()
+    assert [entry['client_id'] for entry in page] == [client.id for client in engine_order]
+    assert [entry['client_id'] for entry in page] == ['c4', 'c3', 'c2', 'c1']
+    
+    # Later changes keep the same key
+    snapshot.upsert('c1', {'vi_spdat_score': {
+        'total_score': 12,
+        'acuity_level': 'high',
+        'calculated_at': datetime(2024, 1, 10)
+    }})
+    _, page = ranked.page()
+    assert [entry['client_id'] for entry in page] == ['c4', 'c1', 'c3', 'c2']
+
+
+async def test_first_request_loads_the_list_then_never_scans(firestore_db, monkeypatch):
+    from app.api.v1 import city
+    from app.main import app
+    from app.services import database
+    
+    # Fresh index for this test (the process-wide one may be loaded)
+    snapshot = ClientSnapshot()
+    ranked = ByNameList()
+    snapshot.on_change(ranked)
+    monkeypatch.setattr(city, 'client_snapshot', snapshot)
+    monkeypatch.setattr(city, 'by_name_list', ranked)
+    monkeypatch.setattr(database, 'by_name_list', ranked)
+    
+    add_client(firestore_db, 'c1', 12, datetime(2024, 1, 1))
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/api/v1/city/by-name-list")
+            assert response.status_code == 503
+            assert response.headers['Retry-After']
+            
+            while not ranked.ready:
+                await asyncio.sleep(0.01)
+            loaded = firestore_db.operation_counts['query']
+            
+            response = await http.get("/api/v1/city/by-name-list")
+            assert [entry['client_id'] for entry in response.json()['clients']] == ['c1']
+            response = await http.get("/api/v1/city/by-name-list/c1")
+            assert response.json()['rank'] == 1
+            assert firestore_db.operation_counts['query'] == loaded
+    finally:
+        await snapshot.stop()
+
+
+async def test_counts_ignore_a_snapshot_loaded_for_the_list(firestore_db, monkeypatch):
+    from app.services import database
+    
+    snapshot = ClientSnapshot()
+    snapshot.db = firestore_db
+    snapshot.load()
+    monkeypatch.setattr(database, 'client_snapshot', snapshot)
+    monkeypatch.setattr(settings, 'CLIENT_SNAPSHOT_ENABLED', False)
+    
+    # Written after the load, by another instance: only Firestore has it
+    add_client(firestore_db, 'c1', 12, datetime(2024, 1, 1))
+    assert await db_service.count_clients() == 1
+    assert (await db_service.client_status_counts())['assessed'] == 1
+    
+    monkeypatch.setattr(settings, 'CLIENT_SNAPSHOT_ENABLED', True)
+    assert await db_service.count_clients() == 0
@@ -0,0 +1,169 @@
+"""
+Duplicate intake detection: name codes and similarity, blocking keys,
+and the flag and merge policies at intake (never across organizations)
+"""
+
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.services.dedup import DuplicateDetector, duplicate_detector, jaro_winkler, soundex
+from app.services.database import db_service
+
+
+def test_soundex():
+    assert soundex("Robert") == "R163"
+    assert soundex("Rupert") == "R163"
+    assert soundex("Rubin") == "R150"
+    assert soundex("Ashcraft") == "A261"  # h doesn't separate s and c
+    assert soundex("Tymczak") == "T522"  # a vowel does separate z and k
+    assert soundex("Pfister") == "P236"
+    assert soundex("O'Brien") == soundex("OBrien") == "O165"
+    assert soundex("") == soundex(None) == soundex("--") == ""
+
+
+def test_jaro_winkler():
+    assert jaro_winkler("martha", "marhta") == pytest.approx(0.961, abs=1e-3)
+    assert jaro_winkler("dwayne", "duane") == pytest.approx(0.84, abs=1e-3)
+    assert jaro_winkler("dixon", "dicksonx") == pytest.approx(0.813, abs=1e-3)
+    assert jaro_winkler("maria", "maria") == 1.0
+    assert jaro_winkler("", "") == jaro_winkler("maria", "") == 0.0
+    assert jaro_winkler("abc", "xyz") == 0.0
+
+
+def test_keys():
+    detector = DuplicateDetector()
+    record = {
+        'first_name': 'Maria',
+        'last_name': 'Garcia',
+        'date_of_birth': datetime(1980, 5, 17),
+        'phone': '(562) 555-1234'
+    }
+    assert detector.keys(record) == ['p:+15625551234', 'd:1980-05-17:M600', 'd:1980-05-17:G620']
+    
+    # Swapped names land in the same blocks
+    swapped = {**record, 'first_name': 'Garcia', 'last_name': 'Maria'}
+    assert set(detector.keys(swapped)) == set(detector.keys(record))
+    
+    # Names only block with a date of birth
+    assert detector.keys({'first_name': 'Maria', 'last_name': 'Garcia', 'phone': '5625551234'}) == [
+        'p:+15625551234'
+    ]
+    assert detector.keys({'first_name': 'Maria', 'last_name': 'Garcia'}) == []
+
+
+IDENTITY = {
+    'first_name': 'Maria',
+    'last_name': 'Garcia',
+    'date_of_birth': datetime(1980, 5, 17),
+    'phone': '5625551234'
+}
+
+
+@pytest.fixture
+def intake_db(firestore_db):
+    for org in ('org1', 'org2'):
+        firestore_db.collection('organizations').document(org).set({'name': org})
+        firestore_db.collection('caseworkers').document(f"cw_{org}").set({
+            'name': 'Caseworker',
+            'organization_id': org,
+            'assigned_zones': ['downtown']
+        })
+        firestore_db.collection('qr_codes').document(f"qr_{org}").set({
+            'organization_id': org,
+            'zone': 'downtown',
+            'scan_count': 0
+        })
+    return firestore_db
+
+
+async def add_client(organization_id, **fields):
+    return await db_service.create_client({
+        **IDENTITY,
+        'organization_id': organization_id,
+        'assigned_caseworker_id': f"cw_{organization_id}",
+        'zone': 'downtown',
+        'status': 'assessed',
+        'qr_code': f"qr_{organization_id}",
+        **fields
+    })
+
+
+async def submit(qr_code, **fields):
+    from app.main import app
+    
+    body = {
+        **IDENTITY,
+        'date_of_birth': IDENTITY['date_of_birth'].isoformat(),
+        'qr_code': qr_code,
+        'intake_data': {'currently_homeless': True},
+        **fields
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.post("/api/v1/intake/submit", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def actions(db, caseworker_id, action_type):
+    query = db.collection('caseworkers').document(caseworker_id).collection('action_queue')
+    query = query.where('action_type', '==', action_type)
+    return [doc.to_dict() for doc in query.stream()]
+
+
+async def test_flag_records_own_organization_matches_only(intake_db, monkeypatch):
+    monkeypatch.setattr(duplicate_detector, 'policy', 'flag')
+    own = await add_client('org1')
+    other = await add_client('org2')
+    
+    record = await submit('qr_org1')
+    
+    # The unauthenticated submitter learns nothing about existing clients
+    assert 'possible_duplicates' not in record
+    assert record['id'] not in (own, other)
+    
+    stored = intake_db.collection('clients').document(record['id']).get().to_dict()
+    assert [match['client_id'] for match in stored['possible_duplicates']] == [own]
+    
+    (review,) = actions(intake_db, 'cw_org1', 'review_duplicate')
+    assert own in review['description']
+    assert other not in review['description']
+    assert actions(intake_db, 'cw_org2', 'review_duplicate') == []
+
+
+async def test_no_flag_for_another_organizations_client(intake_db, monkeypatch):
+    monkeypatch.setattr(duplicate_detector, 'policy', 'flag')
+    await add_client('org2')
+    
+    record = await submit('qr_org1')
+    
+    stored = intake_db.collection('clients').document(record['id']).get().to_dict()
+    assert stored['possible_duplicates'] == []
+    assert actions(intake_db, 'cw_org1', 'review_duplicate') == []
+
+
+async def test_merge_within_organization(intake_db, monkeypatch):
+    monkeypatch.setattr(duplicate_detector, 'policy', 'merge')
+    own = await add_client('org1', notes=['private note'])
+    
+    record = await submit('qr_org1')
+    
+    assert record['id'] == own
+    assert 'possible_duplicates' not in record
+    assert record['notes'] == []
+    assert len(list(intake_db.collection('clients').stream())) == 1
+    assert intake_db.collection('clients').document(own).get().to_dict()['repeat_intakes'] == 1
+    assert len(actions(intake_db, 'cw_org1', 'repeat_intake')) == 1
+
+
+async def test_merge_never_crosses_organizations(intake_db, monkeypatch):
+    monkeypatch.setattr(duplicate_detector, 'policy', 'merge')
+    other = await add_client('org2')
+    
+    record = await submit('qr_org1')
+    
+    assert record['id'] != other
+    assert record['organization_id'] == 'org1'
+    assert intake_db.collection('clients').document(other).get().to_dict().get('repeat_intakes', 0) == 0
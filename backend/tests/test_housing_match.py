@@ -0,0 +1,104 @@
+"""
+Housing matches: the client and unit are checked and taken in one
+transaction, and the worker reloads matches it couldn't write
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+
+from app.jobs.match_housing import MatchingWorker
+from app.services.database import db_service
+
+
+def add_client(db, client_id, score=10):
+    db.collection('clients').document(client_id).set({
+        'status': 'assessed',
+        'organization_id': 'org1',
+        'zone': 'downtown',
+        'created_at': datetime(2024, 1, 1),
+        'vi_spdat_score': {
+            'total_score': score,
+            'recommended_housing_type': 'permanent_supportive',
+            'calculated_at': datetime(2024, 1, 2)
+        }
+    })
+
+
+def add_resource(db, resource_id, beds):
+    db.collection('housing_resources').document(resource_id).set({
+        'type': 'permanent_supportive',
+        'name': resource_id,
+        'zone': 'downtown',
+        'available_beds': beds,
+        'updated_at': datetime.utcnow()
+    })
+
+
+def beds(db, resource_id):
+    return db.collection('housing_resources').document(resource_id).get().to_dict()['available_beds']
+
+
+def client(db, client_id):
+    return db.collection('clients').document(client_id).get().to_dict()
+
+
+async def test_match_takes_the_unit_with_the_status_change(firestore_db):
+    add_client(firestore_db, 'c1')
+    add_client(firestore_db, 'c2')
+    add_resource(firestore_db, 'r1', beds=1)
+    
+    assert await db_service.record_housing_match('c1', 'r1')
+    assert not await db_service.record_housing_match('c2', 'r1')
+    
+    assert beds(firestore_db, 'r1') == 0
+    assert client(firestore_db, 'c1')['status'] == 'matched'
+    assert client(firestore_db, 'c1')['matched_housing_id'] == 'r1'
+    assert client(firestore_db, 'c2')['status'] == 'assessed'
+    events = list(firestore_db.collection('clients').document('c1').collection('status_events').stream())
+    assert [event.to_dict()['to_status'] for event in events] == ['matched']
+
+
+async def test_client_matched_once(firestore_db):
+    add_client(firestore_db, 'c1')
+    add_resource(firestore_db, 'r1', beds=2)
+    
+    assert await db_service.record_housing_match('c1', 'r1')
+    assert not await db_service.record_housing_match('c1', 'r1')
+    assert beds(firestore_db, 'r1') == 1
+
+
+def test_concurrent_matches_never_overbook(firestore_db):
+    for n in range(6):
+        add_client(firestore_db, f"c{n}")
+    add_resource(firestore_db, 'r1', beds=2)
+    
+    def record(client_id):
+        return asyncio.run(db_service.record_housing_match(client_id, 'r1'))
+    
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(record, [f"c{n}" for n in range(6)]))
+    
+    assert results.count(True) == 2
+    assert beds(firestore_db, 'r1') == 0
+
+
+async def test_worker_requeues_the_client_when_the_unit_is_gone(firestore_db):
+    add_client(firestore_db, 'c1')
+    add_resource(firestore_db, 'r1', beds=1)
+    worker = MatchingWorker(firestore_db)
+    matches = worker.load()
+    assert [(m.client_id, m.resource_id) for m in matches] == [('c1', 'r1')]
+    
+    # Taken by someone else between the load and the write
+    firestore_db.collection('housing_resources').document('r1').update({'available_beds': 0})
+    
+    assert await worker.record(matches) == 0
+    assert client(firestore_db, 'c1')['status'] == 'assessed'
+    assert 'c1' in worker.engine.clients
+    assert worker.engine.resources['r1'].open_units == 0
+    
+    # A unit that opens again goes to the waiting client
+    add_resource(firestore_db, 'r1', beds=1)
+    assert await worker.record(worker.poll()) == 1
+    assert client(firestore_db, 'c1')['matched_housing_id'] == 'r1'
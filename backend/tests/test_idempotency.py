@@ -0,0 +1,77 @@
+"""
+Idempotency keys: one execution per key across workers sharing Redis
+"""
+
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.services.idempotency import IdempotencyConflict, IdempotencyStore
+from app.services.shared_cache import SharedCache
+
+
+@pytest.fixture
+async def workers(redis_server):
+    """Two worker processes' stores sharing one Redis"""
+    caches = [
+        SharedCache(client=fakeredis.aioredis.FakeRedis(server=redis_server))
+        for _ in range(2)
+    ]
+    for cache in caches:
+        await cache.connect()
+    yield [
+        IdempotencyStore(namespace="test", wait_timeout=5.0, claim_ttl=1, shared=cache)
+        for cache in caches
+    ]
+    for cache in caches:
+        await cache.close()
+
+
+async def test_duplicate_on_another_worker_gets_the_first_result(workers):
+    first, second = workers
+    calls = []
+    
+    async def submit():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {'client_id': 'c1'}
+    
+    results = await asyncio.gather(
+        first.run('key', 'fp', submit),
+        second.run('key', 'fp', submit)
+    )
+    
+    assert results == [({'client_id': 'c1'}, False), ({'client_id': 'c1'}, True)]
+    assert len(calls) == 1
+
+
+async def test_claim_is_renewed_while_a_slow_request_runs(workers):
+    first, second = workers
+    calls = []
+    
+    async def slow_submit():
+        calls.append(1)
+        # Well past claim_ttl
+        await asyncio.sleep(2.5)
+        return {'client_id': 'c1'}
+    
+    running = asyncio.ensure_future(first.run('key', 'fp', slow_submit))
+    await asyncio.sleep(2.0)
+    
+    result, replayed = await second.run('key', 'fp', slow_submit)
+    
+    assert (result, replayed) == ({'client_id': 'c1'}, True)
+    assert await running == ({'client_id': 'c1'}, False)
+    assert len(calls) == 1
+
+
+async def test_key_reused_with_another_payload(workers):
+    first, second = workers
+    
+    async def submit():
+        return {'client_id': 'c1'}
+    
+    await first.run('key', 'fp', submit)
+    with pytest.raises(IdempotencyConflict):
+        await second.run('key', 'other', submit)
@@ -0,0 +1,115 @@
+"""
+Background job queue: batched backlog writes, lease renewal on retries
+and backlog recovery off the event loop
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+
+from app.services.job_queue import BACKLOG_COLLECTION, JobQueue
+
+
+@pytest.fixture
+async def queue(firestore_db):
+    jobs = JobQueue(workers=2, backoff_seconds=0.01, lease_seconds=300, recover_interval=3600)
+    await jobs.start(firestore_db)
+    yield jobs
+    await jobs.stop(timeout=1.0)
+
+
+def backlog(db):
+    return {doc.id: doc.to_dict() for doc in db.collection(BACKLOG_COLLECTION).stream()}
+
+
+async def drained(jobs: JobQueue):
+    """Backlog writes committed and every queued job finished"""
+    while jobs._flushing is not None:
+        await asyncio.sleep(0.01)
+    await asyncio.wait_for(jobs._queue.join(), 1.0)
+
+
+async def test_enqueue_does_not_write_on_the_request_path(queue, firestore_db):
+    ran = []
+    
+    @queue.handler('record')
+    async def record(payload):
+        ran.append(payload['n'])
+    
+    commits = firestore_db.operation_counts.get('commit', 0)
+    for n in range(5):
+        await queue.enqueue('record', {'n': n})
+    
+    assert firestore_db.operation_counts.get('commit', 0) == commits
+    await drained(queue)
+    
+    # One batch for every job enqueued together; finished jobs are deleted
+    assert firestore_db.operation_counts['commit'] == commits + 1
+    assert sorted(ran) == [0, 1, 2, 3, 4]
+    assert backlog(firestore_db) == {}
+
+
+async def test_retries_renew_the_lease(queue, firestore_db):
+    leases = []
+    
+    @queue.handler('flaky')
+    async def flaky(payload):
+        (job,) = backlog(firestore_db).values()
+        leases.append((job['lease_until'], job['attempts']))
+        if len(leases) < 3:
+            raise RuntimeError("vendor timeout")
+    
+    await queue.enqueue('flaky', {})
+    for _ in range(200):
+        if len(leases) == 3 and not backlog(firestore_db):
+            break
+        await asyncio.sleep(0.01)
+    
+    assert [attempts for _, attempts in leases] == [0, 1, 2]
+    assert leases[0][0] < leases[1][0] < leases[2][0]
+    assert queue.stats['completed'] == 1
+
+
+async def test_recovery_claims_expired_jobs_off_the_event_loop(queue, firestore_db):
+    ran = []
+    
+    @queue.handler('current')
+    async def current(payload):
+        ran.append(payload['n'])
+    
+    expired = datetime.utcnow() - timedelta(minutes=10)
+    for n, name in enumerate(('current', 'unknown')):
+        firestore_db.collection(BACKLOG_COLLECTION).document(f"job{n}").set({
+            'name': name,
+            'payload': {'n': n},
+            'status': 'pending',
+            'attempts': 0,
+            'max_attempts': 5,
+            'created_at': expired,
+            'lease_until': expired
+        })
+    
+    # Slow Firestore: the loop keeps running while recovery waits on it
+    firestore_db._latency = lambda operation: 0.05
+    ticks = 0
+    
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+    
+    ticker = asyncio.ensure_future(tick())
+    try:
+        assert await queue._recover() == 1
+    finally:
+        ticker.cancel()
+    assert ticks > 5
+    
+    firestore_db._latency = None
+    await drained(queue)
+    
+    assert ran == [0]
+    # Jobs this instance has no handler for are left for others
+    assert list(backlog(firestore_db)) == ['job1']
@@ -0,0 +1,51 @@
+"""
+Service stats on /metrics: point-in-time values are gauges, only the
+listed monotonic counts are counters
+"""
+
+from app.core.metrics import Registry
+
+
+def types(text):
+    return dict(
+        line.split()[2:4] for line in text.splitlines() if line.startswith('# TYPE')
+    )
+
+
+def test_stats_are_gauges_unless_listed_as_counters():
+    registry = Registry()
+    registry.register_stats(
+        "home_test",
+        lambda: {'listeners': 3, 'hits': 10, 'ready': True, 'mode': 'flat', 'latency': {'p50': 0.1}},
+        counters=("hits",)
+    )
+    
+    assert types(registry.render()) == {
+        'home_test_listeners': 'gauge',
+        'home_test_hits_total': 'counter',
+        'home_test_latency': 'gauge',
+    }
+
+
+def test_app_exports_point_in_time_stats_as_gauges():
+    from app.core.metrics import registry
+    import app.main  # noqa: F401 (registers the service stats)
+    
+    exported = types(registry.render())
+    for name in (
+        'home_queue_stream_listeners',
+        'home_queue_stream_subscribers',
+        'home_client_snapshot_loaded',
+        'home_client_snapshot_clients',
+        'home_by_name_list_ready',
+        'home_by_name_list_lists',
+        'home_client_store_locations',
+        'home_jobs_queue_depth',
+    ):
+        assert exported[name] == 'gauge', name
+    for name in (
+        'home_jobs_completed_total',
+        'home_client_store_lookups_total',
+        'home_notifications_emails_sent_total',
+    ):
+        assert exported[name] == 'counter', name
@@ -0,0 +1,134 @@
+"""
+Batched email: a batch rejected for a recipient only fails its bad
+recipients; any other rejection fails it at once
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.notifications import NotificationDispatcher, NotificationError
+
+
+def sendgrid(requests):
+    """Stub mail/send that rejects any request addressed to bad@ (like an invalid address)"""
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        recipients = [p['to'][0]['email'] for p in body['personalizations']]
+        requests.append(recipients)
+        if any(email.startswith('bad@') for email in recipients):
+            return httpx.Response(400, json={'errors': [{
+                'message': 'Does not contain a valid address.',
+                'field': 'personalizations.0.to.0.email'
+            }]})
+        return httpx.Response(202)
+    
+    return httpx.MockTransport(handle)
+
+
+@pytest.fixture
+def requests():
+    """Recipients of every mail/send request, in order"""
+    return []
+
+
+@pytest.fixture
+async def dispatcher(requests):
+    notifications = NotificationDispatcher(
+        sendgrid_api_key="key",
+        sendgrid_from="home@example.org",
+        email_rate=1000.0,
+        batch_window=0.01,
+        transport=sendgrid(requests)
+    )
+    yield notifications
+    await notifications.close()
+
+
+async def test_one_request_per_batch(dispatcher, requests):
+    emails = [f"client{n}@example.org" for n in range(8)]
+    
+    await asyncio.gather(*(dispatcher.send_email(email, "Received", "Hi") for email in emails))
+    
+    assert requests == [emails]
+    assert dispatcher.stats['emails_sent'] == 8
+
+
+async def test_bad_recipient_does_not_fail_the_batch(dispatcher, requests):
+    emails = [f"client{n}@example.org" for n in range(8)]
+    emails[5] = "bad@example.org"
+    
+    results = await asyncio.gather(
+        *(dispatcher.send_email(email, "Received", "Hi") for email in emails),
+        return_exceptions=True
+    )
+    
+    failed = [email for email, result in zip(emails, results) if isinstance(result, Exception)]
+    assert failed == ["bad@example.org"]
+    assert isinstance(results[5], NotificationError) and results[5].status_code == 400
+    assert dispatcher.stats['emails_sent'] == 7
+    # Bisected: log2(8) rounds, not one request per recipient
+    assert len(requests) == 7
+
+
+async def test_retryable_failures_are_not_split(requests):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+    
+    notifications = NotificationDispatcher(
+        sendgrid_api_key="key",
+        sendgrid_from="home@example.org",
+        batch_window=0.01,
+        transport=httpx.MockTransport(handle)
+    )
+    results = await asyncio.gather(
+        *(notifications.send_email(f"client{n}@example.org", "Received", "Hi") for n in range(4)),
+        return_exceptions=True
+    )
+    await notifications.close()
+    
+    assert all(isinstance(result, NotificationError) and result.retryable for result in results)
+    assert len(requests) == 1
+
+
+@pytest.mark.parametrize('status_code', [401, 403, 413])
+async def test_other_rejections_fail_the_batch_at_once(requests, status_code):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(status_code, json={'errors': [{'message': 'Rejected', 'field': None}]})
+    
+    notifications = NotificationDispatcher(
+        sendgrid_api_key="revoked",
+        sendgrid_from="home@example.org",
+        batch_window=0.01,
+        transport=httpx.MockTransport(handle)
+    )
+    results = await asyncio.gather(
+        *(notifications.send_email(f"client{n}@example.org", "Received", "Hi") for n in range(8)),
+        return_exceptions=True
+    )
+    await notifications.close()
+    
+    assert all(isinstance(result, NotificationError) and not result.retryable for result in results)
+    assert len(requests) == 1
+    assert notifications.stats['batch_splits'] == 0
+
+
+async def test_cancelled_sender_is_left_out_of_the_batch(dispatcher, requests):
+    sends = [
+        asyncio.ensure_future(dispatcher.send_email(f"client{n}@example.org", "Received", "Hi"))
+        for n in range(3)
+    ]
+    await asyncio.sleep(0)
+    # Job timeout while the batch window is still open
+    sends[1].cancel()
+    
+    results = await asyncio.gather(*sends, return_exceptions=True)
+    
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert requests == [["client0@example.org", "client2@example.org"]]
+    assert dispatcher.stats['emails_sent'] == 2
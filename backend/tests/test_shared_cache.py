@@ -0,0 +1,241 @@
+"""
+Shared cache tier: values, cross-instance invalidation, the cached
+tiers (reference documents, city metrics, client progress) and
+degradation when Redis is unavailable
+"""
+
+from datetime import datetime
+import asyncio
+
+import fakeredis.aioredis
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import database
+from app.services.database import db_service
+from app.services.response_cache import ResponseCache
+from app.services.shared_cache import SharedCache, client_progress_key, document_key
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    """Poll condition() until it holds (pub/sub delivery is asynchronous)"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        if asyncio.get_running_loop().time() > deadline:
+            pytest.fail("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+async def listening(cache: SharedCache) -> bool:
+    """Every instance subscribed to the invalidation channel"""
+    ((_, count),) = await cache._client.pubsub_numsub(cache.channel)
+    return count >= 2
+
+
+@pytest.fixture
+async def instances(redis_server):
+    """Two API instances sharing one Redis"""
+    caches = [
+        SharedCache(client=fakeredis.aioredis.FakeRedis(server=redis_server), retry_seconds=0.05)
+        for _ in range(2)
+    ]
+    for cache in caches:
+        await cache.connect()
+    await wait_for(lambda: listening(caches[0]))
+    yield caches
+    for cache in caches:
+        await cache.close()
+
+
+# -- values --
+
+async def test_set_then_get(instances):
+    first, second = instances
+    
+    await first.set('key', {'count': 3, 'at': datetime(2024, 1, 2, 3, 4, 5)})
+    
+    assert await second.get('key') == {'count': 3, 'at': '2024-01-02T03:04:05'}
+    assert await second.get('missing') is None
+    assert second.stats['hits'] == 1
+    assert second.stats['misses'] == 1
+    assert first.status == "connected"
+
+
+async def test_values_expire_after_their_ttl(instances):
+    first, _ = instances
+    
+    await first.set('default', 1)
+    await first.set('short', 1, ttl=5)
+    
+    assert 0 < await first._client.ttl('home:default') <= first.default_ttl
+    assert 0 < await first._client.ttl('home:short') <= 5
+
+
+async def test_add_only_stores_absent_keys(instances):
+    first, second = instances
+    
+    assert await first.add('claim', 'first') is True
+    assert await second.add('claim', 'second') is False
+    assert await second.get('claim') == 'first'
+
+
+async def test_get_or_compute_computes_once(instances):
+    first, second = instances
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+    
+    assert await first.get_or_compute('computed', compute) == {'value': 1}
+    assert await second.get_or_compute('computed', compute) == {'value': 1}
+    assert len(calls) == 1
+
+
+# -- invalidation --
+
+async def test_invalidation_reaches_every_instance(instances):
+    first, second = instances
+    seen = {0: [], 1: []}
+    first.on_invalidate(lambda collection, doc_id: seen[0].append((collection, doc_id)))
+    second.on_invalidate(lambda collection, doc_id: seen[1].append((collection, doc_id)))
+    await first.set(client_progress_key('c1'), {'progress': 50})
+    
+    await first.invalidate('clients', 'c1', client_progress_key('c1'))
+    
+    async def delivered():
+        return seen[1] == [('clients', 'c1')]
+    
+    await wait_for(delivered)
+    assert await second.get(client_progress_key('c1')) is None
+    # The writer dispatches locally, then once more from its own subscription
+    assert seen[0][0] == ('clients', 'c1')
+
+
+# -- cached tiers --
+
+async def test_reference_documents_are_read_once(instances, firestore_db, monkeypatch):
+    first, second = instances
+    firestore_db.collection('organizations').document('org1').set({'name': 'Downtown Outreach'})
+    
+    monkeypatch.setattr(database, 'shared_cache', first)
+    assert await db_service.get_organization('org1') == {'name': 'Downtown Outreach'}
+    reads = firestore_db.operation_counts['get']
+    
+    # Another instance finds the document (and its version) in Redis
+    monkeypatch.setattr(database, 'shared_cache', second)
+    assert await db_service.get_organization('org1') == {'name': 'Downtown Outreach'}
+    assert firestore_db.operation_counts['get'] == reads
+    cached = await second.get(document_key('organizations', 'org1'))
+    assert cached['version']
+
+
+async def test_city_metrics_are_computed_by_one_instance(instances):
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        return {'total_clients': 42}
+    
+    caches = [ResponseCache(ttl=30, stale_ttl=300, shared=shared) for shared in instances]
+    
+    assert await caches[0].get_or_compute('city:metrics', compute) == {'total_clients': 42}
+    assert await caches[1].get_or_compute('city:metrics', compute) == {'total_clients': 42}
+    assert len(calls) == 1
+    assert 0 < await instances[0]._client.ttl('home:city:metrics') <= 30
+
+
+async def test_progress_payload_is_shared_until_the_client_changes(instances, firestore_db, monkeypatch):
+    from app.api.v1 import client as client_api
+    from app.main import app
+    
+    first, second = instances
+    monkeypatch.setattr(database, 'shared_cache', first)
+    monkeypatch.setattr(client_api, 'shared_cache', first)
+    firestore_db.collection('clients').document('c1').set({
+        'first_name': 'Ann',
+        'last_name': 'Lee',
+        'status': 'assessed',
+        'organization_id': 'org1',
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow()
+    })
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.get("/api/v1/client/progress/c1")
+    assert response.status_code == 200
+    
+    key = client_progress_key('c1')
+    cached = await second.get(key)
+    assert cached['progress'] == response.json()
+    assert cached['etag'] == response.headers['etag']
+    assert 0 < await second._client.ttl(f"home:{key}") <= settings.SHARED_CACHE_PROGRESS_TTL_SECONDS
+    
+    await db_service.update_client('c1', {'status': 'matched'})
+    assert await second.get(key) is None
+
+
+# -- degradation --
+
+async def test_unreachable_redis_degrades_to_misses():
+    cache = SharedCache(url="redis://127.0.0.1:1", timeout=0.05, retry_seconds=60)
+    await cache.connect()
+    handled = []
+    cache.on_invalidate(lambda collection, doc_id: handled.append(doc_id))
+    
+    async def compute():
+        return {'computed': True}
+    
+    try:
+        assert cache.status == "degraded"
+        assert await cache.get('key') is None
+        await cache.set('key', 1)
+        assert await cache.add('key', 1) is None
+        assert await cache.get_or_compute('key', compute) == {'computed': True}
+        
+        # Local copies are still dropped
+        await cache.invalidate('clients', 'c1')
+        assert handled == ['c1']
+    finally:
+        await cache.close()
+
+
+async def test_disabled_without_redis_url():
+    cache = SharedCache(url="")
+    await cache.connect()
+    
+    assert cache.status == "disabled"
+    assert await cache.get('key') is None
+    await cache.set('key', 1)
+    await cache.close()
+
+
+async def test_redis_dropping_mid_run_degrades_then_recovers(instances, redis_server):
+    first, second = instances
+    seen = []
+    second.on_invalidate(lambda collection, doc_id: seen.append(doc_id))
+    await first.set('key', 'value')
+    
+    redis_server.connected = False
+    assert await first.get('key') is None
+    assert first.status == "degraded"
+    assert first.stats['errors'] >= 1
+    
+    async def compute():
+        return 'computed'
+    
+    assert await first.get_or_compute('other', compute) == 'computed'
+    
+    # Back after the retry backoff; listeners resubscribe on their own
+    redis_server.connected = True
+    await asyncio.sleep(first.retry_seconds)
+    assert await first.get('key') == 'value'
+    assert first.status == "connected"
+    
+    async def delivered():
+        await first.invalidate('clients', 'c2')
+        return 'c2' in seen
+    
+    await wait_for(delivered, timeout=5.0)